@@ -1,14 +1,66 @@
 # =========================
 # OCR BATCH INTELLIGENCE DASHBOARD - Render.com Optimized
 # =========================
+# Thin view: data loading, caching and statistics live in ocr_dashboard; this
+# script only reads widgets and renders what the store returns.
 import streamlit as st
-import pandas as pd
-import oracledb
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime, timedelta
 import os
+import time
+import json
+
+from ocr_dashboard import (
+    EmptySampleError,
+    DISCO_MAP,
+    FLAG_CODES,
+    SEARCH_PREFIX,
+    SEARCH_CONTAINS,
+    SORT_COLUMNS,
+    EXPORT_FORMATS,
+    available_formats,
+    iter_record_chunks,
+    export_to_tempfile,
+    prune_exports,
+    trend_rates,
+    ROLLUP_LEVELS
+)
+from ocr_dashboard.config import (
+    EXPORT_DIR,
+    EXPORT_MAX_AGE_SECONDS,
+    PREWARM_ENABLED,
+    ESTIMATE_SAMPLE_PERCENT,
+    ESTIMATE_SAMPLE_BLOCK,
+    ESTIMATE_POLL_SECONDS,
+    RECORD_CACHE_SECONDS,
+    RECORD_PAGE_CACHE_ENTRIES,
+    SLOW_QUERY_SECONDS,
+    SLOW_QUERY_LOG
+)
+from ocr_dashboard.database import fetch_record_page, iter_database_export, explain_statement
+from ocr_dashboard.prewarm import start_prewarm_worker, get_prewarm_status
+from ocr_dashboard.metrics import begin_run, finish_run, stage, prometheus_text, start_metrics_server
+from ocr_dashboard.profiling import recent_statements, statement_table
+from ocr_dashboard.store import (
+    SOURCE_DATABASE,
+    load_records,
+    load_record_summary,
+    load_search_index,
+    load_disco_summary,
+    load_bill_months,
+    load_disco_trend,
+    load_rollup_cube,
+    get_record_status,
+    get_record_version,
+    get_aggregate_status,
+    aggregates_ready,
+    load_aggregates_in_background,
+    load_estimate,
+    count_records,
+    invalidate_disco
+)
 
 # =========================
 # PAGE CONFIG
@@ -20,29 +72,27 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Every instrumented stage below is recorded into this run (see ocr_dashboard.metrics)
+page_run = begin_run()
+
 # =========================
-# DATABASE CONFIGURATION - RENDER COMPATIBLE
+# VIEW CONFIGURATION
 # =========================
-# Get configuration from environment variables or use defaults
-DB_HOST = os.getenv("DB_HOST", "128.101.23.130")
-DB_PORT = int(os.getenv("DB_PORT", "1521"))
-DB_SID = os.getenv("DB_SID", "theftdb")
-DB_USER = os.getenv("DB_USER", "theft_data")
-DB_PWD = os.getenv("DB_PWD", "theft_data")
+# Record Explorer page sizes; only the current page is sent to the browser
+EXPLORER_PAGE_SIZES = [25, 50, 100, 250, 500]
+
+# Bill months selected by default: the current and the previous cycle
+DEFAULT_BILL_MONTHS = 2
+
+# Drill-down level labels (see ocr_dashboard.rollup.ROLLUP_LEVELS)
+ROLLUP_LABELS = {"DISCO_NAME": "DISCO", "BATCH_NO": "Batch", "SUB_DIV": "Sub-division"}
+
+# Records shown for a drill-down leaf
+LEAF_RECORD_ROWS = 100
+
+# What the progressive-mode estimate samples (see ocr_dashboard.estimate)
+SAMPLE_KIND = "block" if ESTIMATE_SAMPLE_BLOCK else "row"
 
-DISCO_MAP = {
-    "11": "LESCO",
-    "12": "GEPCO",
-    "13": "FESCO",
-    "14": "IESCO",
-    "15": "MEPCO",
-    "26": "PESCO",
-    "27": "HAZECO",
-    "37": "HESCO",
-    "38": "SEPCO",
-    "48": "QESCO",
-    "59": "TESCO"
-}
 
 # =========================
 # POWER BI MODERN STYLING - PERFECT CARD SIZING
@@ -143,6 +193,13 @@ st.markdown("""
     line-height: 1.2;
 }
 
+.enhanced-kpi .kpi-interval {
+    font-size: 12px;
+    opacity: 0.85;
+    margin-top: 4px;
+    text-align: center;
+}
+
 /* Enhanced Cards */
 .enhanced-card {
     background: var(--white);
@@ -322,184 +379,87 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # =========================
-# DATA LOADER - WITH FALLBACK TO SAMPLE DATA
+# RECORD EXPLORER - KEYSET PAGE NAVIGATION
 # =========================
-@st.cache_data(ttl=300, show_spinner=False)
-def load_all_disco_data(disco_code=None):
-    """Load ALL data for specific DISCO or all DISCOS"""
-    
-    # Show environment info
-    if os.environ.get("RENDER"):
-        st.sidebar.info("☁️ Running on Render.com")
-    
-    # Try database connection first
-    try:
-        # Create DSN for Oracle
-        dsn = f"(DESCRIPTION=(ADDRESS=(PROTOCOL=TCP)(HOST={DB_HOST})(PORT={DB_PORT}))(CONNECT_DATA=(SID={DB_SID})))"
-        
-        # Try to connect
-        connection = oracledb.connect(
-            user=DB_USER,
-            password=DB_PWD,
-            dsn=dsn
-        )
-        
-        # Build query
-        if disco_code:
-            query = f"""
-            SELECT 
-                REF_DIGITS,
-                SUBSTR(REF_DIGITS, 3, 2) AS DISCO_CODE,
-                BILMONTH,
-                IMAGE_VERIFY_CODE_PITC
-            FROM TBL_GENERAL_BILL_PRINT_AUDIT 
-            WHERE SUBSTR(REF_DIGITS, 3, 2) = '{disco_code}'
-            FETCH FIRST 5000 ROWS ONLY
-            """
-        else:
-            query = """
-            SELECT 
-                REF_DIGITS,
-                SUBSTR(REF_DIGITS, 3, 2) AS DISCO_CODE,
-                BILMONTH,
-                IMAGE_VERIFY_CODE_PITC
-            FROM TBL_GENERAL_BILL_PRINT_AUDIT
-            FETCH FIRST 5000 ROWS ONLY
-            """
-        
-        df = pd.read_sql(query, connection)
-        connection.close()
-        
-        if len(df) == 0:
-            raise Exception("No data returned from database")
-            
-        # Process the data
-        df["DISCO_NAME"] = df["DISCO_CODE"].map(DISCO_MAP).fillna("UNKNOWN")
-        df["BATCH_NO"] = df["REF_DIGITS"].str[:2]
-        df["SUB_DIV"] = df["REF_DIGITS"].str[:5]
-        df["BATCH_ID"] = df["BATCH_NO"] + "-" + df["DISCO_CODE"]
-        df["PROCESSING_STATUS"] = df["IMAGE_VERIFY_CODE_PITC"].apply(
-            lambda x: "Processed" if pd.notna(x) else "Pending"
-        )
-        df["ACCURACY_CATEGORY"] = df["IMAGE_VERIFY_CODE_PITC"].apply(
-            lambda x: "Success (A,C,D)" if x in ['A', 'C', 'D'] else
-                     "Images Not Available (E)" if x == 'E' else
-                     "Reading Not Matched (N)" if x == 'N' else
-                     "Not Processed" if pd.isna(x) else "Other"
-        )
-        
-        st.sidebar.success(f"✅ Database: {len(df)} records")
-        return df
-        
-    except Exception as e:
-        st.sidebar.warning(f"⚠️ Using sample data")
-        
-        # =========================
-        # SAMPLE DATA GENERATION (Fallback)
-        # =========================
-        sample_size = 5000
-        codes = [disco_code] if disco_code else list(DISCO_MAP.keys())[:3]
-        
-        data = {
-            'REF_DIGITS': [],
-            'DISCO_CODE': [],
-            'BILMONTH': [],
-            'IMAGE_VERIFY_CODE_PITC': []
-        }
-        
-        for i in range(sample_size):
-            disco = np.random.choice(codes)
-            batch_no = f"{np.random.randint(1, 20):02d}"
-            sub_div = f"{batch_no}{disco}{np.random.randint(1, 5)}"
-            ref_digits = f"{sub_div}{np.random.randint(100000000, 999999999)}"
-            
-            data['REF_DIGITS'].append(ref_digits)
-            data['DISCO_CODE'].append(disco)
-            data['BILMONTH'].append(np.random.choice(pd.date_range('2024-01-01', periods=6, freq='MS')))
-            data['IMAGE_VERIFY_CODE_PITC'].append(np.random.choice(['A', 'C', 'D', 'E', 'N', None], 
-                                                                 p=[0.35, 0.2, 0.15, 0.1, 0.05, 0.15]))
-        
-        df = pd.DataFrame(data)
-        df["DISCO_NAME"] = df["DISCO_CODE"].map(DISCO_MAP)
-        df["BATCH_NO"] = df["REF_DIGITS"].str[:2]
-        df["SUB_DIV"] = df["REF_DIGITS"].str[:5]
-        df["BATCH_ID"] = df["BATCH_NO"] + "-" + df["DISCO_CODE"]
-        df["PROCESSING_STATUS"] = df["IMAGE_VERIFY_CODE_PITC"].apply(
-            lambda x: "Processed" if pd.notna(x) else "Pending"
-        )
-        df["ACCURACY_CATEGORY"] = df["IMAGE_VERIFY_CODE_PITC"].apply(
-            lambda x: "Success (A,C,D)" if x in ['A', 'C', 'D'] else
-                     "Images Not Available (E)" if x == 'E' else
-                     "Reading Not Matched (N)" if x == 'N' else
-                     "Not Processed" if pd.isna(x) else "Other"
-        )
-        
-        return df
+def _keyset_state(scope):
+    """Per-session stack of page start keys ((REF_DIGITS, ROWID) pairs), reset whenever the DISCO, filter or page size changes"""
+    state = st.session_state.get("explorer_keyset")
+    if state is None or state["scope"] != scope:
+        state = {"scope": scope, "starts": [None], "last_key": None}
+        st.session_state["explorer_keyset"] = state
+    return state
+
+def _next_keyset_page(state):
+    if state["last_key"] is not None:
+        state["starts"].append(state["last_key"])
+
+def _previous_keyset_page(state):
+    if len(state["starts"]) > 1:
+        state["starts"].pop()
+
+@st.cache_data(ttl=RECORD_CACHE_SECONDS, max_entries=RECORD_PAGE_CACHE_ENTRIES, show_spinner=False)
+def cached_record_page(disco_code, ref_prefix, after_key, page_size, month_range):
+    """fetch_record_page shared by every session and rerun, so redrawing the page does not query Oracle again"""
+    return fetch_record_page(disco_code, ref_prefix, after_key, page_size, month_range)
 
 # =========================
-# BATCH PROCESSING FUNCTIONS
+# EXPORTS - WRITTEN IN CHUNKS, ONLY WHEN ASKED FOR
 # =========================
-def get_batch_statistics(df):
-    """Get statistics for all batches"""
-    batch_stats = []
+def _discard_export(prepared):
+    if prepared and os.path.exists(prepared["path"]):
+        os.remove(prepared["path"])
+
+def _downloaded_export(exports, name):
+    # Served once: Streamlit reads the file into memory on every run it is offered, so it goes after the click
+    _discard_export(exports.pop(name, None))
+
+def render_export(name, label, scope, file_stem, make_chunks):
+    """Format picker plus a Prepare button; the file is only written when the button is clicked"""
+    formats = {EXPORT_FORMATS[fmt]["label"]: fmt for fmt in available_formats()}
+    exports = st.session_state.setdefault("exports", {})
     
-    for batch_id in sorted(df["BATCH_ID"].unique()):
-        batch_df = df[df["BATCH_ID"] == batch_id]
-        
-        total_records = len(batch_df)
-        processed_records = batch_df["IMAGE_VERIFY_CODE_PITC"].notna().sum()
-        
-        flag_counts = {}
-        for flag in ['A', 'C', 'D', 'E', 'N']:
-            flag_counts[flag] = (batch_df["IMAGE_VERIFY_CODE_PITC"] == flag).sum()
-        
-        successful = flag_counts['A'] + flag_counts['C'] + flag_counts['D']
-        total_an = flag_counts['A'] + flag_counts['N']
-        ocr_accuracy = (flag_counts['A'] / total_an * 100) if total_an > 0 else 0
-        
-        processing_rate = (processed_records / total_records * 100) if total_records > 0 else 0
-        success_rate = (successful / processed_records * 100) if processed_records > 0 else 0
-        
-        batch_stats.append({
-            "Batch ID": batch_id,
-            "DISCO": batch_df["DISCO_NAME"].iloc[0],
-            "Total Records": total_records,
-            "Processed": processed_records,
-            "Successful (A,C,D)": successful,
-            "Success Rate (A,C,D)": success_rate,
-            "Processing Rate": processing_rate,
-            "OCR Model Accuracy (A vs N)": ocr_accuracy,
-            "Flag A": flag_counts['A'],
-            "Flag C": flag_counts['C'],
-            "Flag D": flag_counts['D'],
-            "Flag E": flag_counts['E'],
-            "Flag N": flag_counts['N'],
-            "Total A+N": total_an
-        })
-    
-    return pd.DataFrame(batch_stats)
-
-def calculate_ocr_model_accuracy(df):
-    """Calculate OCR model accuracy based on A vs N flags only"""
-    count_a = (df["IMAGE_VERIFY_CODE_PITC"] == 'A').sum()
-    count_n = (df["IMAGE_VERIFY_CODE_PITC"] == 'N').sum()
-    total_an = count_a + count_n
-    
-    if total_an > 0:
-        accuracy = (count_a / total_an * 100)
-    else:
-        accuracy = 0
+    format_col, action_col = st.columns(2)
+    with format_col:
+        fmt = formats[st.selectbox("Format:", list(formats), key=f"{name}_format", label_visibility="collapsed")]
+    scope = (scope, fmt)
+    
+    with action_col:
+        if st.button(f"⚙️ Prepare {label}", key=f"{name}_prepare", use_container_width=True):
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            prune_exports(EXPORT_DIR, EXPORT_MAX_AGE_SECONDS)
+            _discard_export(exports.pop(name, None))
+            try:
+                with st.spinner("Writing export..."):
+                    path, rows = export_to_tempfile(make_chunks(), fmt, EXPORT_DIR)
+                exports[name] = {"scope": scope, "path": path, "rows": rows}
+            except Exception as e:
+                st.warning(f"⚠️ Export failed: {e}")
     
-    return {
-        "count_a": count_a,
-        "count_n": count_n,
-        "total_an": total_an,
-        "accuracy": accuracy
-    }
+    # Offer the file only while it still matches what is on screen
+    prepared = exports.get(name)
+    if prepared and prepared["scope"] == scope and os.path.exists(prepared["path"]):
+        with open(prepared["path"], "rb") as handle:
+            st.download_button(
+                label=f"📥 Download {label} ({prepared['rows']:,} rows)",
+                data=handle,
+                file_name=f"{file_stem}.{EXPORT_FORMATS[fmt]['extension']}",
+                mime=EXPORT_FORMATS[fmt]["mime"],
+                key=f"{name}_download",
+                on_click=_downloaded_export,
+                args=(exports, name),
+                use_container_width=True
+            )
 
 # =========================
 # SIDEBAR
 # =========================
+if PREWARM_ENABLED:
+    # One worker per process keeps every DISCO's aggregates warm; no-op after the first run
+    start_prewarm_worker()
+
+# Prometheus text on METRICS_PORT when it is set; no-op after the first run
+start_metrics_server()
+
 with st.sidebar:
     st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
     st.markdown("### 🎯 ANALYSIS SETTINGS")
@@ -527,38 +487,150 @@ with st.sidebar:
         disco_code = None
         disco_choice = "ALL DISCOS"
     
+    aggregate_mode = st.toggle(
+        "⚡ Aggregate in database",
+        value=True,
+        help="Feed KPIs, flag cards and batch charts from counts grouped in Oracle over the full table"
+    )
+    
+    progressive_mode = st.toggle(
+        "⏱️ Estimate first",
+        value=True,
+        disabled=not aggregate_mode,
+        help=f"While exact counts load in the background, show KPIs estimated from a {ESTIMATE_SAMPLE_PERCENT:g}% "
+             f"{SAMPLE_KIND} sample with 95% confidence intervals"
+    )
+    
+    # Until exact counts are cached, KPIs come from a row sample while a background thread loads them
+    estimating = aggregate_mode and progressive_mode and not aggregates_ready(disco_code)
+    if estimating:
+        load_aggregates_in_background(disco_code)
+        try:
+            months = load_bill_months(disco_code, estimated=True)
+        except EmptySampleError:
+            # Too few rows to sample even at the largest percent: wait for the exact counts instead
+            estimating = False
+    
+    # Bill months come from the (pre-warmed) aggregates; records are only loaded for the chosen range
+    if not estimating:
+        months = load_bill_months(disco_code)
+    bill_months = {month.strftime("%Y-%m"): month for month in months}
+    month_range = None
+    if len(bill_months) > 1:
+        month_labels = list(bill_months)
+        first_month, last_month = st.select_slider(
+            "🗓️ Bill months:",
+            options=month_labels,
+            value=(month_labels[max(0, len(month_labels) - DEFAULT_BILL_MONTHS)], month_labels[-1]),
+            help="Filtered in Oracle with BILMONTH BETWEEN; the full span also includes undated records"
+        )
+        if (first_month, last_month) != (month_labels[0], month_labels[-1]):
+            month_range = (bill_months[first_month], bill_months[last_month])
+    
     st.markdown('</div>', unsafe_allow_html=True)
+
+# =========================
+# LOAD DATA
+# =========================
+# Loaded once per run; the record store is the shared cached instance, not a copy.
+# In aggregate mode no raw record is loaded unless the Record Explorer asks for them.
+load_progress = st.sidebar.empty()
+
+def show_load_progress(loaded_rows, expected_rows, processed_rows):
+    load_progress.progress(
+        min(loaded_rows / expected_rows, 1.0) if expected_rows else 1.0,
+        text=f"⏳ {loaded_rows:,} / {expected_rows:,} records · "
+             f"{processed_rows / loaded_rows * 100:.1f}% processed"
+    )
+
+estimate = None
+with st.spinner(f"🚀 Loading data for {disco_choice}..."), stage("load", part="summary"):
+    # Shared across sessions and reruns; treat as read-only
+    if estimating:
+        estimate = load_estimate(disco_code, month_range)
+        summary = estimate["summary"]
+        data_source = estimate["source"]
+    elif aggregate_mode:
+        summary = load_disco_summary(disco_code, month_range)
+        data_source = get_aggregate_status(disco_code)["source"]
+    else:
+        df = load_records(disco_code, on_progress=show_load_progress, month_range=month_range)
+        summary = load_record_summary(disco_code, month_range)
+        data_source = get_record_status(disco_code, month_range)["source"]
+    
+    total_records = summary["total_records"]
+    flag_totals = summary["flag_totals"]
+    batch_stats = summary["batch_stats"]
+    ocr_accuracy = summary["ocr_accuracy"]
+
+with st.sidebar:
+    # Show environment info
+    if os.environ.get("RENDER"):
+        st.info("☁️ Running on Render.com")
+    
+    # Filled in once the records are loaded
+    record_status_slot = st.empty()
+    
+    # All DISCOS is loaded one DISCO at a time; name any that failed or timed out
+    if estimating:
+        # The estimate samples every DISCO in one query
+        missing_discos = None
+    elif aggregate_mode:
+        missing_discos = (get_aggregate_status(disco_code) or {}).get("missing")
+    else:
+        missing_discos = get_record_status(disco_code, month_range)["missing"]
+    if missing_discos:
+        st.warning(
+            "⚠️ Partial results, missing: "
+            + ", ".join(f"{DISCO_MAP.get(code, code)} ({reason})" for code, reason in missing_discos.items())
+        )
     
     st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
     st.markdown("### 📊 QUICK METRICS")
     
-    with st.spinner("Loading..."):
-        df_temp = load_all_disco_data(disco_code)
-        processed_temp = df_temp[df_temp["IMAGE_VERIFY_CODE_PITC"].notna()]
-        ocr_temp = calculate_ocr_model_accuracy(df_temp)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Total", f"{len(df_temp):,}")
-        with col2:
-            st.metric("OCR Accuracy", f"{ocr_temp['accuracy']:.1f}%")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Total", f"{total_records:,}")
+    with col2:
+        st.metric("OCR Accuracy", f"{ocr_accuracy['accuracy']:.1f}%")
     
-    st.progress(len(processed_temp) / len(df_temp))
-    st.caption(f"Showing: {disco_choice}")
+    st.progress(summary["processing_rate"] / 100)
+    st.caption(
+        f"Showing: {disco_choice}"
+        + (f" · {month_range[0]:%Y-%m} to {month_range[1]:%Y-%m}" if month_range else " · all bill months")
+    )
+    if estimating:
+        st.caption(
+            f"⏱️ Estimated from {estimate['sampled_rows']:,} sampled records "
+            f"({estimate['fraction'] * 100:g}%) · exact counts loading"
+        )
     
     st.markdown('</div>', unsafe_allow_html=True)
     
+    aggregate_status = get_aggregate_status(disco_code)
+    if aggregate_mode and aggregate_status and isinstance(aggregate_status["high_water"], datetime):
+        st.caption(
+            f"🕒 Counts checked {datetime.fromtimestamp(aggregate_status['checked_at']).strftime('%H:%M:%S')} "
+            f"· incremental from {aggregate_status['high_water']:%Y-%m}"
+        )
+    prewarm_status = get_prewarm_status()
+    if aggregate_mode and prewarm_status["running"]:
+        st.caption(f"🔥 Pre-warmed in background: {len(prewarm_status['discos'])} of {len(DISCO_MAP)} DISCOs")
+    
     if st.button("🔄 Refresh Dashboard", use_container_width=True, type="primary"):
-        st.cache_data.clear()
+        invalidate_disco(disco_code)
         st.rerun()
+    
+    show_diagnostics = st.toggle(
+        "🩺 Diagnostics",
+        value=False,
+        help="Time, rows, bytes and cache hits of every stage of this page run"
+    )
+    # Filled at the end of the run, once every stage has been timed
+    diagnostics_panel = st.expander("🩺 DIAGNOSTICS", expanded=True) if show_diagnostics else None
 
-# =========================
-# LOAD DATA
-# =========================
-with st.spinner(f"🚀 Loading data for {disco_choice}..."):
-    df = load_all_disco_data(disco_code)
-    batch_stats = get_batch_statistics(df)
-    ocr_accuracy = calculate_ocr_model_accuracy(df)
+# Header, KPI, OCR and flag sections
+summary_render = stage("render", section="summary").start()
 
 # =========================
 # HEADER
@@ -575,7 +647,7 @@ st.markdown(f"""
         <span class="status-indicator status-success">🟢 Live Data</span>
         <span class="status-indicator status-info">📅 {datetime.now().strftime('%Y-%m-%d')}</span>
         <span class="status-indicator status-info">🏢 {disco_choice}</span>
-        <span class="status-indicator status-info">📊 {len(df):,} Records</span>
+        <span class="status-indicator status-info">📊 {total_records:,} Records</span>
     </div>
 </div>
 """, unsafe_allow_html=True)
@@ -585,17 +657,36 @@ st.markdown(f"""
 # =========================
 st.markdown('<div class="enhanced-card fade-in">', unsafe_allow_html=True)
 st.markdown("### 📈 EXECUTIVE DASHBOARD")
+if estimate is not None:
+    st.caption(
+        f"⏱️ Estimated from a {estimate['fraction'] * 100:g}% {SAMPLE_KIND} sample ({estimate['sampled_rows']:,} records) "
+        "with 95% confidence intervals; exact figures replace them when the full count finishes"
+    )
 
-total_records = len(df)
-processed_records = df["IMAGE_VERIFY_CODE_PITC"].notna().sum()
-successful_records = df["IMAGE_VERIFY_CODE_PITC"].isin(['A', 'C', 'D']).sum()
-image_issues = (df["IMAGE_VERIFY_CODE_PITC"] == 'E').sum()
-perfect_matches = (df["IMAGE_VERIFY_CODE_PITC"] == 'A').sum()
+processed_records = summary["processed_records"]
+successful_records = summary["successful_records"]
+image_issues = summary["image_issues"]
+perfect_matches = summary["perfect_matches"]
 
-processing_rate = (processed_records / total_records * 100) if total_records > 0 else 0
-success_rate = (successful_records / processed_records * 100) if processed_records > 0 else 0
-perfect_match_rate = (perfect_matches / processed_records * 100) if processed_records > 0 else 0
-image_issue_rate = (image_issues / processed_records * 100) if processed_records > 0 else 0
+processing_rate = summary["processing_rate"]
+success_rate = summary["success_rate"]
+perfect_match_rate = summary["perfect_match_rate"]
+image_issue_rate = summary["image_issue_rate"]
+
+def kpi_interval(name, percent=True):
+    """95% confidence interval line of an estimated KPI card (nothing for exact figures).
+
+    Written on the label's line: an empty line inside the card would end the
+    HTML block, and markdown would render the rest of the card as code.
+    """
+    if estimate is None:
+        return ""
+    low, high = estimate["intervals"][name]
+    bounds = f"{low:.1f}% – {high:.1f}%" if percent else f"{low:,.0f} – {high:,.0f}"
+    return f'<div class="kpi-interval">95% CI {bounds}</div>'
+
+# Estimated values are marked as approximate
+approx = "≈" if estimate is not None else ""
 
 kpi_cols = st.columns(5)
 
@@ -603,8 +694,8 @@ with kpi_cols[0]:
     st.markdown(f"""
     <div class="enhanced-kpi blue">
         <div class="kpi-icon">📊</div>
-        <div class="kpi-value">{total_records:,}</div>
-        <div class="kpi-label">Total Records</div>
+        <div class="kpi-value">{approx}{total_records:,}</div>
+        <div class="kpi-label">Total Records</div>{kpi_interval('total_records', percent=False)}
         <div class="kpi-trend">
             <span>⚡</span>
             <span>{processing_rate:.1f}% processed</span>
@@ -616,8 +707,8 @@ with kpi_cols[1]:
     st.markdown(f"""
     <div class="enhanced-kpi green">
         <div class="kpi-icon">✅</div>
-        <div class="kpi-value">{success_rate:.1f}%</div>
-        <div class="kpi-label">Success Rate (A,C,D)</div>
+        <div class="kpi-value">{approx}{success_rate:.1f}%</div>
+        <div class="kpi-label">Success Rate (A,C,D)</div>{kpi_interval('success_rate')}
         <div class="kpi-trend">
             <span>📈</span>
             <span>{successful_records:,} successful</span>
@@ -629,8 +720,8 @@ with kpi_cols[2]:
     st.markdown(f"""
     <div class="enhanced-kpi purple">
         <div class="kpi-icon">🤖</div>
-        <div class="kpi-value">{ocr_accuracy['accuracy']:.1f}%</div>
-        <div class="kpi-label">OCR Model Accuracy</div>
+        <div class="kpi-value">{approx}{ocr_accuracy['accuracy']:.1f}%</div>
+        <div class="kpi-label">OCR Model Accuracy</div>{kpi_interval('ocr_accuracy')}
         <div class="kpi-trend">
             <span>🎯</span>
             <span>A vs N only</span>
@@ -642,8 +733,8 @@ with kpi_cols[3]:
     st.markdown(f"""
     <div class="enhanced-kpi orange">
         <div class="kpi-icon">⭐</div>
-        <div class="kpi-value">{perfect_match_rate:.1f}%</div>
-        <div class="kpi-label">Perfect Match (A)</div>
+        <div class="kpi-value">{approx}{perfect_match_rate:.1f}%</div>
+        <div class="kpi-label">Perfect Match (A)</div>{kpi_interval('perfect_match_rate')}
         <div class="kpi-trend">
             <span>🎯</span>
             <span>{perfect_matches:,} perfect</span>
@@ -655,8 +746,8 @@ with kpi_cols[4]:
     st.markdown(f"""
     <div class="enhanced-kpi red">
         <div class="kpi-icon">🖼️</div>
-        <div class="kpi-value">{image_issue_rate:.1f}%</div>
-        <div class="kpi-label">Image Issues (E)</div>
+        <div class="kpi-value">{approx}{image_issue_rate:.1f}%</div>
+        <div class="kpi-label">Image Issues (E)</div>{kpi_interval('image_issue_rate')}
         <div class="kpi-trend">
             <span>⚠️</span>
             <span>{image_issues:,} records</span>
@@ -712,11 +803,10 @@ st.markdown('</div>', unsafe_allow_html=True)
 st.markdown('<div class="enhanced-card fade-in">', unsafe_allow_html=True)
 st.markdown("### 🏷️ FLAG CLASSIFICATION DISTRIBUTION")
 
-flag_counts = df["IMAGE_VERIFY_CODE_PITC"].value_counts()
 flag_cols = st.columns(5)
 
-for idx, flag in enumerate(['A', 'C', 'D', 'E', 'N']):
-    count = flag_counts.get(flag, 0)
+for idx, flag in enumerate(FLAG_CODES):
+    count = flag_totals.get(flag, 0)
     with flag_cols[idx]:
         if processed_records > 0:
             percentage = (count / processed_records * 100)
@@ -750,152 +840,403 @@ for idx, flag in enumerate(['A', 'C', 'D', 'E', 'N']):
         """, unsafe_allow_html=True)
 
 st.markdown('</div>', unsafe_allow_html=True)
+summary_render.stop()
+
+# =========================
+# LOAD RECORDS
+# =========================
+# In aggregate mode records stay in Oracle: Record Explorer pages are fetched from the database, and
+# every record is only held in memory when asked for (or offline, from the bounded sample records). Never
+# while estimating: the estimate is there to avoid full scans until the exact counts are cached.
+if aggregate_mode:
+    df = None
+    if not estimating and (st.session_state.get("explorer_in_memory", False) or data_source != SOURCE_DATABASE):
+        with st.spinner(f"🚀 Loading records for {disco_choice}..."), stage("load", part="records"):
+            df = load_records(disco_code, on_progress=show_load_progress, month_range=month_range)
+load_progress.empty()
+
+with record_status_slot:
+    if data_source != SOURCE_DATABASE:
+        st.warning("⚠️ Using sample data")
+    elif df is not None:
+        st.success(f"✅ Database: {get_record_status(disco_code, month_range)['rows']:,} records in memory")
+    else:
+        st.success(f"✅ Database: {'≈' if estimating else ''}{total_records:,} records, counted in Oracle")
 
 # =========================
 # BATCH ANALYTICS TAB
 # =========================
-tab1, tab2 = st.tabs(["📦 BATCH ANALYTICS", "🔍 RECORD EXPLORER"])
+tab1, tab2, tab3, tab4 = st.tabs(["📦 BATCH ANALYTICS", "🔍 RECORD EXPLORER", "📈 TRENDS", "🧭 DRILL-DOWN"])
 
-with tab1:
-    col1, col2 = st.columns([3, 2])
-    
-    with col1:
-        st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
-        st.markdown("### 📊 BATCH PERFORMANCE")
-        
-        selected_batch = st.selectbox(
-            "Select Batch for Details:",
-            options=["All Batches"] + sorted(batch_stats["Batch ID"].tolist())
-        )
+# Tabs render one after another, so each is timed as its own section
+with tab1, stage("render", section="batch_analytics"):
+    if batch_stats.empty:
+        st.info("No batches in the selected bill months")
+    else:
+        col1, col2 = st.columns([3, 2])
         
-        if selected_batch != "All Batches":
-            batch_data = batch_stats[batch_stats["Batch ID"] == selected_batch].iloc[0]
+        with col1:
+            st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
+            st.markdown("### 📊 BATCH PERFORMANCE")
             
-            metric_cols = st.columns(4)
-            with metric_cols[0]:
-                st.metric("Total Records", f"{batch_data['Total Records']:,}")
-            with metric_cols[1]:
-                st.metric("Processed", f"{batch_data['Processed']:,}")
-            with metric_cols[2]:
-                st.metric("Success Rate", f"{batch_data['Success Rate (A,C,D)']:.1f}%")
-            with metric_cols[3]:
-                st.metric("OCR Accuracy", f"{batch_data['OCR Model Accuracy (A vs N)']:.1f}%")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
-        st.markdown("### 📈 BATCH COMPARISON")
-        
-        fig = go.Figure(data=[
-            go.Bar(
-                x=batch_stats["Batch ID"],
-                y=batch_stats["Success Rate (A,C,D)"],
-                name='Success Rate',
-                marker_color=batch_stats["Success Rate (A,C,D)"].apply(
-                    lambda x: 'var(--success-green)' if x >= 70 else 
-                             'var(--warning-orange)' if x >= 50 else 'var(--danger-red)'
+            selected_batch = st.selectbox(
+                "Select Batch for Details:",
+                options=["All Batches"] + sorted(batch_stats["Batch ID"].tolist())
+            )
+            
+            if selected_batch != "All Batches":
+                batch_data = batch_stats[batch_stats["Batch ID"] == selected_batch].iloc[0]
+                
+                metric_cols = st.columns(4)
+                with metric_cols[0]:
+                    st.metric("Total Records", f"{batch_data['Total Records']:,}")
+                with metric_cols[1]:
+                    st.metric("Processed", f"{batch_data['Processed']:,}")
+                with metric_cols[2]:
+                    st.metric("Success Rate", f"{batch_data['Success Rate (A,C,D)']:.1f}%")
+                with metric_cols[3]:
+                    st.metric("OCR Accuracy", f"{batch_data['OCR Model Accuracy (A vs N)']:.1f}%")
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+            
+            st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
+            st.markdown("### 📈 BATCH COMPARISON")
+            
+            fig = go.Figure(data=[
+                go.Bar(
+                    x=batch_stats["Batch ID"],
+                    y=batch_stats["Success Rate (A,C,D)"],
+                    name='Success Rate',
+                    marker_color=batch_stats["Success Rate (A,C,D)"].apply(
+                        lambda x: 'var(--success-green)' if x >= 70 else 
+                                 'var(--warning-orange)' if x >= 50 else 'var(--danger-red)'
+                    )
                 )
+            ])
+            
+            fig.update_layout(
+                height=400,
+                xaxis_title="Batch ID",
+                yaxis_title="Success Rate (%)",
+                showlegend=False
             )
-        ])
-        
-        fig.update_layout(
-            height=400,
-            xaxis_title="Batch ID",
-            yaxis_title="Success Rate (%)",
-            showlegend=False
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
-        st.markdown("### 🏆 TOP 5 PERFORMING BATCHES")
-        
-        top_batches = batch_stats.nlargest(5, 'Success Rate (A,C,D)')
+            
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
         
-        for idx, (_, batch) in enumerate(top_batches.iterrows(), 1):
-            medal = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"][idx-1]
+        with col2:
+            st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
+            st.markdown("### 🏆 TOP 5 PERFORMING BATCHES")
+            
+            top_batches = batch_stats.nlargest(5, 'Success Rate (A,C,D)')
             
-            st.markdown(f"""
-            <div style="
-                background: linear-gradient(135deg, var(--success-green)15, transparent);
-                border-radius: 10px;
-                padding: 15px;
-                margin: 10px 0;
-                border-left: 4px solid var(--success-green);
-            ">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <div style="display: flex; align-items: center; gap: 10px;">
-                        <span style="font-size: 20px;">{medal}</span>
-                        <div>
-                            <strong>{batch['Batch ID']}</strong><br>
-                            <small style="color: var(--medium-gray);">{batch['DISCO']}</small>
+            for idx, (_, batch) in enumerate(top_batches.iterrows(), 1):
+                medal = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"][idx-1]
+                
+                st.markdown(f"""
+                <div style="
+                    background: linear-gradient(135deg, var(--success-green)15, transparent);
+                    border-radius: 10px;
+                    padding: 15px;
+                    margin: 10px 0;
+                    border-left: 4px solid var(--success-green);
+                ">
+                    <div style="display: flex; justify-content: space-between; align-items: center;">
+                        <div style="display: flex; align-items: center; gap: 10px;">
+                            <span style="font-size: 20px;">{medal}</span>
+                            <div>
+                                <strong>{batch['Batch ID']}</strong><br>
+                                <small style="color: var(--medium-gray);">{batch['DISCO']}</small>
+                            </div>
+                        </div>
+                        <div style="
+                            background: var(--success-green);
+                            color: white;
+                            padding: 6px 12px;
+                            border-radius: 15px;
+                            font-weight: 700;
+                        ">
+                            {batch['Success Rate (A,C,D)']:.1f}%
                         </div>
-                    </div>
-                    <div style="
-                        background: var(--success-green);
-                        color: white;
-                        padding: 6px 12px;
-                        border-radius: 15px;
-                        font-weight: 700;
-                    ">
-                        {batch['Success Rate (A,C,D)']:.1f}%
                     </div>
                 </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+            
+            st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
+            st.markdown("### 📋 ALL BATCHES SUMMARY")
+            
+            display_stats = batch_stats[["Batch ID", "DISCO", "Total Records", "Success Rate (A,C,D)", "OCR Model Accuracy (A vs N)"]]
+            st.dataframe(display_stats, use_container_width=True, height=300)
+            
+            render_export(
+                "batch_report",
+                "Batch Report",
+                (disco_code, month_range, aggregate_mode, get_record_version(disco_code), total_records),
+                "batch_report",
+                lambda: [batch_stats]
+            )
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+
+with tab2, stage("render", section="record_explorer"):
+    st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
+    st.markdown("### 🔍 RECORD EXPLORER")
+    
+    if aggregate_mode and data_source == SOURCE_DATABASE:
+        # Read at the top of the next run (see LOAD RECORDS); off, no record is held in this process
+        st.toggle(
+            "📦 Load records into memory",
+            value=False,
+            key="explorer_in_memory",
+            help="Hold every record of the selected DISCO and bill months in memory for Contains search, sorting "
+                 "and filtered exports; otherwise each page is fetched from Oracle"
+        )
+    
+    search_col1, search_col2 = st.columns([3, 1])
+    with search_col1:
+        search_query = st.text_input(
+            "Search records:",
+            placeholder="Search by REF_DIGITS, DISCO, BATCH..." if df is not None else "REF_DIGITS starts with..."
+        )
+    with search_col2:
+        search_modes = {"⚡ Starts with": SEARCH_PREFIX, "🐢 Contains": SEARCH_CONTAINS}
+        search_mode = search_modes[st.radio(
+            "Match:",
+            list(search_modes),
+            horizontal=True,
+            disabled=df is None,
+            help="Starts with uses the search index; Contains scans every REF_DIGITS value"
+        )]
+    if df is None:
+        # Oracle pages match a REF_DIGITS prefix only
+        search_mode = SEARCH_PREFIX
+    
+    display_columns = ["REF_DIGITS", "DISCO_NAME", "BATCH_ID", "IMAGE_VERIFY_CODE_PITC", "ACCURACY_CATEGORY"]
+    
+    page_col1, page_col2, page_col3, page_col4 = st.columns(4)
+    with page_col1:
+        sort_by = st.selectbox("Sort by:", ["Record order"] + SORT_COLUMNS, disabled=df is None)
+    with page_col2:
+        page_size = st.selectbox("Rows per page:", EXPLORER_PAGE_SIZES, index=1)
+    with page_col3:
+        descending = st.toggle("Descending", value=False, disabled=df is None)
+    with page_col4:
+        # Without records in memory every page comes from Oracle
+        database_paging = st.toggle(
+            "🗄️ Page from database",
+            value=df is None,
+            disabled=df is None,
+            help="Fetch each page from Oracle, keyset-paginated on REF_DIGITS and ROWID (REF_DIGITS prefix search only)"
+        )
+    
+    matched_rows = None
+    page_df = None
+    keyset = None
+    if database_paging:
+        ref_prefix = search_query.strip() or None
+        keyset = _keyset_state((disco_code, month_range, ref_prefix, page_size))
+        try:
+            page_records, keyset["last_key"] = cached_record_page(
+                disco_code, ref_prefix, keyset["starts"][-1], page_size, month_range
+            )
+            # The full COUNT(*) waits for the exact counts, like every other scan
+            total_found = None if estimating else count_records(disco_code, ref_prefix, month_range)
+            page_df = page_records.frame(display_columns)
+            page_label = f"Page {len(keyset['starts'])}" + (
+                "" if total_found is None else f" of {max(1, -(-total_found // page_size)):,}"
+            ) + " · by REF_DIGITS"
+        except Exception:
+            keyset = None
+            if df is None:
+                st.warning("⚠️ Database paging unavailable; load the records into memory to page them here")
+            else:
+                st.warning("⚠️ Database paging unavailable, paging the cached records instead")
+    
+    if page_df is None and df is not None:
+        if search_query.strip():
+            matched_rows = load_search_index(disco_code, month_range).search(search_query, search_mode)
         
-        st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
-        st.markdown("### 📋 ALL BATCHES SUMMARY")
+        total_found = len(df) if matched_rows is None else len(matched_rows)
+        page_count = max(1, -(-total_found // page_size))
+        page = st.number_input(
+            "Page:",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            step=1,
+            # A new search or page size starts again from page 1
+            key=f"explorer_page_{search_query}_{search_mode}_{page_size}_{page_count}_{month_range}"
+        )
+        start = (int(page) - 1) * page_size
         
-        display_stats = batch_stats[["Batch ID", "DISCO", "Total Records", "Success Rate (A,C,D)", "OCR Model Accuracy (A vs N)"]]
-        st.dataframe(display_stats, use_container_width=True, height=300)
+        if sort_by in SORT_COLUMNS:
+            ordered_rows = load_search_index(disco_code, month_range).sorted_rows(
+                sort_by, matched_rows, descending
+            )
+            page_rows = ordered_rows[start:start + page_size]
+        elif matched_rows is not None:
+            page_rows = (matched_rows[::-1] if descending else matched_rows)[start:start + page_size]
+        elif descending:
+            page_rows = np.arange(len(df) - 1 - start, max(len(df) - 1 - start - page_size, -1), -1)
+        else:
+            page_rows = slice(start, start + page_size)
         
-        batch_csv_data = batch_stats.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Download Batch Report",
-            data=batch_csv_data,
-            file_name="batch_report.csv",
-            mime="text/csv",
-            use_container_width=True
+        # Only the current page is materialized and sent to the browser
+        page_df = df.frame(display_columns, rows=page_rows)
+        page_label = f"Page {int(page):,} of {page_count:,}"
+    
+    if page_df is not None:
+        st.metric("Found Records", "…" if total_found is None else f"{total_found:,}")
+        st.dataframe(page_df, use_container_width=True, height=400, hide_index=True)
+    
+    if keyset is not None:
+        nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+        with nav_col1:
+            st.button(
+                "◀ Previous",
+                on_click=_previous_keyset_page,
+                args=(keyset,),
+                disabled=len(keyset["starts"]) == 1,
+                use_container_width=True
+            )
+        with nav_col2:
+            st.caption(page_label)
+        with nav_col3:
+            st.button(
+                "Next ▶",
+                on_click=_next_keyset_page,
+                args=(keyset,),
+                disabled=keyset["last_key"] is None,
+                use_container_width=True
+            )
+    elif page_df is not None:
+        st.caption(page_label)
+    
+    export_sources = {"🗄️ Full DISCO table (database)": "database"}
+    if df is not None:
+        export_sources = {"📦 Filtered records": "cached", **export_sources}
+    export_source = export_sources[st.radio(
+        "Export:",
+        list(export_sources),
+        horizontal=True,
+        help="The database export streams every record of the DISCO from Oracle (search box = REF_DIGITS prefix)"
+    )]
+    
+    if export_source == "database":
+        ref_prefix = search_query.strip() or None
+        render_export(
+            "database_records",
+            "DISCO Records",
+            (disco_code, month_range, ref_prefix),
+            "disco_records",
+            lambda: iter_database_export(disco_code, ref_prefix, month_range)
+        )
+    else:
+        render_export(
+            "filtered_records",
+            "Filtered Data",
+            (disco_code, month_range, get_record_version(disco_code), search_query, search_mode),
+            "filtered_records",
+            lambda: iter_record_chunks(df, matched_rows)
         )
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-
-with tab2:
-    st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
-    st.markdown("### 🔍 RECORD EXPLORER")
     
-    search_query = st.text_input(
-        "Search records:",
-        placeholder="Search by REF_DIGITS, DISCO, BATCH..."
-    )
+    if df is not None:
+        with st.expander("💾 In-memory footprint"):
+            footprint = df.memory_usage()
+            footprint["MB"] = footprint["Bytes"] / 1024 ** 2
+            st.dataframe(footprint[["Storage", "MB"]], use_container_width=True)
+            st.caption(f"Cached record store: {footprint['MB'].sum():,.1f} MB for {len(df):,} records")
     
-    filtered_df = df.copy()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+with tab3, stage("render", section="trends"):
+    st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
+    st.markdown("### 📈 MONTH-OVER-MONTH TRENDS")
     
-    if search_query:
-        filtered_df = filtered_df[
-            filtered_df["REF_DIGITS"].str.contains(search_query, case=False, na=False) |
-            filtered_df["DISCO_NAME"].str.contains(search_query, case=False, na=False) |
-            filtered_df["BATCH_ID"].str.contains(search_query, case=False, na=False)
-        ]
+    if estimating:
+        st.info("⏳ Trends appear once the exact counts have loaded")
+    else:
+        # Every bill month, from the per-month trend kept beside the aggregates
+        trend = trend_rates(load_disco_trend(disco_code), by="DISCO_NAME")
+        
+        if trend.empty:
+            st.info("No dated records to trend yet")
+        else:
+            trend_col1, trend_col2 = st.columns(2)
+            for trend_col, metric in [
+                (trend_col1, "OCR Model Accuracy (A vs N)"),
+                (trend_col2, "Processing Rate")
+            ]:
+                with trend_col:
+                    fig = px.line(trend, x="BILMONTH", y=metric, color="DISCO_NAME", markers=True)
+                    fig.update_layout(
+                        height=400,
+                        xaxis_title="Bill Month",
+                        yaxis_title=f"{metric} (%)",
+                        legend_title="DISCO"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            # Latest month against the one before, worst accuracy drop first
+            latest = trend.groupby("DISCO_NAME").tail(1).sort_values("OCR Accuracy Change")
+            st.markdown("#### 🔔 LATEST MONTH VS PREVIOUS")
+            st.dataframe(
+                latest[["DISCO_NAME", "BILMONTH", "Total Records", "Success Rate (A,C,D)",
+                        "OCR Model Accuracy (A vs N)", "OCR Accuracy Change"]],
+                use_container_width=True,
+                hide_index=True
+            )
     
-    st.metric("Found Records", f"{len(filtered_df):,}")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+with tab4, stage("render", section="drill_down"):
+    st.markdown('<div class="enhanced-card">', unsafe_allow_html=True)
+    st.markdown("### 🧭 DRILL-DOWN")
+    st.caption("DISCO → Batch → Sub-division from pre-aggregated counts; records are only fetched for a sub-division")
     
-    display_columns = ["REF_DIGITS", "DISCO_NAME", "BATCH_ID", "IMAGE_VERIFY_CODE_PITC", "ACCURACY_CATEGORY"]
-    st.dataframe(filtered_df[display_columns], use_container_width=True, height=400)
-    
-    filtered_csv_data = filtered_df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="📥 Download Filtered Data",
-        data=filtered_csv_data,
-        file_name="filtered_records.csv",
-        mime="text/csv",
-        use_container_width=True
-    )
+    if estimating:
+        st.info("⏳ The drill-down appears once the exact counts have loaded")
+    else:
+        cube = load_rollup_cube(disco_code)
+        drill_path = () if disco_code is None else (DISCO_MAP[disco_code],)
+        drill_columns = ["Total Records", "Processed", "Success Rate (A,C,D)", "OCR Model Accuracy (A vs N)",
+                         "A", "C", "D", "E", "N", "Pending"]
+        
+        for level in ROLLUP_LEVELS[len(drill_path):]:
+            children = cube.children(drill_path, month_range)
+            st.markdown(f"#### {ROLLUP_LABELS[level]}" + (f" · {' / '.join(drill_path)}" if drill_path else ""))
+            st.dataframe(children[[level] + drill_columns], use_container_width=True, hide_index=True)
+            
+            expand = st.selectbox(
+                f"Expand {ROLLUP_LABELS[level]}:",
+                ["—"] + children[level].astype(str).tolist(),
+                key=f"drill_{level}_{'/'.join(drill_path)}"
+            )
+            if expand == "—":
+                break
+            drill_path = drill_path + (expand,)
+        
+        if drill_path:
+            st.markdown(f"#### 🗓️ By bill month · {' / '.join(drill_path)}")
+            node_months = cube.months(drill_path, month_range)
+            st.dataframe(node_months[["BILMONTH"] + drill_columns], use_container_width=True, hide_index=True)
+        
+        if len(drill_path) == len(ROLLUP_LEVELS) and st.toggle("📄 Show sub-division records", value=False):
+            # The leaf's records share its REF_DIGITS prefix; fetched only now, from Oracle when reachable
+            sub_div = drill_path[-1]
+            try:
+                leaf_records, _ = cached_record_page(sub_div[2:4], sub_div, None, LEAF_RECORD_ROWS, month_range)
+            except Exception:
+                leaf_records = None
+                if df is not None:
+                    leaf_records = df.take(load_search_index(disco_code, month_range).search(sub_div)[:LEAF_RECORD_ROWS])
+            if leaf_records is None:
+                st.warning("⚠️ Sub-division records unavailable from the database")
+            else:
+                st.dataframe(leaf_records.frame(display_columns), use_container_width=True, hide_index=True)
+                st.caption(f"First {len(leaf_records):,} records of sub-division {sub_div}")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -921,7 +1262,7 @@ st.markdown(f"""
             🏢 <strong>DISCO:</strong> {disco_choice}
         </div>
         <div>
-            📊 <strong>Records:</strong> {len(df):,}
+            📊 <strong>Records:</strong> {total_records:,}
         </div>
     </div>
     <div style="margin-top: 10px; font-size: 11px; opacity: 0.7;">
@@ -929,3 +1270,81 @@ st.markdown(f"""
     </div>
 </div>
 """, unsafe_allow_html=True)
+
+# =========================
+# DIAGNOSTICS
+# =========================
+finish_run(page_run, disco=disco_code or "ALL", aggregate_mode=aggregate_mode, estimating=estimating)
+
+if diagnostics_panel is not None:
+    with diagnostics_panel:
+        stages = page_run.stage_table()
+        st.caption(f"Run {page_run.run_id} · {page_run.seconds * 1000:,.0f} ms · {len(stages)} timed stages")
+        
+        # Nested stages overlap (a load includes its queries), so totals are per stage type
+        stage_totals = stages.groupby("stage", sort=False)["seconds"].sum()
+        st.dataframe(
+            stage_totals.mul(1000).round(1).rename("ms").reset_index(),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.dataframe(
+            stages.assign(ms=stages["seconds"].mul(1000).round(1)).drop(columns="seconds"),
+            use_container_width=True,
+            hide_index=True,
+            height=250
+        )
+        
+        lookups = sum(page_run.cache.values())
+        hits = sum(value for (cache, result), value in page_run.cache.items() if result == "hit")
+        st.caption(f"💾 Cache: {hits} of {lookups} lookups hit")
+        
+        st.download_button(
+            "⬇️ Prometheus metrics",
+            prometheus_text(),
+            file_name="ocr_metrics.prom",
+            mime="text/plain",
+            use_container_width=True
+        )
+        st.download_button(
+            "⬇️ This run (JSON)",
+            json.dumps(page_run.to_dict(), default=str),
+            file_name=f"ocr_run_{page_run.run_id}.json",
+            mime="application/json",
+            use_container_width=True
+        )
+        
+        # Every statement sent to Oracle, newest first, with its SQL_ID as shown in V$SQL
+        st.markdown("#### 🐢 RECENT SQL")
+        statements = recent_statements()
+        if not statements:
+            st.caption("No statement has reached Oracle yet")
+        else:
+            st.dataframe(statement_table(statements), use_container_width=True, hide_index=True, height=250)
+            st.caption(
+                f"Statements over {SLOW_QUERY_SECONDS:g}s are logged to {SLOW_QUERY_LOG}"
+                if SLOW_QUERY_LOG else f"Slow-query log off (threshold {SLOW_QUERY_SECONDS:g}s)"
+            )
+            
+            # Latest run of each distinct statement
+            statement_choices = {}
+            for profile in statements:
+                statement_choices.setdefault(f"{profile.sql_id} · {profile.query} · {profile.disco}", profile)
+            statement = statement_choices[st.selectbox("Statement:", list(statement_choices))]
+            st.code(statement.sql_text.strip(), language="sql")
+            if statement.binds:
+                st.caption("Binds (redacted): " + ", ".join(f":{name} {kind}" for name, kind in statement.binds.items()))
+            
+            if st.button("🔎 Explain (DBMS_XPLAN)", use_container_width=True):
+                try:
+                    st.code(explain_statement(statement.sql_text, statement.sql_id), language="text")
+                except Exception as e:
+                    st.warning(f"⚠️ Could not explain: {e}")
+
+# =========================
+# PROGRESSIVE MODE
+# =========================
+# Rerun until the background load has cached the exact counts, which then replace the estimate
+if estimating:
+    time.sleep(ESTIMATE_POLL_SECONDS)
+    st.rerun()
@@ -0,0 +1,177 @@
+# =========================
+# BENCHMARK - DASHBOARD DATA PIPELINE, STAGE BY STAGE
+# =========================
+# Usage: python benchmarks/bench_pipeline.py [--rows 10000 1000000 10000000]
+#            [--output results.json] [--baseline benchmarks/baseline.json]
+#            [--update-baseline] [--tolerance 0.5]
+#
+# Runs offline on synthetic data: no Oracle, no browser, no Streamlit page.
+# Prints one JSON document with wall time and peak traced memory per
+# (rows, stage). With --baseline, stages slower or hungrier than the baseline
+# by more than --tolerance (and the noise floors below) are listed as
+# regressions and the exit status is 1.
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_dashboard import (
+    RecordSearchIndex,
+    aggregate_records,
+    calculate_ocr_model_accuracy,
+    compact_chunks,
+    generate_raw_records,
+    generate_records,
+    get_batch_statistics,
+    summarize_counts,
+    summarize_records
+)
+
+DEFAULT_ROWS = [10_000, 1_000_000, 10_000_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Same as the app's default FETCH_CHUNK_SIZE
+LOAD_CHUNK_ROWS = 50_000
+
+# Differences below these never count as regressions (timer / allocator noise)
+MIN_SECONDS_DELTA = 0.05
+MIN_PEAK_MB_DELTA = 5.0
+
+SEARCH_QUERIES = ["01", "0111", "01151", "LESCO", "09-2"]
+PAGE_SIZE = 50
+
+
+def measure(func):
+    """Run func once; returns (result, seconds, peak traced MB)"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        result = func()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / 1024 ** 2
+
+
+def load_stage(rows):
+    """The loader's compaction path: raw cursor-sized chunks -> one CompactRecords"""
+    pool = [generate_raw_records(LOAD_CHUNK_ROWS, seed=seed) for seed in range(4)]
+    chunk_count, remainder = divmod(rows, LOAD_CHUNK_ROWS)
+
+    def chunks():
+        for index in range(chunk_count):
+            yield pool[index % len(pool)]
+        if remainder:
+            yield pool[0].iloc[:remainder]
+
+    return lambda: compact_chunks(chunks(), on_chunk=lambda loaded, processed: None)
+
+
+def run_size(rows, seed=0):
+    """Time every pipeline stage for one data size"""
+    results = []
+
+    def stage(name, func):
+        value, seconds, peak_mb = measure(func)
+        results.append({"rows": rows, "stage": name, "seconds": round(seconds, 4), "peak_mb": round(peak_mb, 2)})
+        return value
+
+    stage("load_compact_chunks", load_stage(rows))
+    records = stage("generate_records", lambda: generate_records(rows, seed=seed))
+
+    # First access derives and memoizes the columns later stages read
+    stage("derive_columns", lambda: records[["DISCO_NAME", "BATCH_ID", "ACCURACY_CATEGORY"]])
+    stage("batch_statistics", lambda: get_batch_statistics(records))
+    stage("ocr_accuracy", lambda: calculate_ocr_model_accuracy(records))
+    stage("kpi_summary_records", lambda: summarize_records(records))
+    counts = stage("aggregate_records", lambda: aggregate_records(records))
+    stage("kpi_summary_counts", lambda: summarize_counts(counts))
+
+    index = stage("search_index_build", lambda: RecordSearchIndex(records))
+    matches = stage("search_prefix", lambda: [index.search(query) for query in SEARCH_QUERIES])
+    stage("explorer_sorted_page", lambda: records.frame(
+        ["REF_DIGITS", "DISCO_NAME", "BATCH_ID", "IMAGE_VERIFY_CODE_PITC", "ACCURACY_CATEGORY"],
+        rows=index.sorted_rows("BATCH_ID", matches[0], descending=True)[:PAGE_SIZE]
+    ))
+    stage("search_contains", lambda: index.search(SEARCH_QUERIES[1], "contains"))
+
+    return results
+
+
+def environment():
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Stages worse than the baseline beyond tolerance and the noise floors"""
+    expected = {(entry["rows"], entry["stage"]): entry for entry in baseline["results"]}
+    regressions = []
+
+    for entry in results:
+        base = expected.get((entry["rows"], entry["stage"]))
+        if base is None:
+            continue
+        for metric, floor in [("seconds", MIN_SECONDS_DELTA), ("peak_mb", MIN_PEAK_MB_DELTA)]:
+            delta = entry[metric] - base[metric]
+            if delta > floor and entry[metric] > base[metric] * (1 + tolerance):
+                regressions.append({
+                    "rows": entry["rows"],
+                    "stage": entry["stage"],
+                    "metric": metric,
+                    "baseline": base[metric],
+                    "current": entry[metric]
+                })
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard data pipeline on synthetic data")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="compare against this report (see benchmarks/baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true", help=f"write the report to {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown/growth (0.5 = +50%%)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for rows in args.rows:
+        results.extend(run_size(rows, args.seed))
+
+    report = {"environment": environment(), "results": results}
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            report["regressions"] = compare(results, json.load(handle), args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    for path in [args.output, DEFAULT_BASELINE if args.update_baseline else None]:
+        if path:
+            with open(path, "w") as handle:
+                handle.write(text + "\n")
+
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
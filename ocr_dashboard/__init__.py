@@ -0,0 +1,47 @@
+# =========================
+# OCR DASHBOARD - DATA PIPELINE (importable without the Streamlit page)
+# =========================
+# Pure compute is re-exported here. The Oracle-backed layer is imported from
+# its modules (ocr_dashboard.config, .database, .store) so the compute side
+# works without a database driver configured.
+from .constants import (
+    DISCO_MAP,
+    UNKNOWN_DISCO,
+    FLAG_CODES,
+    SUCCESS_FLAGS,
+    PROCESSING_STATUSES,
+    ACCURACY_CATEGORIES
+)
+from .enrichment import enrich_records
+from .compact import CompactRecords, RECORD_COLUMNS, encode_ref_digits, decode_ref_digits
+from .statistics import (
+    aggregate_records,
+    get_flag_totals,
+    get_batch_statistics,
+    get_batch_statistics_from_counts,
+    calculate_ocr_model_accuracy,
+    calculate_ocr_model_accuracy_from_counts,
+    kpi_rates
+)
+from .incremental import high_water_mark, merge_counts_since
+from .summary import build_summary, summarize_counts, summarize_records
+from .search import RecordSearchIndex, SEARCH_PREFIX, SEARCH_CONTAINS, SORT_COLUMNS
+from .export import (
+    EXPORT_FORMATS,
+    available_formats,
+    iter_record_chunks,
+    write_export,
+    export_to_tempfile,
+    prune_exports
+)
+from .synthetic import generate_records, generate_raw_records, DEFAULT_FLAG_PROBABILITIES
+from .loading import compact_chunks, fold_flag_counts, fold_record_counts
+from .trend import month_trend, trend_rates
+from .rollup import RollupCube, ROLLUP_LEVELS
+from .estimate import (
+    EmptySampleError,
+    wilson_interval,
+    scale_sample_counts,
+    sample_record_counts,
+    estimate_from_sample
+)
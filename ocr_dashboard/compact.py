@@ -0,0 +1,251 @@
+# =========================
+# COMPACT RECORDS - COLUMNAR STORE WITH LAZILY DERIVED COLUMNS
+# =========================
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .enrichment import (
+    SUB_DIV_WIDTH,
+    _prefix_categorical,
+    derive_disco_code,
+    derive_disco_name,
+    derive_batch_no,
+    derive_batch_id,
+    derive_processing_status,
+    derive_accuracy_category
+)
+
+# Same column order enrich_records produces
+RECORD_COLUMNS = [
+    "REF_DIGITS",
+    "DISCO_CODE",
+    "BILMONTH",
+    "IMAGE_VERIFY_CODE_PITC",
+    "DISCO_NAME",
+    "BATCH_NO",
+    "SUB_DIV",
+    "BATCH_ID",
+    "PROCESSING_STATUS",
+    "ACCURACY_CATEGORY"
+]
+
+# int64 holds any 18-digit number
+MAX_KEY_DIGITS = 18
+
+
+def encode_ref_digits(values):
+    """REF_DIGITS as (int64 keys, common width), or None unless all are equal-width digit strings"""
+    values = np.asarray(values, dtype=object)
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64), 0
+    if pd.isna(values).any():
+        return None
+
+    try:
+        raw = values.astype("S")
+    except (UnicodeEncodeError, TypeError):
+        return None
+    width = raw.dtype.itemsize
+    if width == 0 or width > MAX_KEY_DIGITS:
+        return None
+
+    # Shorter strings are NUL padded, so this also rejects mixed widths
+    digits = raw.view(np.uint8).reshape(-1, width)
+    if ((digits < ord('0')) | (digits > ord('9'))).any():
+        return None
+
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (digits - ord('0')).astype(np.int64) @ powers, width
+
+
+def decode_ref_digits(keys, width):
+    """Zero-padded REF_DIGITS strings for int64 keys"""
+    keys = np.asarray(keys, dtype=np.int64)
+    if width == 0:
+        return np.empty(len(keys), dtype=object)
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    digits = (keys[:, None] // powers % 10 + ord('0')).astype(np.uint8)
+    return np.ascontiguousarray(digits).view(f"S{width}").ravel().astype(f"U{width}").astype(object)
+
+
+def _readonly(values):
+    """Same values with the backing buffer marked read-only (no copy)"""
+    if values is None:
+        return None
+    if isinstance(values, pd.Categorical):
+        # codes is already a read-only view; rebuilding around it drops the writable owner
+        return pd.Categorical.from_codes(values.codes, dtype=values.dtype)
+    values.setflags(write=False)
+    return values
+
+
+def _union_categoricals(parts):
+    try:
+        return union_categoricals(parts, sort_categories=True)
+    except TypeError:
+        # e.g. an all-null chunk whose categories have a different dtype
+        return pd.Categorical(np.concatenate([np.asarray(part, dtype=object) for part in parts]))
+
+
+class CompactRecords:
+    """Memory-lean, column-oriented holder for audit records.
+
+    Per row only REF_DIGITS (as an int64 key when every value is an equal-width
+    digit string, else the original strings), BILMONTH and the flag (both
+    categorical) are stored. SUB_DIV, DISCO and batch columns and the two
+    status columns are derived on first access and memoized as categoricals;
+    REF_DIGITS strings are decoded only for the rows asked for.
+
+    Every stored and derived buffer is read-only, so one instance can be shared
+    between sessions and threads: writing through df[name] raises ValueError,
+    and frame() hands out copies.
+    """
+
+    def __init__(self, ref_keys, ref_width, ref_strings, bilmonth, flags):
+        self._ref_keys = _readonly(ref_keys)
+        self._ref_width = ref_width
+        self._ref_strings = _readonly(ref_strings)
+        self._bilmonth = _readonly(bilmonth)
+        self._flags = _readonly(flags)
+        # Derivations are deterministic, so a race between readers only repeats work
+        self._derived = {}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a frame with REF_DIGITS, BILMONTH and IMAGE_VERIFY_CODE_PITC"""
+        encoded = encode_ref_digits(df["REF_DIGITS"])
+        if encoded is None:
+            keys, width, strings = None, 0, np.asarray(df["REF_DIGITS"], dtype=object)
+        else:
+            (keys, width), strings = encoded, None
+
+        return cls(
+            keys,
+            width,
+            strings,
+            pd.Categorical(df["BILMONTH"]),
+            pd.Categorical(df["IMAGE_VERIFY_CODE_PITC"])
+        )
+
+    @classmethod
+    def concat(cls, parts):
+        """Join record chunks in order"""
+        parts = list(parts)
+        parts = [part for part in parts if len(part)] or parts[:1]
+        widths = {part._ref_width for part in parts}
+
+        if all(part._ref_keys is not None for part in parts) and len(widths) == 1:
+            keys, width, strings = np.concatenate([part._ref_keys for part in parts]), widths.pop(), None
+        else:
+            keys, width, strings = None, 0, np.concatenate([part.ref_strings() for part in parts])
+
+        return cls(
+            keys,
+            width,
+            strings,
+            _union_categoricals([part._bilmonth for part in parts]),
+            _union_categoricals([part._flags for part in parts])
+        )
+
+    def take(self, rows):
+        """The given rows (positions or a boolean mask) as a new CompactRecords"""
+        return CompactRecords(
+            None if self._ref_keys is None else self._ref_keys[rows],
+            self._ref_width,
+            None if self._ref_strings is None else self._ref_strings[rows],
+            self._bilmonth[rows],
+            self._flags[rows]
+        )
+
+    def __len__(self):
+        return len(self._flags)
+
+    @property
+    def columns(self):
+        return list(RECORD_COLUMNS)
+
+    @property
+    def ref_keys(self):
+        """int64 REF_DIGITS keys (None when the strings could not be encoded)"""
+        return self._ref_keys
+
+    @property
+    def ref_width(self):
+        return self._ref_width
+
+    def ref_strings(self, rows=None):
+        """REF_DIGITS strings, decoded only for the given rows"""
+        if self._ref_keys is None:
+            return self._ref_strings if rows is None else self._ref_strings[rows]
+        keys = self._ref_keys if rows is None else self._ref_keys[rows]
+        return decode_ref_digits(keys, self._ref_width)
+
+    def _values(self, name):
+        if name == "REF_DIGITS":
+            return self.ref_strings()
+        if name == "BILMONTH":
+            return self._bilmonth
+        if name == "IMAGE_VERIFY_CODE_PITC":
+            return self._flags
+        if name not in self._derived:
+            self._derived[name] = _readonly(self._derive(name))
+        return self._derived[name]
+
+    def _derive(self, name):
+        if name == "SUB_DIV":
+            if self._ref_keys is not None and self._ref_width >= SUB_DIV_WIDTH:
+                # Prefix of a fixed-width number is an integer division
+                prefixes = self._ref_keys // 10 ** (self._ref_width - SUB_DIV_WIDTH)
+                codes, uniques = pd.factorize(prefixes, sort=True)
+                return pd.Categorical.from_codes(codes, categories=decode_ref_digits(uniques, SUB_DIV_WIDTH))
+            return _prefix_categorical(self.ref_strings(), SUB_DIV_WIDTH)
+        if name == "DISCO_CODE":
+            return derive_disco_code(self._values("SUB_DIV"))
+        if name == "DISCO_NAME":
+            return derive_disco_name(self._values("DISCO_CODE"))
+        if name == "BATCH_NO":
+            return derive_batch_no(self._values("SUB_DIV"))
+        if name == "BATCH_ID":
+            return derive_batch_id(self._values("SUB_DIV"))
+        if name == "PROCESSING_STATUS":
+            return derive_processing_status(self._flags)
+        if name == "ACCURACY_CATEGORY":
+            return derive_accuracy_category(self._flags)
+        raise KeyError(name)
+
+    def __getitem__(self, key):
+        """df[name] -> Series, df[[names]] -> DataFrame, like a DataFrame"""
+        if isinstance(key, list):
+            return self.frame(key)
+        return pd.Series(self._values(key), name=key)
+
+    def frame(self, columns=None, rows=None):
+        """Materialize columns (default: all) for rows (slice, positions or mask; default: all)"""
+        data = {}
+        for name in columns or RECORD_COLUMNS:
+            if name == "REF_DIGITS":
+                data[name] = self.ref_strings(rows)
+            else:
+                values = self._values(name)
+                data[name] = values if rows is None else values[rows]
+        return pd.DataFrame(data)
+
+    def memory_usage(self):
+        """Storage and bytes per column; lazily derived columns count once materialized"""
+        if self._ref_keys is not None:
+            ref = (f"int64 key ({self._ref_width} digits)", self._ref_keys.nbytes)
+        else:
+            ref = ("object strings", int(pd.Series(self._ref_strings).memory_usage(deep=True, index=False)))
+
+        usage = {
+            "REF_DIGITS": ref,
+            "BILMONTH": ("category", self._bilmonth.memory_usage(deep=True)),
+            "IMAGE_VERIFY_CODE_PITC": ("category", self._flags.memory_usage(deep=True))
+        }
+        for name in RECORD_COLUMNS:
+            if name not in usage:
+                derived = self._derived.get(name)
+                usage[name] = ("derived, cached", derived.memory_usage(deep=True)) if derived is not None else ("derived, lazy", 0)
+
+        return pd.DataFrame.from_dict(usage, orient="index", columns=["Storage", "Bytes"]).reindex(RECORD_COLUMNS)
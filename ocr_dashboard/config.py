@@ -0,0 +1,87 @@
+# =========================
+# CONFIGURATION - ENVIRONMENT VARIABLES WITH RENDER-COMPATIBLE DEFAULTS
+# =========================
+import os
+import tempfile
+
+# Get configuration from environment variables or use defaults
+DB_HOST = os.getenv("DB_HOST", "128.101.23.130")
+DB_PORT = int(os.getenv("DB_PORT", "1521"))
+DB_SID = os.getenv("DB_SID", "theftdb")
+DB_USER = os.getenv("DB_USER", "theft_data")
+DB_PWD = os.getenv("DB_PWD", "theft_data")
+DB_DSN = f"(DESCRIPTION=(ADDRESS=(PROTOCOL=TCP)(HOST={DB_HOST})(PORT={DB_PORT}))(CONNECT_DATA=(SID={DB_SID})))"
+
+# DISCO filter expression. SUBSTR(REF_DIGITS, 3, 2) matches the function-based index
+# in sql/disco_code_index.sql; set DISCO_CODE_COLUMN=DISCO_CODE once the virtual column exists
+DISCO_CODE_COLUMN = os.getenv("DISCO_CODE_COLUMN", "")
+DISCO_CODE_SQL = DISCO_CODE_COLUMN or "SUBSTR(REF_DIGITS, 3, 2)"
+
+# Rows per network round-trip / per chunk when streaming record queries
+FETCH_CHUNK_SIZE = int(os.getenv("FETCH_CHUNK_SIZE", "50000"))
+
+# Session pool shared by every Streamlit session in this process
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_INCREMENT = int(os.getenv("DB_POOL_INCREMENT", "1"))
+DB_POOL_WAIT_TIMEOUT_MS = int(os.getenv("DB_POOL_WAIT_TIMEOUT_MS", "10000"))  # max wait for a free session
+DB_POOL_IDLE_TIMEOUT = int(os.getenv("DB_POOL_IDLE_TIMEOUT", "600"))          # close idle sessions above min
+DB_POOL_PING_INTERVAL = int(os.getenv("DB_POOL_PING_INTERVAL", "60"))         # health-check sessions idle this long
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
+# "All DISCOS" fans out one query per DISCO code; DISCOs still running after the timeout are reported missing
+ALL_DISCO_WORKERS = int(os.getenv("ALL_DISCO_WORKERS", "4"))
+ALL_DISCO_TIMEOUT_SECONDS = float(os.getenv("ALL_DISCO_TIMEOUT_SECONDS", "300"))
+
+# Seconds a loaded record store is served before it is reloaded
+RECORD_CACHE_SECONDS = int(os.getenv("RECORD_CACHE_SECONDS", "300"))
+
+# Record stores (bill-month ranges) kept per DISCO; each holds its own rows, so this bounds the copies
+RECORD_RANGES_PER_DISCO = int(os.getenv("RECORD_RANGES_PER_DISCO", "2"))
+
+# Record Explorer pages and row counts fetched from Oracle that are cached (each for RECORD_CACHE_SECONDS)
+RECORD_PAGE_CACHE_ENTRIES = int(os.getenv("RECORD_PAGE_CACHE_ENTRIES", "256"))
+
+# Seconds before cached aggregates re-check months past their BILMONTH high-water mark
+INCREMENTAL_REFRESH_SECONDS = int(os.getenv("INCREMENTAL_REFRESH_SECONDS", "300"))
+
+# Background pre-warming of every DISCO's aggregates (see ocr_dashboard/prewarm.py)
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "1") == "1"
+PREWARM_INTERVAL_SECONDS = int(os.getenv("PREWARM_INTERVAL_SECONDS", str(INCREMENTAL_REFRESH_SECONDS)))
+PREWARM_JITTER_SECONDS = float(os.getenv("PREWARM_JITTER_SECONDS", "15"))
+
+# Progressive mode: KPIs are first estimated from this percent of table blocks (Oracle SAMPLE BLOCK
+# clause, which only reads those blocks), then replaced by exact figures. Sampled blocks are hashed into
+# ESTIMATE_SAMPLE_GROUPS random groups whose spread widens the intervals for within-block correlation;
+# ESTIMATE_SAMPLE_BLOCK=0 samples rows instead (still reads every block, no faster than the exact count)
+ESTIMATE_SAMPLE_PERCENT = float(os.getenv("ESTIMATE_SAMPLE_PERCENT", "1"))
+ESTIMATE_SAMPLE_BLOCK = os.getenv("ESTIMATE_SAMPLE_BLOCK", "1") == "1"
+ESTIMATE_SAMPLE_GROUPS = int(os.getenv("ESTIMATE_SAMPLE_GROUPS", "32"))
+# A sample that draws no rows (a small DISCO, few blocks) is redrawn at 4x the percent up to this cap;
+# if that is still empty the page waits for the exact counts instead
+ESTIMATE_MAX_SAMPLE_PERCENT = float(os.getenv("ESTIMATE_MAX_SAMPLE_PERCENT", "16"))
+ESTIMATE_POLL_SECONDS = float(os.getenv("ESTIMATE_POLL_SECONDS", "2"))
+
+# Diagnostics (see ocr_dashboard/metrics.py): METRICS_LOG=1 writes one JSON line per page run
+# to stderr; METRICS_PORT serves Prometheus text on http://0.0.0.0:<port>/metrics (0 = off)
+METRICS_LOG = os.getenv("METRICS_LOG", "0") == "1"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Query profiling (see ocr_dashboard/profiling.py): statements slower than SLOW_QUERY_SECONDS are
+# appended to SLOW_QUERY_LOG ("" = off), rotated at SLOW_QUERY_LOG_BYTES with SLOW_QUERY_LOG_BACKUPS kept
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "2"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", os.path.join(tempfile.gettempdir(), "ocr_slow_queries.log"))
+SLOW_QUERY_LOG_BYTES = int(os.getenv("SLOW_QUERY_LOG_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "3"))
+
+# Offline fallback: size and seed of the synthetic dataset used when Oracle is unreachable
+SAMPLE_ROWS = int(os.getenv("SAMPLE_ROWS", "5000"))
+SAMPLE_SEED = int(os.getenv("SAMPLE_SEED", "0"))
+
+# Per-DISCO, per-month Arrow snapshots kept across restarts (see ocr_dashboard/snapshot.py);
+# point at a persistent disk in production, set to "" to disable
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "ocr_snapshots"))
+
+# Export files are written here on demand and removed once this old
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "ocr_exports"))
+EXPORT_MAX_AGE_SECONDS = int(os.getenv("EXPORT_MAX_AGE_SECONDS", "3600"))
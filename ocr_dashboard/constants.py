@@ -0,0 +1,40 @@
+# =========================
+# SHARED CONSTANTS - DISCOS, FLAGS, CATEGORY LABELS
+# =========================
+DISCO_MAP = {
+    "11": "LESCO",
+    "12": "GEPCO",
+    "13": "FESCO",
+    "14": "IESCO",
+    "15": "MEPCO",
+    "26": "PESCO",
+    "27": "HAZECO",
+    "37": "HESCO",
+    "38": "SEPCO",
+    "48": "QESCO",
+    "59": "TESCO"
+}
+
+UNKNOWN_DISCO = "UNKNOWN"
+
+FLAG_CODES = ['A', 'C', 'D', 'E', 'N']
+SUCCESS_FLAGS = ['A', 'C', 'D']
+
+PROCESSING_STATUSES = ["Processed", "Pending"]
+
+ACCURACY_CATEGORIES = [
+    "Success (A,C,D)",
+    "Images Not Available (E)",
+    "Reading Not Matched (N)",
+    "Not Processed",
+    "Other"
+]
+
+# Flag -> ACCURACY_CATEGORY label; unlisted flags are "Other", missing flags "Not Processed"
+FLAG_ACCURACY_CATEGORY = {
+    'A': "Success (A,C,D)",
+    'C': "Success (A,C,D)",
+    'D': "Success (A,C,D)",
+    'E': "Images Not Available (E)",
+    'N': "Reading Not Matched (N)"
+}
@@ -0,0 +1,474 @@
+# =========================
+# DATABASE ACCESS - POOL, FILTERS AND QUERIES ON TBL_GENERAL_BILL_PRINT_AUDIT
+# =========================
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import oracledb
+import pandas as pd
+
+from .config import (
+    DB_USER,
+    DB_PWD,
+    DB_DSN,
+    DISCO_CODE_SQL,
+    FETCH_CHUNK_SIZE,
+    DB_POOL_MIN,
+    DB_POOL_MAX,
+    DB_POOL_INCREMENT,
+    DB_POOL_WAIT_TIMEOUT_MS,
+    DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_PING_INTERVAL,
+    DB_CONNECT_TIMEOUT,
+    ALL_DISCO_WORKERS,
+    ALL_DISCO_TIMEOUT_SECONDS,
+    ESTIMATE_SAMPLE_PERCENT,
+    ESTIMATE_SAMPLE_BLOCK,
+    ESTIMATE_SAMPLE_GROUPS
+)
+from .constants import DISCO_MAP, UNKNOWN_DISCO
+from .compact import CompactRecords
+from .loading import compact_chunks, fold_record_counts
+from .metrics import stage
+from .profiling import profile_statement, oracle_sql_id
+
+RAW_RECORD_COLUMNS = ["REF_DIGITS", "DISCO_CODE", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"]
+AGGREGATE_COLUMNS = ["DISCO_CODE", "BATCH_NO", "SUB_DIV", "BILMONTH", "IMAGE_VERIFY_CODE_PITC", "RECORD_COUNT"]
+SAMPLE_GROUP_COLUMNS = ["DISCO_CODE", "BILMONTH", "IMAGE_VERIFY_CODE_PITC", "SAMPLE_GROUP", "RECORD_COUNT"]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool():
+    """Process-wide Oracle session pool, created once and shared by all sessions"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = oracledb.create_pool(
+                user=DB_USER,
+                password=DB_PWD,
+                dsn=DB_DSN,
+                min=DB_POOL_MIN,
+                max=DB_POOL_MAX,
+                increment=DB_POOL_INCREMENT,
+                getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                wait_timeout=DB_POOL_WAIT_TIMEOUT_MS,
+                timeout=DB_POOL_IDLE_TIMEOUT,
+                ping_interval=DB_POOL_PING_INTERVAL,
+                tcp_connect_timeout=DB_CONNECT_TIMEOUT
+            )
+        return _pool
+
+
+def build_audit_filter(disco_code=None, since=None, ref_prefix=None, after_key=None, bilmonths=None, month_range=None):
+    """WHERE clause and bind variables for TBL_GENERAL_BILL_PRINT_AUDIT queries.
+
+    Values are always bound, so every DISCO shares one SQL text (one hard parse)
+    and the DISCO predicate can use the index from sql/disco_code_index.sql.
+    bilmonths limits the rows to those bill months (None in it = undated rows);
+    month_range = (first, last) bill month becomes a BETWEEN, so Oracle can
+    prune BILMONTH partitions. after_key = (REF_DIGITS, ROWID string) keeps
+    the rows after that key in REF_DIGITS, ROWID order, NULL REF_DIGITS last.
+    """
+    conditions = []
+    params = {}
+    if disco_code:
+        conditions.append(f"{DISCO_CODE_SQL} = :disco_code")
+        params["disco_code"] = disco_code
+    if since is not None:
+        conditions.append("(BILMONTH >= :since OR BILMONTH IS NULL)")
+        params["since"] = since
+    if ref_prefix:
+        # Trailing-wildcard LIKE stays an index range scan on REF_DIGITS
+        conditions.append("REF_DIGITS LIKE :ref_prefix ESCAPE '\\'")
+        params["ref_prefix"] = ref_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    if after_key is not None:
+        # REF_DIGITS repeats once per bill month; ROWID makes the key unique
+        after_ref, params["after_rowid"] = after_key
+        if after_ref is None:
+            conditions.append("(REF_DIGITS IS NULL AND ROWID > CHARTOROWID(:after_rowid))")
+        else:
+            conditions.append(
+                "(REF_DIGITS > :after_ref OR (REF_DIGITS = :after_ref AND ROWID > CHARTOROWID(:after_rowid))"
+                " OR REF_DIGITS IS NULL)"
+            )
+            params["after_ref"] = after_ref
+    if month_range is not None:
+        conditions.append("BILMONTH BETWEEN :month_from AND :month_to")
+        params["month_from"], params["month_to"] = month_range
+    if bilmonths is not None:
+        dated = [month for month in bilmonths if month is not None]
+        month_conditions = ["BILMONTH IS NULL"] if len(dated) < len(bilmonths) else []
+        if dated:
+            names = [f"bilmonth_{index}" for index in range(len(dated))]
+            month_conditions.insert(0, f"BILMONTH IN ({', '.join(':' + name for name in names)})")
+            params.update(zip(names, dated))
+        conditions.append(f"({' OR '.join(month_conditions)})" if month_conditions else "1 = 0")
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where_clause, params
+
+
+def _disco_label(disco_code):
+    return disco_code or "ALL"
+
+
+def record_query(where_clause, order_by="", with_rowid=False):
+    """SELECT of the raw record columns (plus the ROWID as ROW_ID text)"""
+    rowid = ",\n        ROWIDTOCHAR(ROWID) AS ROW_ID" if with_rowid else ""
+    return f"""
+    SELECT
+        REF_DIGITS,
+        {DISCO_CODE_SQL} AS DISCO_CODE,
+        BILMONTH,
+        IMAGE_VERIFY_CODE_PITC{rowid}
+    FROM TBL_GENERAL_BILL_PRINT_AUDIT
+    {where_clause}
+    {order_by}
+    """
+
+
+def iter_query_chunks(connection, query, params=None, chunk_size=FETCH_CHUNK_SIZE, label=None, disco_code=None):
+    """Stream a query result as DataFrames of at most chunk_size rows (profiled under label, see profiling.py)"""
+    cursor = connection.cursor()
+    try:
+        with profile_statement(query, params, label, _disco_label(disco_code)) as profile:
+            cursor.arraysize = chunk_size
+            profile.call(cursor.execute, query, params or {})
+            columns = [col[0] for col in cursor.description]
+
+            while True:
+                rows = profile.fetched(profile.call(cursor.fetchmany, chunk_size))
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        cursor.close()
+
+
+def fetch_all_rows(connection, query, params=None, label=None, disco_code=None):
+    """Every row of a small result (counts, per-month versions), profiled under label"""
+    with profile_statement(query, params, label, _disco_label(disco_code)) as profile, connection.cursor() as cursor:
+        profile.call(cursor.execute, query, params or {})
+        return profile.fetched(profile.call(cursor.fetchall))
+
+
+def count_audit_rows(disco_code=None, ref_prefix=None, month_range=None):
+    """COUNT(*) of the matching audit rows"""
+    where_clause, params = build_audit_filter(disco_code, ref_prefix=ref_prefix, month_range=month_range)
+    query = f"SELECT COUNT(*) FROM TBL_GENERAL_BILL_PRINT_AUDIT {where_clause}"
+    with stage("query", query="count", disco=_disco_label(disco_code)), get_connection_pool().acquire() as connection:
+        return fetch_all_rows(connection, query, params, "count", disco_code)[0][0]
+
+
+def query_disco_records(disco_code=None, on_chunk=None, bilmonths=None, month_range=None):
+    """All records of one DISCO (or all DISCOS) as CompactRecords, streamed in chunks.
+
+    on_chunk(loaded_rows, processed_rows) is called after every chunk (see
+    compact_chunks); the expected total is left to the caller, which already
+    has per-month row counts (query_month_versions). bilmonths / month_range
+    limit the load to those bill months (see build_audit_filter). Returns
+    None when the query returns no rows.
+    """
+    where_clause, params = build_audit_filter(disco_code, bilmonths=bilmonths, month_range=month_range)
+
+    # Borrow a pooled session; it goes back to the pool when the block exits
+    with stage("query", query="records", disco=_disco_label(disco_code)) as timing, \
+            get_connection_pool().acquire() as connection:
+        chunks = iter_query_chunks(connection, record_query(where_clause), params, label="records", disco_code=disco_code)
+        records = compact_chunks(chunks, on_chunk=on_chunk)
+        if records is not None:
+            timing.rows, timing.bytes = len(records), int(records.memory_usage()["Bytes"].sum())
+        return records
+
+
+def stream_disco_counts(disco_code=None):
+    """A DISCO's aggregate counts (see aggregate_records) folded from its streamed records, which are not kept.
+
+    For when the GROUP BY cannot run in Oracle; memory is bounded by the
+    number of groups. Returns None when the query returns no rows.
+    """
+    where_clause, params = build_audit_filter(disco_code)
+
+    with stage("query", query="record_counts", disco=_disco_label(disco_code)) as timing, \
+            get_connection_pool().acquire() as connection:
+        chunks = iter_query_chunks(connection, record_query(where_clause), params, label="record_counts", disco_code=disco_code)
+        counts = fold_record_counts(chunks)
+        if counts is not None:
+            timing.rows = int(counts["RECORD_COUNT"].sum())
+        return counts
+
+
+def run_per_disco(func, disco_codes=None, max_workers=ALL_DISCO_WORKERS, timeout=ALL_DISCO_TIMEOUT_SECONDS, on_tick=None):
+    """Call func(disco_code) for every DISCO on a thread pool, each call borrowing its own pooled session.
+
+    Returns (results, failed): results maps DISCO code -> return value, in
+    DISCO order, for the calls that finished; failed maps DISCO code -> error
+    message for those that raised or were still running after `timeout`
+    seconds. on_tick() runs in the calling thread about twice a second while
+    waiting, e.g. to redraw progress.
+    """
+    disco_codes = list(DISCO_MAP) if disco_codes is None else list(disco_codes)
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ocr-disco")
+    # Each call runs in a copy of the caller's context, so its stages count towards the caller's page run
+    futures = {
+        executor.submit(contextvars.copy_context().run, func, disco_code): disco_code
+        for disco_code in disco_codes
+    }
+    pending = set(futures)
+    deadline = time.monotonic() + timeout
+
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _, pending = wait(pending, timeout=min(remaining, 0.5), return_when=FIRST_COMPLETED)
+            if on_tick is not None:
+                on_tick()
+    finally:
+        # Late DISCOs are not waited for; queued ones never start
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results, failed = {}, {}
+    for future, disco_code in futures.items():
+        if future in pending:
+            failed[disco_code] = f"timed out after {timeout:g}s"
+        elif future.exception() is not None:
+            failed[disco_code] = str(future.exception())
+        else:
+            results[disco_code] = future.result()
+    return results, failed
+
+
+def query_all_disco_records(on_progress=None, query=query_disco_records):
+    """Records of every DISCO, one query(disco_code, on_progress) per DISCO code in parallel, joined in DISCO order.
+
+    Returns (records, failed): records is None when no DISCO returned rows;
+    failed maps the DISCO codes that errored or timed out to the reason.
+    on_progress receives the totals over all DISCOs (see query_disco_records).
+    """
+    progress = {}
+
+    def load_one(disco_code):
+        def track(loaded_rows, expected_rows, processed_rows):
+            progress[disco_code] = (loaded_rows, expected_rows, processed_rows)
+        return query(disco_code, track if on_progress is not None else None)
+
+    def report():
+        # Worker threads only record their counts; the caller's thread draws them
+        totals = list(progress.values())
+        if totals:
+            on_progress(*(sum(values) for values in zip(*totals)))
+
+    results, failed = run_per_disco(load_one, on_tick=report if on_progress is not None else None)
+    parts = [records for records in results.values() if records is not None]
+    return (CompactRecords.concat(parts) if parts else None), failed
+
+
+def query_month_versions(disco_code, month_range=None):
+    """{bill month: data version} for a DISCO, where the version is "<rows>-<checksum>".
+
+    The checksum hashes every REF_DIGITS and flag of the month, so it changes
+    when a row is added, removed or re-flagged. Undated rows are left out.
+    """
+    where_clause, params = build_audit_filter(disco_code, month_range=month_range)
+    query = f"""
+    SELECT
+        BILMONTH,
+        COUNT(*) AS RECORD_COUNT,
+        SUM(ORA_HASH(REF_DIGITS || '|' || IMAGE_VERIFY_CODE_PITC)) AS CHECKSUM
+    FROM TBL_GENERAL_BILL_PRINT_AUDIT
+    {where_clause}
+    GROUP BY BILMONTH
+    """
+
+    with stage("query", query="month_versions", disco=_disco_label(disco_code)) as timing, \
+            get_connection_pool().acquire() as connection:
+        rows = fetch_all_rows(connection, query, params, "month_versions", disco_code)
+        timing.rows = len(rows)
+        return {
+            month: f"{int(count)}-{int(checksum)}"
+            for month, count, checksum in rows
+            if month is not None
+        }
+
+
+def fetch_record_page(disco_code=None, ref_prefix=None, after_key=None, page_size=50, month_range=None):
+    """One Record Explorer page straight from Oracle, keyset-paginated on (REF_DIGITS, ROWID).
+
+    Returns (records, last_key): last_key is the page's last (REF_DIGITS,
+    ROWID) key to pass as after_key for the next page, None on the last page.
+    With the (DISCO code, REF_DIGITS) index of sql/disco_code_index.sql a
+    page is a short range scan read in this order; without it every page
+    sorts the DISCO's matching rows.
+    """
+    where_clause, params = build_audit_filter(disco_code, ref_prefix=ref_prefix, after_key=after_key, month_range=month_range)
+    params["page_size"] = page_size
+    query = record_query(where_clause, "ORDER BY REF_DIGITS, ROWID FETCH FIRST :page_size ROWS ONLY", with_rowid=True)
+
+    with stage("query", query="record_page", disco=_disco_label(disco_code)) as timing, \
+            get_connection_pool().acquire() as connection:
+        chunks = list(iter_query_chunks(connection, query, params, page_size, "record_page", disco_code))
+        timing.rows = sum(len(chunk) for chunk in chunks)
+
+    page = chunks[0] if chunks else pd.DataFrame(columns=RAW_RECORD_COLUMNS + ["ROW_ID"])
+    last_key = None
+    if len(page) == page_size:
+        last = page.iloc[-1]
+        last_key = (None if pd.isna(last["REF_DIGITS"]) else last["REF_DIGITS"], last["ROW_ID"])
+    return CompactRecords.from_frame(page), last_key
+
+
+def iter_database_export(disco_code=None, ref_prefix=None, month_range=None):
+    """A DISCO's records streamed straight from an Oracle cursor, enriched chunk by chunk"""
+    where_clause, params = build_audit_filter(disco_code, ref_prefix=ref_prefix, month_range=month_range)
+
+    # Timed over the whole stream, so it includes the time the consumer spends between chunks
+    with stage("query", query="export", disco=_disco_label(disco_code)) as timing, \
+            get_connection_pool().acquire() as connection:
+        timing.rows = 0
+        # Unordered, so Oracle streams rows as it reads them instead of sorting the whole scope first
+        query = record_query(where_clause)
+        for chunk in iter_query_chunks(connection, query, params, label="export", disco_code=disco_code):
+            timing.rows += len(chunk)
+            yield CompactRecords.from_frame(chunk).frame()
+
+
+def sample_clause(percent, block=False):
+    """SAMPLE clause keeping about `percent` % of rows (or of blocks).
+
+    Oracle does not accept a bind variable here, so the percentage is
+    validated and written into the SQL text as a number literal.
+    """
+    percent = float(percent)
+    if not 0.000001 <= percent < 100:
+        raise ValueError(f"Sample percent must be in [0.000001, 100), got {percent}")
+    return f"SAMPLE{' BLOCK' if block else ''} ({percent:.6f})"
+
+
+def _fetch_counts(query, params, kind, disco_code, columns=AGGREGATE_COLUMNS):
+    with stage("query", query=kind, disco=_disco_label(disco_code)) as timing, \
+            get_connection_pool().acquire() as connection:
+        chunks = list(iter_query_chunks(connection, query, params, label=kind, disco_code=disco_code))
+        counts = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+        timing.rows, timing.bytes = len(counts), int(counts.memory_usage(deep=True).sum())
+    counts["RECORD_COUNT"] = counts["RECORD_COUNT"].astype("int64")
+    return counts
+
+
+def _label_counts(counts):
+    counts["DISCO_NAME"] = counts["DISCO_CODE"].map(DISCO_MAP).fillna(UNKNOWN_DISCO)
+    counts["BATCH_ID"] = counts["BATCH_NO"] + "-" + counts["DISCO_CODE"]
+    return counts
+
+
+def query_disco_aggregates(disco_code=None, since=None):
+    """Per-(DISCO, batch, sub-division, bill month, flag) record counts grouped in the database.
+
+    With `since`, only bill months from that high-water mark onwards (plus
+    undated rows) are counted.
+    """
+    where_clause, params = build_audit_filter(disco_code, since)
+
+    # The whole table (or open months) is scanned, only the counts travel
+    query = f"""
+    SELECT
+        {DISCO_CODE_SQL} AS DISCO_CODE,
+        SUBSTR(REF_DIGITS, 1, 2) AS BATCH_NO,
+        SUBSTR(REF_DIGITS, 1, 5) AS SUB_DIV,
+        BILMONTH,
+        IMAGE_VERIFY_CODE_PITC,
+        COUNT(*) AS RECORD_COUNT
+    FROM TBL_GENERAL_BILL_PRINT_AUDIT
+    {where_clause}
+    GROUP BY {DISCO_CODE_SQL}, SUBSTR(REF_DIGITS, 1, 2), SUBSTR(REF_DIGITS, 1, 5), BILMONTH, IMAGE_VERIFY_CODE_PITC
+    """
+    return _label_counts(_fetch_counts(query, params, "aggregates", disco_code))
+
+
+def query_sample_aggregates(disco_code=None, sample_percent=ESTIMATE_SAMPLE_PERCENT,
+                            block=ESTIMATE_SAMPLE_BLOCK, groups=ESTIMATE_SAMPLE_GROUPS):
+    """Aggregate counts of a random sample of the table, plus the same sample split into random groups.
+
+    One sampled scan, grouped two ways: (counts, group_counts), where counts
+    has the query_disco_aggregates columns and group_counts is per (DISCO,
+    bill month, flag, SAMPLE_GROUP). Every table block lands in one of `groups`
+    groups by a hash of its ROWID block address, so the spread between groups
+    measures how much rows of one block resemble each other (see estimate.py).
+    Without disco_code every DISCO is sampled by this one query.
+    """
+    where_clause, params = build_audit_filter(disco_code)
+    groups = int(groups)
+    if not 2 <= groups <= 1024:
+        raise ValueError(f"Sample groups must be in [2, 1024], got {groups}")
+
+    # ROWID characters 1-15 are the data object, file and block; the bucket count is a literal like the percent
+    query = f"""
+    SELECT
+        DISCO_CODE,
+        BATCH_NO,
+        SUB_DIV,
+        BILMONTH,
+        IMAGE_VERIFY_CODE_PITC,
+        SAMPLE_GROUP,
+        COUNT(*) AS RECORD_COUNT
+    FROM (
+        SELECT
+            {DISCO_CODE_SQL} AS DISCO_CODE,
+            SUBSTR(REF_DIGITS, 1, 2) AS BATCH_NO,
+            SUBSTR(REF_DIGITS, 1, 5) AS SUB_DIV,
+            BILMONTH,
+            IMAGE_VERIFY_CODE_PITC,
+            ORA_HASH(SUBSTR(ROWIDTOCHAR(ROWID), 1, 15), {groups - 1}) AS SAMPLE_GROUP
+        FROM TBL_GENERAL_BILL_PRINT_AUDIT {sample_clause(sample_percent, block)}
+        {where_clause}
+    )
+    GROUP BY GROUPING SETS (
+        (DISCO_CODE, BATCH_NO, SUB_DIV, BILMONTH, IMAGE_VERIFY_CODE_PITC),
+        (DISCO_CODE, BILMONTH, IMAGE_VERIFY_CODE_PITC, SAMPLE_GROUP)
+    )
+    """
+    rows = _fetch_counts(query, params, "aggregates_sample", disco_code, AGGREGATE_COLUMNS + ["SAMPLE_GROUP"])
+
+    # SAMPLE_GROUP is never NULL in the data, so it tells the two grouping sets apart
+    grouped = rows["SAMPLE_GROUP"].notna()
+    counts = _label_counts(rows.loc[~grouped, AGGREGATE_COLUMNS].reset_index(drop=True))
+    group_counts = rows.loc[grouped, SAMPLE_GROUP_COLUMNS].astype({"SAMPLE_GROUP": "int64"}).reset_index(drop=True)
+    return counts, group_counts
+
+
+def explain_statement(sql_text, sql_id=None):
+    """DBMS_XPLAN output for a profiled statement, as text.
+
+    With sql_id, the plan Oracle actually used is read from the cursor cache
+    (DISPLAY_CURSOR, which needs SELECT on the V$SQL views); when that is not
+    possible the statement is explained afresh (EXPLAIN PLAN), binds unpeeked.
+    """
+    with get_connection_pool().acquire() as connection, connection.cursor() as cursor:
+        if sql_id:
+            try:
+                cursor.execute(
+                    "SELECT PLAN_TABLE_OUTPUT FROM TABLE(DBMS_XPLAN.DISPLAY_CURSOR(:sql_id, NULL, 'TYPICAL'))",
+                    {"sql_id": sql_id}
+                )
+                lines = [row[0] or "" for row in cursor.fetchall()]
+                if lines and not any("cannot be found" in line for line in lines):
+                    return "\n".join(lines)
+            except oracledb.DatabaseError:
+                # No access to the V$SQL views; explained afresh below
+                pass
+
+        # EXPLAIN PLAN takes no bind for its statement id; the SQL_ID is alphanumeric
+        statement_id = f"ocr_{oracle_sql_id(sql_text)[0]}"
+        cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql_text}")
+        cursor.execute(
+            "SELECT PLAN_TABLE_OUTPUT FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :statement_id, 'TYPICAL'))",
+            {"statement_id": statement_id}
+        )
+        lines = [row[0] or "" for row in cursor.fetchall()]
+        # The PLAN_TABLE rows are not kept
+        connection.rollback()
+        return "\n".join(lines)
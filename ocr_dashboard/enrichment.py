@@ -0,0 +1,119 @@
+# =========================
+# RECORD ENRICHMENT - DERIVED DISCO / BATCH / STATUS COLUMNS
+# =========================
+import numpy as np
+import pandas as pd
+
+from .constants import (
+    DISCO_MAP,
+    UNKNOWN_DISCO,
+    PROCESSING_STATUSES,
+    ACCURACY_CATEGORIES,
+    FLAG_ACCURACY_CATEGORY
+)
+
+SUB_DIV_WIDTH = 5
+
+PROCESSING_STATUS_DTYPE = pd.CategoricalDtype(PROCESSING_STATUSES)
+ACCURACY_CATEGORY_DTYPE = pd.CategoricalDtype(ACCURACY_CATEGORIES)
+
+
+def _prefix_categorical(values, width):
+    """Fixed-width prefix of every string as a Categorical with sorted categories"""
+    values = np.asarray(values, dtype=object)
+    try:
+        # Casting to a fixed-width bytes dtype truncates in C, no per-row Python slicing
+        prefixes = values.astype(f"S{width}")
+    except UnicodeEncodeError:
+        codes, uniques = pd.factorize(values.astype(f"U{width}"), sort=True)
+    else:
+        if width <= 8:
+            # Pack the ASCII bytes big-endian into one integer key; integer order == string order
+            packed = np.zeros((len(prefixes), 8), dtype=np.uint8)
+            packed[:, :width] = prefixes.view(np.uint8).reshape(-1, width)
+            codes, keys = pd.factorize(packed.view(">u8").ravel().astype(np.uint64), sort=True)
+            uniques = keys.astype(">u8").view("S8").astype(str)
+        else:
+            codes, uniques = pd.factorize(prefixes.astype(str), sort=True)
+    missing = pd.isna(values)
+    if missing.any():
+        codes[missing] = -1
+    return pd.Categorical.from_codes(codes, categories=uniques).remove_unused_categories()
+
+
+def _derive_categorical(parent, transform, missing=None):
+    """Apply transform to a Categorical's categories only and re-encode the rows.
+
+    Rows missing in parent stay missing unless a `missing` value is given.
+    """
+    derived = pd.Index(transform(pd.Index(parent.categories)))
+    fill_missing = missing is not None and (parent.codes < 0).any()
+    categories = (derived.append(pd.Index([missing])) if fill_missing else derived).unique().sort_values()
+    mapping = categories.get_indexer(derived)
+
+    codes = np.full(len(parent), categories.get_loc(missing) if fill_missing else -1, dtype=np.int64)
+    valid = parent.codes >= 0
+    codes[valid] = mapping[parent.codes[valid]]
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def derive_disco_code(sub_div):
+    """DISCO_CODE (characters 3-4 of REF_DIGITS) from the SUB_DIV categorical"""
+    return _derive_categorical(sub_div, lambda cats: cats.str[2:4])
+
+
+def derive_disco_name(disco_code):
+    """DISCO_NAME from the DISCO_CODE categorical (UNKNOWN_DISCO for unknown or missing codes)"""
+    return _derive_categorical(disco_code, lambda cats: cats.map(DISCO_MAP).fillna(UNKNOWN_DISCO), missing=UNKNOWN_DISCO)
+
+
+def derive_batch_no(sub_div):
+    """BATCH_NO (characters 1-2 of REF_DIGITS) from the SUB_DIV categorical"""
+    return _derive_categorical(sub_div, lambda cats: cats.str[:2])
+
+
+def derive_batch_id(sub_div):
+    """BATCH_ID ("<batch>-<disco>") from the SUB_DIV categorical"""
+    return _derive_categorical(sub_div, lambda cats: cats.str[:2] + "-" + cats.str[2:4])
+
+
+def derive_processing_status(flags):
+    """PROCESSING_STATUS categorical from IMAGE_VERIFY_CODE_PITC"""
+    flag_codes, _ = pd.factorize(flags)
+    return pd.Categorical.from_codes(np.where(flag_codes >= 0, 0, 1), dtype=PROCESSING_STATUS_DTYPE)
+
+
+def derive_accuracy_category(flags):
+    """ACCURACY_CATEGORY categorical from IMAGE_VERIFY_CODE_PITC"""
+    # Factorize the flag column (missing -> -1) and translate its few distinct values
+    flag_codes, flag_values = pd.factorize(flags)
+    category_codes = np.array(
+        [ACCURACY_CATEGORIES.index(FLAG_ACCURACY_CATEGORY.get(flag, "Other")) for flag in flag_values]
+        # Trailing entry is what code -1 (missing flag) picks up
+        + [ACCURACY_CATEGORIES.index("Not Processed")],
+        dtype=np.int64
+    )
+    return pd.Categorical.from_codes(category_codes[flag_codes], dtype=ACCURACY_CATEGORY_DTYPE)
+
+
+def enrich_records(df):
+    """Add DISCO, batch, sub-division and status columns to raw audit records.
+
+    Expects REF_DIGITS and IMAGE_VERIFY_CODE_PITC. REF_DIGITS is sliced once
+    into SUB_DIV; every other code column is derived from SUB_DIV's handful of
+    categories, and the status columns from the distinct flag values, so the
+    per-row work is a few vectorized code lookups. Columns are added in place
+    and the frame is returned.
+    """
+    sub_div = _prefix_categorical(df["REF_DIGITS"], SUB_DIV_WIDTH)
+    disco_code = derive_disco_code(sub_div)
+
+    df["DISCO_CODE"] = disco_code
+    df["DISCO_NAME"] = derive_disco_name(disco_code)
+    df["BATCH_NO"] = derive_batch_no(sub_div)
+    df["SUB_DIV"] = sub_div
+    df["BATCH_ID"] = derive_batch_id(sub_div)
+    df["PROCESSING_STATUS"] = derive_processing_status(df["IMAGE_VERIFY_CODE_PITC"])
+    df["ACCURACY_CATEGORY"] = derive_accuracy_category(df["IMAGE_VERIFY_CODE_PITC"])
+
+    return df
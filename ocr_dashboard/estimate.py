@@ -0,0 +1,160 @@
+# =========================
+# ESTIMATES - KPIs FROM A TABLE SAMPLE, WITH CONFIDENCE INTERVALS
+# =========================
+# Progressive mode shows KPIs counted from a random sample of the table
+# (Oracle's SAMPLE clause, or a Bernoulli row draw over the sample records)
+# while the exact aggregates load. Every row or block is kept with the same
+# probability, so the counts scale up by 1 / fraction. For a row sample each
+# rate is a binomial proportion: its interval is the Wilson score interval,
+# which stays inside 0-100% for rates near the edges (OCR accuracy often is),
+# and the record total is a scaled binomial count with standard error
+# sqrt(n (1 - f)) / f.
+#
+# A block sample (SAMPLE BLOCK, the default because it only reads the sampled
+# blocks) keeps whole blocks, and rows of one block are loaded together, so
+# they tend to share a DISCO, month and flag mix. The sample then carries less
+# information than its row count suggests. To size that, the sampled blocks
+# are hashed into random groups (see query_sample_aggregates); the spread of
+# each KPI between groups is its random-group variance, and its ratio to the
+# binomial variance is the design effect. Rates use the Wilson interval at the
+# effective sample size n / design effect, the total uses the random-group
+# variance; neither is ever narrower than the row-sample interval.
+import numpy as np
+
+from .constants import SUCCESS_FLAGS
+from .statistics import FLAG_SLOTS, PENDING_FLAG, aggregate_records, flag_slots
+from .summary import summarize_counts
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959963984540054
+
+# Rows per block when block sampling the sample records (an 8 KB block holds about this many audit rows)
+BLOCK_ROWS = 100
+
+
+class EmptySampleError(Exception):
+    """A sample, at every percent tried, drew no rows to estimate from"""
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """Wilson score interval of a proportion, in percent ((0, 0) without trials)"""
+    if trials <= 0:
+        return (0.0, 0.0)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    half = z * np.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return (max(0.0, centre - half) * 100, min(1.0, centre + half) * 100)
+
+
+def scale_sample_counts(counts, fraction):
+    """Aggregate counts of a row sample scaled up to the whole population"""
+    scaled = counts.copy()
+    scaled["RECORD_COUNT"] = np.rint(counts["RECORD_COUNT"] / fraction).astype("int64")
+    return scaled
+
+
+def sample_record_counts(records, fraction, seed=0):
+    """Aggregate counts of a seeded Bernoulli row sample of CompactRecords (what SAMPLE returns from Oracle)"""
+    keep = np.random.default_rng(seed).random(len(records)) < fraction
+    return aggregate_records(records.take(keep))
+
+
+def group_flag_table(group_counts, groups):
+    """SAMPLE_GROUP x flag-slot count table over all `groups` groups (empty groups as zero rows)"""
+    table = group_counts.groupby(
+        [group_counts["SAMPLE_GROUP"].to_numpy(), flag_slots(group_counts["IMAGE_VERIFY_CODE_PITC"])],
+        observed=False
+    )["RECORD_COUNT"].sum()
+    return table.unstack(fill_value=0).reindex(index=range(groups), columns=FLAG_SLOTS, fill_value=0)
+
+
+def ratio_design_effect(numerators, denominators):
+    """Random-group variance of sum(numerators) / sum(denominators) over its binomial variance (at least 1)"""
+    numerators = np.asarray(numerators, dtype=np.float64)
+    denominators = np.asarray(denominators, dtype=np.float64)
+    groups, total = len(denominators), denominators.sum()
+    if groups < 2 or total <= 0:
+        return 1.0
+    ratio = numerators.sum() / total
+    binomial = ratio * (1 - ratio) / total
+    if binomial <= 0:
+        return 1.0
+    grouped = groups / (groups - 1) * ((numerators - ratio * denominators) ** 2).sum() / total ** 2
+    return max(1.0, grouped / binomial)
+
+
+def _kpi_parts(table):
+    # (numerator, denominator) columns per rate KPI from a flag-slot count table
+    processed = table[FLAG_SLOTS].sum(axis=1) - table[PENDING_FLAG]
+    return {
+        "processing_rate": (processed, table[FLAG_SLOTS].sum(axis=1)),
+        "success_rate": (table[SUCCESS_FLAGS].sum(axis=1), processed),
+        "ocr_accuracy": (table["A"], table["A"] + table["N"]),
+        "perfect_match_rate": (table["A"], processed),
+        "image_issue_rate": (table["E"], processed)
+    }
+
+
+def sample_block_counts(records, fraction, groups, block_rows=BLOCK_ROWS, seed=0):
+    """(counts, group_counts) of a seeded Bernoulli sample of blocks of CompactRecords (what SAMPLE BLOCK returns).
+
+    Every block_rows consecutive records form a block; each block is kept with
+    probability fraction and falls in one of `groups` random groups, like
+    query_sample_aggregates.
+    """
+    blocks = np.arange(len(records)) // block_rows
+    block_count = int(blocks[-1]) + 1 if len(blocks) else 0
+    rng = np.random.default_rng(seed)
+    keep_blocks = rng.random(block_count) < fraction
+    block_groups = rng.integers(0, groups, block_count)
+
+    keep = keep_blocks[blocks]
+    sample = records.take(keep)
+    grouped = sample.frame(["DISCO_CODE", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"])
+    grouped["SAMPLE_GROUP"] = block_groups[blocks[keep]]
+    group_counts = grouped.groupby(list(grouped.columns), dropna=False, observed=True).size()
+    return aggregate_records(sample), group_counts.reset_index(name="RECORD_COUNT")
+
+
+def estimate_from_sample(counts, fraction, group_counts=None, groups=None, z=Z_95):
+    """Summary scaled up from a sample's aggregate counts, plus {KPI: (low, high)} intervals.
+
+    fraction is the probability each row (or block) was sampled with, 0.01 for
+    SAMPLE (1). group_counts (per SAMPLE_GROUP, flag; see
+    query_sample_aggregates) over `groups` random groups widens the intervals
+    by each KPI's design effect; without it rows are taken as independent.
+    """
+    slots = flag_slots(counts["IMAGE_VERIFY_CODE_PITC"])
+    totals = counts["RECORD_COUNT"].groupby(slots, observed=False).sum().reindex(FLAG_SLOTS, fill_value=0)
+    kpi_totals = {name: (int(numerator.iloc[0]), int(denominator.iloc[0]))
+                  for name, (numerator, denominator) in _kpi_parts(totals.to_frame().T).items()}
+    sampled = int(totals.sum())
+    total = sampled / fraction
+    total_variance = sampled * (1 - fraction) / fraction ** 2
+
+    design_effects = {name: 1.0 for name in ["total_records"] + list(kpi_totals)}
+    if group_counts is not None and len(group_counts):
+        groups = groups or int(group_counts["SAMPLE_GROUP"].max()) + 1
+        table = group_flag_table(group_counts, groups)
+        for name, (numerators, denominators) in _kpi_parts(table).items():
+            design_effects[name] = ratio_design_effect(numerators, denominators)
+        # Each group scaled by groups / fraction is an estimate of the total on its own
+        group_totals = table.sum(axis=1).to_numpy(dtype=np.float64) / fraction
+        grouped_variance = groups / (groups - 1) * ((group_totals - total / groups) ** 2).sum()
+        if total_variance > 0:
+            design_effects["total_records"] = max(1.0, grouped_variance / total_variance)
+
+    total_error = z * np.sqrt(total_variance * design_effects["total_records"])
+    intervals = {"total_records": (max(0.0, total - total_error), total + total_error)}
+    for name, (numerator, denominator) in kpi_totals.items():
+        # Wilson interval at the effective sample size
+        intervals[name] = wilson_interval(numerator / design_effects[name], denominator / design_effects[name], z)
+
+    return {
+        "summary": summarize_counts(scale_sample_counts(counts, fraction)),
+        "intervals": intervals,
+        "design_effects": design_effects,
+        "sampled_rows": sampled,
+        "fraction": fraction
+    }
@@ -0,0 +1,122 @@
+# =========================
+# EXPORTS - CHUNKED CSV / GZIP CSV / PARQUET WRITERS
+# =========================
+# Exports are written chunk by chunk to a file, so peak memory is one chunk
+# rather than the whole result rendered as one CSV string.
+import gzip
+import os
+import tempfile
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is simply not offered
+    pa = pq = None
+
+# Rows materialized per chunk when exporting from a record store
+EXPORT_CHUNK_ROWS = 200_000
+
+EXPORT_FORMATS = {
+    "csv": {"label": "CSV", "extension": "csv", "mime": "text/csv"},
+    "csv.gz": {"label": "CSV (gzip)", "extension": "csv.gz", "mime": "application/gzip"},
+    "parquet": {"label": "Parquet", "extension": "parquet", "mime": "application/vnd.apache.parquet"}
+}
+
+
+def available_formats():
+    """Export formats usable in this environment"""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or pq is not None]
+
+
+def iter_record_chunks(records, rows=None, columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Materialize a record store (or just rows of it) one chunk at a time"""
+    total = len(records) if rows is None else len(rows)
+    if total == 0:
+        # Still one (empty) chunk, so the file gets its header / schema
+        yield records.frame(columns, rows=slice(0, 0))
+    for start in range(0, total, chunk_rows):
+        window = slice(start, start + chunk_rows)
+        yield records.frame(columns, rows=window if rows is None else rows[window])
+
+
+def _write_csv(chunks, handle):
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(handle, index=False, header=header)
+        header = False
+
+
+def _parquet_schema(table):
+    # Per-chunk dictionaries and all-null chunks would give each chunk its own
+    # type; pin plain value types from the first chunk instead
+    fields = []
+    for field in table.schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(field.type.value_type)
+        elif pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _write_parquet(chunks, path):
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = _parquet_schema(table)
+                writer = pq.ParquetWriter(path, schema, compression="snappy")
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_export(chunks, path, fmt):
+    """Write DataFrame chunks to path as one CSV, gzip CSV or Parquet file; returns the row count"""
+    rows = 0
+
+    def counted(source):
+        nonlocal rows
+        for chunk in source:
+            rows += len(chunk)
+            yield chunk
+
+    if fmt == "csv":
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            _write_csv(counted(chunks), handle)
+    elif fmt == "csv.gz":
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as handle:
+            _write_csv(counted(chunks), handle)
+    elif fmt == "parquet":
+        if pq is None:
+            raise ValueError("Parquet export needs pyarrow")
+        _write_parquet(counted(chunks), path)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    return rows
+
+
+def export_to_tempfile(chunks, fmt, directory=None, prefix="export_"):
+    """Write chunks to a new file in directory (default: system temp); returns (path, rows)"""
+    handle, path = tempfile.mkstemp(suffix=f".{EXPORT_FORMATS[fmt]['extension']}", prefix=prefix, dir=directory)
+    os.close(handle)
+    try:
+        return path, write_export(chunks, path, fmt)
+    except Exception:
+        os.remove(path)
+        raise
+
+
+def prune_exports(directory, max_age_seconds):
+    """Delete export files older than max_age_seconds (abandoned by ended sessions)"""
+    cutoff = time.time() - max_age_seconds
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,25 @@
+# =========================
+# INCREMENTAL REFRESH - BILMONTH HIGH-WATER MARK
+# =========================
+# Closed billing months never change, so a refresh only re-counts the months
+# from the last-seen BILMONTH onwards (the open cycle where OCR flags are still
+# arriving) and splices them into the cached aggregates.
+import pandas as pd
+
+
+def high_water_mark(counts):
+    """Latest BILMONTH present in an aggregate frame (None if there is none)"""
+    months = counts["BILMONTH"].dropna()
+    if months.empty:
+        return None
+    mark = months.max()
+    # Hand the driver a plain datetime rather than a pandas Timestamp
+    return mark.to_pydatetime() if isinstance(mark, pd.Timestamp) else mark
+
+
+def merge_counts_since(cached, fresh, since):
+    """Replace months >= since (and undated rows) in cached counts with the fresh counts"""
+    if since is None:
+        return fresh
+    stale = cached["BILMONTH"].isna() | (cached["BILMONTH"] >= since)
+    return pd.concat([cached[~stale], fresh], ignore_index=True)
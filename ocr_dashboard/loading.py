@@ -0,0 +1,68 @@
+# =========================
+# RECORD LOADING - STREAMED CHUNKS INTO ONE COMPACT STORE
+# =========================
+# The database cursor (or any other source) yields raw DataFrame chunks; each
+# is compacted as it arrives, so only one raw chunk is alive at a time. When
+# only counts are needed, chunks are folded into running aggregate counts and
+# dropped, so memory is bounded by the number of groups, not of rows.
+import pandas as pd
+
+from .compact import CompactRecords
+from .statistics import aggregate_records
+
+COUNT_KEYS = ["DISCO_CODE", "DISCO_NAME", "BATCH_NO", "BATCH_ID", "SUB_DIV", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"]
+
+
+def fold_flag_counts(running, chunk):
+    """Add a chunk's per-flag counts (None = not processed) into the running totals"""
+    return running.add(chunk["IMAGE_VERIFY_CODE_PITC"].value_counts(dropna=False), fill_value=0)
+
+
+def compact_chunks(chunks, on_chunk=None):
+    """Join raw record chunks into CompactRecords (None if there were none).
+
+    on_chunk(loaded_rows, processed_rows) is called after every chunk, e.g. to
+    drive a progress bar; the running flag totals are only kept when it is set.
+    """
+    parts = []
+    loaded_rows = 0
+    running_flags = pd.Series(dtype="int64")
+
+    for chunk in chunks:
+        parts.append(CompactRecords.from_frame(chunk))
+        loaded_rows += len(chunk)
+        if on_chunk is not None:
+            running_flags = fold_flag_counts(running_flags, chunk)
+            on_chunk(loaded_rows, running_flags[running_flags.index.notna()].sum())
+
+    if not parts:
+        return None
+    return CompactRecords.concat(parts)
+
+
+def _plain_counts(counts):
+    # Categorical keys differ from chunk to chunk; plain columns concatenate cheaply
+    return counts.astype({key: object for key in COUNT_KEYS if key != "BILMONTH"}).astype({"BILMONTH": "datetime64[ns]"})
+
+
+def fold_record_counts(chunks, on_chunk=None):
+    """Per-(DISCO, batch, sub-division, bill month, flag) counts of raw record chunks, keeping no rows.
+
+    Same columns as aggregate_records; on_chunk(loaded_rows, processed_rows)
+    as in compact_chunks. Returns None if there were no chunks.
+    """
+    running = None
+    loaded_rows = processed_rows = 0
+
+    for chunk in chunks:
+        counts = _plain_counts(aggregate_records(CompactRecords.from_frame(chunk)))
+        if running is not None:
+            counts = pd.concat([running, counts], ignore_index=True) \
+                .groupby(COUNT_KEYS, dropna=False, sort=False)["RECORD_COUNT"].sum().reset_index()
+        running = counts
+        loaded_rows += len(chunk)
+        processed_rows += int(chunk["IMAGE_VERIFY_CODE_PITC"].notna().sum())
+        if on_chunk is not None:
+            on_chunk(loaded_rows, processed_rows)
+
+    return running
@@ -0,0 +1,273 @@
+# =========================
+# METRICS - PER-STAGE TIMERS AND COUNTERS FOR EVERY PAGE RUN
+# =========================
+# Hot paths are wrapped in stage(name, **labels) blocks: Oracle queries,
+# compute steps (summaries, search indexes, rollups) and page sections. Each
+# block's wall time, plus the rows and bytes it reports, is added to
+# process-wide totals and to the list of the page run in progress; cache
+# lookups are counted as hits or misses the same way.
+#
+# The totals are exported in the Prometheus text format (prometheus_text,
+# also served on METRICS_PORT when set), and a finished page run can be
+# written as one JSON log line (METRICS_LOG=1). Nothing here touches
+# Streamlit, so the workers and the store record into the same totals.
+import contextvars
+import json
+import logging
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from .config import METRICS_LOG, METRICS_PORT
+
+PREFIX = "ocr"
+
+_registry = {
+    "lock": threading.Lock(),
+    # (metric, labels) -> value
+    "counters": {},
+    # labels, stage included -> [count, total seconds, max seconds]
+    "timings": {}
+}
+
+# The page run that stages are recorded into; thread pools copy it (see run_per_disco)
+_current_run = contextvars.ContextVar("ocr_page_run", default=None)
+
+logger = logging.getLogger(__name__)
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+
+
+def count(name, value=1, **labels):
+    """Add to a process-wide counter, e.g. count("stage_rows", 500, stage="query")"""
+    key = (name, _label_key(labels))
+    with _registry["lock"]:
+        _registry["counters"][key] = _registry["counters"].get(key, 0) + value
+
+
+def cache_lookup(cache, hit):
+    """Count a hit or miss of one of the store's caches"""
+    result = "hit" if hit else "miss"
+    count("cache_requests", cache=cache, result=result)
+    run = _current_run.get()
+    if run is not None:
+        run.add_cache(cache, result)
+
+
+# =========================
+# STAGES
+# =========================
+class Stage:
+    """Wall time of one stage; a context manager, or start() ... stop().
+
+    Set .rows and .bytes inside the block to report how much data it handled.
+    """
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+        self.rows = None
+        self.bytes = None
+        self.seconds = None
+
+    def start(self):
+        self._run = _current_run.get()
+        self._started = time.perf_counter()
+        return self
+
+    def stop(self, error=None):
+        if self.seconds is not None:
+            return self
+        self.seconds = time.perf_counter() - self._started
+        _record(self, error)
+        return self
+
+    __enter__ = start
+
+    def __exit__(self, exc_type, exc, tb):
+        # A generator closed early by its consumer is not a failure
+        failed = exc_type is not None and not issubclass(exc_type, GeneratorExit)
+        self.stop(exc_type.__name__ if failed else None)
+        return False
+
+
+def stage(name, **labels):
+    """Time a block: with stage("query", query="records", disco="01") as timing: ..."""
+    return Stage(name, **labels)
+
+
+def _add_timing(labels, seconds):
+    with _registry["lock"]:
+        totals = _registry["timings"].setdefault(_label_key(labels), [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = max(totals[2], seconds)
+
+
+def _record(timing, error):
+    labels = dict(timing.labels, stage=timing.name)
+    _add_timing(labels, timing.seconds)
+    if timing.rows is not None:
+        count("stage_rows", timing.rows, **labels)
+    if timing.bytes is not None:
+        count("stage_bytes", timing.bytes, **labels)
+    if error is not None:
+        count("stage_errors", **labels, error=error)
+
+    if timing._run is not None:
+        timing._run.add_stage({
+            "stage": timing.name,
+            "labels": ", ".join(f"{name}={value}" for name, value in _label_key(timing.labels)),
+            "seconds": timing.seconds,
+            "rows": timing.rows,
+            "bytes": timing.bytes,
+            "error": error
+        })
+
+
+# =========================
+# PAGE RUNS
+# =========================
+class PageRun:
+    """Stages and cache lookups recorded during one run of the page"""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.labels = {}
+        self.seconds = None
+        self.stages = []
+        self.cache = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_stage(self, record):
+        with self._lock:
+            self.stages.append(record)
+
+    def add_cache(self, cache, result):
+        with self._lock:
+            self.cache[(cache, result)] = self.cache.get((cache, result), 0) + 1
+
+    def stage_table(self):
+        """One row per recorded stage, in the order they finished"""
+        with self._lock:
+            stages = list(self.stages)
+        return pd.DataFrame(stages, columns=["stage", "labels", "seconds", "rows", "bytes", "error"])
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "event": "page_run",
+                "run_id": self.run_id,
+                "started_at": self.started_at,
+                "seconds": self.seconds,
+                **self.labels,
+                "stages": list(self.stages),
+                "cache": {f"{cache}:{result}": value for (cache, result), value in self.cache.items()}
+            }
+
+
+def begin_run():
+    """Start recording a page run in the current thread (and the pools it hands work to)"""
+    run = PageRun()
+    _current_run.set(run)
+    return run
+
+
+def finish_run(run, **labels):
+    """Close a page run: add it to the totals and log it as JSON when METRICS_LOG is on"""
+    run.seconds = time.perf_counter() - run._started
+    run.labels.update(labels)
+    _add_timing(dict(labels, stage="page"), run.seconds)
+    if METRICS_LOG:
+        _json_logger().info(json.dumps(run.to_dict(), default=str))
+    return run
+
+
+def _json_logger():
+    # One JSON object per line on stderr, whatever the root logging setup is
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+# =========================
+# PROMETHEUS EXPORT
+# =========================
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(key):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}" if key else ""
+
+
+def prometheus_text():
+    """Process-wide totals in the Prometheus text exposition format"""
+    with _registry["lock"]:
+        timings = {key: list(values) for key, values in _registry["timings"].items()}
+        counters = dict(_registry["counters"])
+
+    lines = [
+        f"# HELP {PREFIX}_stage_seconds Wall time of instrumented stages",
+        f"# TYPE {PREFIX}_stage_seconds summary"
+    ]
+    for key, (runs, total, _) in sorted(timings.items()):
+        lines.append(f"{PREFIX}_stage_seconds_count{_labels_text(key)} {runs}")
+        lines.append(f"{PREFIX}_stage_seconds_sum{_labels_text(key)} {total:.6f}")
+    lines += [
+        f"# HELP {PREFIX}_stage_seconds_max Slowest run of each stage",
+        f"# TYPE {PREFIX}_stage_seconds_max gauge"
+    ]
+    for key, (_, _, slowest) in sorted(timings.items()):
+        lines.append(f"{PREFIX}_stage_seconds_max{_labels_text(key)} {slowest:.6f}")
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        for (metric, key), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{PREFIX}_{name}_total{_labels_text(key)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are not logged
+        pass
+
+
+_server = {"lock": threading.Lock(), "server": None}
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serve prometheus_text() on http://0.0.0.0:<port>/metrics from a daemon thread; a no-op when port is 0 or it already runs"""
+    with _server["lock"]:
+        if not port or _server["server"] is not None:
+            return _server["server"]
+        server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="ocr-metrics", daemon=True).start()
+        _server["server"] = server
+        return server
@@ -0,0 +1,101 @@
+# =========================
+# PRE-WARMING - BACKGROUND REFRESH OF EVERY DISCO'S AGGREGATES
+# =========================
+# One daemon thread per process walks every DISCO in DISCO_MAP and refreshes
+# its aggregates through the store, which publishes each new entry in a single
+# assignment ("All DISCOS" is merged from them on read). While it runs, page
+# loads read whatever is cached and never query Oracle for aggregates themselves.
+#
+# The first pass warms every DISCO back to back, one query at a time. After
+# that, refreshes are spread evenly over PREWARM_INTERVAL_SECONDS with a
+# random jitter, so the database sees one small incremental query every few
+# seconds instead of a burst of eleven.
+import random
+import threading
+import time
+
+from .config import PREWARM_INTERVAL_SECONDS, PREWARM_JITTER_SECONDS
+from .constants import DISCO_MAP
+from .store import refresh_disco_aggregates, set_background_refresh
+
+_worker = {
+    "lock": threading.Lock(),
+    "thread": None,
+    "stop": None,
+    "status": {}
+}
+
+
+def prewarm_targets():
+    """DISCO codes refreshed by the worker"""
+    return list(DISCO_MAP)
+
+
+def _refresh(disco_code):
+    started = time.time()
+    try:
+        refresh_disco_aggregates(disco_code)
+        error = None
+    except Exception as e:
+        error = str(e)
+    _worker["status"][disco_code] = {
+        "refreshed_at": time.time(),
+        "seconds": time.time() - started,
+        "error": error
+    }
+
+
+def _run(stop, interval, jitter):
+    targets = prewarm_targets()
+    set_background_refresh(True)
+    try:
+        # Warm-up pass: every DISCO once, sequentially
+        for disco_code in targets:
+            if stop.is_set():
+                return
+            _refresh(disco_code)
+
+        # Steady state: one DISCO per slot, each at a jittered offset inside its slot
+        slot = interval / len(targets)
+        while not stop.is_set():
+            cycle_start = time.monotonic()
+            for index, disco_code in enumerate(targets):
+                due = cycle_start + index * slot + random.uniform(0, min(jitter, slot))
+                if stop.wait(max(0.0, due - time.monotonic())):
+                    return
+                _refresh(disco_code)
+            stop.wait(max(0.0, cycle_start + interval - time.monotonic()))
+    finally:
+        set_background_refresh(False)
+
+
+def start_prewarm_worker(interval=PREWARM_INTERVAL_SECONDS, jitter=PREWARM_JITTER_SECONDS):
+    """Start the process-wide pre-warming thread; a no-op if it is already running"""
+    with _worker["lock"]:
+        thread = _worker["thread"]
+        if thread is not None and thread.is_alive():
+            return thread
+
+        stop = threading.Event()
+        thread = threading.Thread(target=_run, args=(stop, interval, jitter), name="ocr-prewarm", daemon=True)
+        _worker["thread"], _worker["stop"] = thread, stop
+        thread.start()
+        return thread
+
+
+def stop_prewarm_worker(timeout=None):
+    """Ask the pre-warming thread to stop and wait for it"""
+    with _worker["lock"]:
+        thread, stop = _worker["thread"], _worker["stop"]
+    if thread is not None:
+        stop.set()
+        thread.join(timeout)
+
+
+def get_prewarm_status():
+    """Whether the worker runs, plus last refresh time, duration and error per DISCO code"""
+    thread = _worker["thread"]
+    return {
+        "running": thread is not None and thread.is_alive(),
+        "discos": dict(_worker["status"])
+    }
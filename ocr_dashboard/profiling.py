@@ -0,0 +1,190 @@
+# =========================
+# QUERY PROFILING - EVERY ORACLE STATEMENT, PLUS A ROTATING SLOW-QUERY LOG
+# =========================
+# database.py runs each statement inside profile_statement(), which records
+# the time spent in execute and fetch calls (not in the code consuming the
+# rows), the round-trips (execute and fetch calls; each is at most one, as
+# every fetch asks for a full arraysize), the rows, and the bind variables
+# redacted to their type and length. Statements are identified by the
+# SQL_ID Oracle itself gives their text, so a DBA can look them up in V$SQL
+# or AWR directly.
+#
+# The latest RECENT_STATEMENTS profiles are kept in memory for the
+# diagnostics panel; statements slower than SLOW_QUERY_SECONDS are also
+# appended, as one JSON object per line, to SLOW_QUERY_LOG, which rotates.
+import hashlib
+import json
+import logging
+import struct
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from logging.handlers import RotatingFileHandler
+
+import pandas as pd
+
+from .config import SLOW_QUERY_SECONDS, SLOW_QUERY_LOG, SLOW_QUERY_LOG_BYTES, SLOW_QUERY_LOG_BACKUPS
+from .metrics import count
+
+RECENT_STATEMENTS = 200
+
+# Oracle's base-32 alphabet for SQL_IDs
+_SQL_ID_ALPHABET = "0123456789abcdfghjkmnpqrstuvwxyz"
+
+_recent = deque(maxlen=RECENT_STATEMENTS)
+_recent_lock = threading.Lock()
+
+slow_query_logger = logging.getLogger(__name__ + ".slow")
+
+
+def oracle_sql_id(sql_text):
+    """(SQL_ID, HASH_VALUE) Oracle assigns to this exact statement text, as in V$SQL"""
+    digest = hashlib.md5(sql_text.encode("utf-8") + b"\x00").digest()
+    _, _, high, low = struct.unpack("<IIII", digest)
+    number = high << 32 | low
+    sql_id = ""
+    for _ in range(13):
+        sql_id = _SQL_ID_ALPHABET[number % 32] + sql_id
+        number //= 32
+    return sql_id, low
+
+
+def redact_binds(params):
+    """Bind variables with their values replaced by type and length, e.g. {"disco_code": "str(2)"}"""
+    redacted = {}
+    for name, value in (params or {}).items():
+        if value is None:
+            redacted[name] = "null"
+        elif isinstance(value, str):
+            redacted[name] = f"str({len(value)})"
+        elif isinstance(value, (datetime, date, pd.Timestamp)):
+            redacted[name] = "date"
+        else:
+            redacted[name] = type(value).__name__
+    return redacted
+
+
+class StatementProfile:
+    """Timing, round-trips and rows of one statement; database calls go through call()"""
+
+    def __init__(self, sql_text, params, query, disco):
+        self.sql_text = sql_text
+        self.sql_id, self.hash_value = oracle_sql_id(sql_text)
+        self.binds = redact_binds(params)
+        self.query = query
+        self.disco = disco
+        self.started_at = time.time()
+        self.seconds = 0.0
+        self.round_trips = 0
+        self.rows = 0
+        self.error = None
+
+    def call(self, func, *args):
+        """Run one execute or fetch call, counting its time and a round-trip"""
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.round_trips += 1
+
+    def fetched(self, rows):
+        """Count the rows one fetch call returned"""
+        self.rows += len(rows)
+        return rows
+
+    def to_dict(self):
+        return {
+            "sql_id": self.sql_id,
+            "hash_value": self.hash_value,
+            "query": self.query,
+            "disco": self.disco,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "seconds": round(self.seconds, 6),
+            "round_trips": self.round_trips,
+            "rows": self.rows,
+            "binds": self.binds,
+            "error": self.error,
+            "sql_text": self.sql_text
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A stream closed early by its consumer still finished its statement
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            self.error = f"{exc_type.__name__}: {exc}"
+        _finish(self)
+        return False
+
+
+def profile_statement(sql_text, params=None, query=None, disco=None):
+    """Profile one statement: with profile_statement(sql, params, "records", "01") as profile: ..."""
+    return StatementProfile(sql_text, params, query, disco)
+
+
+def _finish(profile):
+    labels = {"sql_id": profile.sql_id, "query": profile.query}
+    count("sql_executions", **labels)
+    count("sql_seconds", profile.seconds, **labels)
+    count("sql_round_trips", profile.round_trips, **labels)
+    count("sql_rows", profile.rows, **labels)
+
+    with _recent_lock:
+        _recent.append(profile)
+    if profile.seconds >= SLOW_QUERY_SECONDS:
+        count("sql_slow", **labels)
+        _log_slow(profile)
+
+
+def _log_slow(profile):
+    logger = _slow_query_logger()
+    if logger is not None:
+        logger.warning(json.dumps(profile.to_dict(), default=str))
+
+
+def _slow_query_logger():
+    # Attached on first use, so importing this module never touches the disk
+    if not SLOW_QUERY_LOG:
+        return None
+    if not slow_query_logger.handlers:
+        try:
+            handler = RotatingFileHandler(
+                SLOW_QUERY_LOG, maxBytes=SLOW_QUERY_LOG_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8"
+            )
+        except OSError:
+            return None
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.WARNING)
+        slow_query_logger.propagate = False
+    return slow_query_logger
+
+
+def recent_statements():
+    """Profiles of the latest statements, newest first"""
+    with _recent_lock:
+        return list(reversed(_recent))
+
+
+def statement_table(profiles):
+    """One row per profile for display; SQL text and binds left out"""
+    return pd.DataFrame(
+        [
+            {
+                "sql_id": profile.sql_id,
+                "query": profile.query,
+                "disco": profile.disco,
+                "started": datetime.fromtimestamp(profile.started_at).strftime("%H:%M:%S"),
+                "ms": round(profile.seconds * 1000, 1),
+                "round_trips": profile.round_trips,
+                "rows": profile.rows,
+                "slow": profile.seconds >= SLOW_QUERY_SECONDS,
+                "error": profile.error
+            }
+            for profile in profiles
+        ],
+        columns=["sql_id", "query", "disco", "started", "ms", "round_trips", "rows", "slow", "error"]
+    )
@@ -0,0 +1,71 @@
+# =========================
+# ROLLUP CUBE - DISCO / BATCH_NO / SUB_DIV / FLAG / BILL MONTH
+# =========================
+# Built once from aggregate counts: the finest table holds the flag-slot counts
+# per (DISCO, batch, sub-division, bill month), and every coarser level is
+# rolled up from it up front. Expanding a drill-down node then only filters
+# and sums a table of a few thousand rows; records are never scanned here.
+# A SUB_DIV is the first five REF_DIGITS characters, so the records of a leaf
+# are a REF_DIGITS prefix search away.
+import numpy as np
+import pandas as pd
+
+from .statistics import FLAG_SLOTS, flag_slots, kpi_rates
+
+ROLLUP_LEVELS = ["DISCO_NAME", "BATCH_NO", "SUB_DIV"]
+
+
+class RollupCube:
+    """Pre-aggregated flag counts for drilling from DISCO to batch to sub-division.
+
+    A node is addressed by its path, e.g. () for the top, ("MEPCO",) or
+    ("MEPCO", "01"). Every query takes an optional (first, last) bill-month
+    range; undated rows only count when there is none.
+    """
+
+    def __init__(self, counts):
+        frame = pd.DataFrame({level: np.asarray(counts[level], dtype=object) for level in ROLLUP_LEVELS})
+        frame["BILMONTH"] = pd.to_datetime(np.asarray(counts["BILMONTH"]))
+        frame["FLAG"] = flag_slots(counts["IMAGE_VERIFY_CODE_PITC"])
+        frame["RECORD_COUNT"] = np.asarray(counts["RECORD_COUNT"], dtype=np.int64)
+
+        leaf = (
+            frame.groupby(ROLLUP_LEVELS + ["BILMONTH", "FLAG"], sort=True, dropna=False, observed=True)["RECORD_COUNT"]
+            .sum()
+            .unstack("FLAG", fill_value=0)
+            .reindex(columns=FLAG_SLOTS, fill_value=0)
+            .astype("int64")
+        )
+        leaf.columns = list(leaf.columns)
+
+        # Depth d is grouped by the first d levels and the bill month; depth 0 is the grand total per month
+        self._tables = {len(ROLLUP_LEVELS): leaf}
+        for depth in range(len(ROLLUP_LEVELS) - 1, -1, -1):
+            self._tables[depth] = self._tables[depth + 1].groupby(
+                level=ROLLUP_LEVELS[:depth] + ["BILMONTH"], sort=True, dropna=False
+            ).sum()
+
+    @property
+    def nbytes(self):
+        return sum(int(table.memory_usage(deep=True).sum()) for table in self._tables.values())
+
+    def _rows(self, depth, path, month_range):
+        table = self._tables[depth]
+        mask = np.ones(len(table), dtype=bool)
+        for level, value in zip(ROLLUP_LEVELS, path):
+            mask &= np.asarray(table.index.get_level_values(level) == value)
+        if month_range is not None:
+            months = table.index.get_level_values("BILMONTH")
+            mask &= np.asarray((months >= month_range[0]) & (months <= month_range[1]))
+        return table[mask]
+
+    def children(self, path=(), month_range=None):
+        """Flag counts and KPIs of each child of a node, summed over the month range"""
+        level = ROLLUP_LEVELS[len(path)]
+        table = self._rows(len(path) + 1, path, month_range).groupby(level=level, sort=True).sum()
+        return pd.concat([kpi_rates(table), table[FLAG_SLOTS]], axis=1).reset_index()
+
+    def months(self, path=(), month_range=None):
+        """Flag counts and KPIs of one node per bill month"""
+        table = self._rows(len(path), path, month_range).groupby(level="BILMONTH", sort=True, dropna=False).sum()
+        return pd.concat([kpi_rates(table), table[FLAG_SLOTS]], axis=1).reset_index()
@@ -0,0 +1,146 @@
+# =========================
+# RECORD SEARCH INDEX - PREFIX LOOKUP OVER REF_DIGITS, DISCO AND BATCH
+# =========================
+# Built once per record store. REF_DIGITS is kept sorted so a prefix is a
+# binary-search range; DISCO_NAME and BATCH_ID get value -> row postings, so a
+# lookup touches only the matching rows. Substring search is a fallback mode
+# that scans REF_DIGITS in chunks. The same sorted orders give the explorer
+# its sorted pages without re-sorting per rerun.
+import numpy as np
+import pandas as pd
+
+SEARCH_PREFIX = "prefix"
+SEARCH_CONTAINS = "contains"
+
+# Rows decoded per step when scanning REF_DIGITS in contains mode
+SCAN_CHUNK_ROWS = 1_000_000
+
+# Columns the index keeps a sorted row order for
+SORT_COLUMNS = ["REF_DIGITS", "DISCO_NAME", "BATCH_ID"]
+
+# Sorts after every character a prefix can be followed by
+_MAX_CHAR = "\U0010ffff"
+
+
+def _postings(codes, labels):
+    """Row positions grouped by label: (order, starts, ends) with rows of code k in order[starts[k]:ends[k]].
+
+    Groups are laid out in label order (missing values last), so order is also
+    the rows sorted by this column.
+    """
+    codes = np.asarray(codes)
+    ranks = np.empty(len(labels), dtype=np.int64)
+    ranks[np.argsort(np.asarray(labels, dtype=object), kind="stable")] = np.arange(len(labels))
+    ranked = np.where(codes >= 0, ranks[codes], len(labels))
+
+    order = np.argsort(ranked, kind="stable")
+    sorted_ranks = ranked[order]
+    return (
+        order.astype(_position_dtype(len(codes))),
+        np.searchsorted(sorted_ranks, ranks, side="left"),
+        np.searchsorted(sorted_ranks, ranks, side="right")
+    )
+
+
+def _position_dtype(rows):
+    return np.int32 if rows < np.iinfo(np.int32).max else np.int64
+
+
+class RecordSearchIndex:
+    """Prefix search over a CompactRecords store.
+
+    search() returns matching row positions in record order (None for an empty
+    query), ready for CompactRecords.frame(rows=...).
+    """
+
+    def __init__(self, records):
+        self._records = records
+        positions = _position_dtype(len(records))
+
+        keys = records.ref_keys
+        if keys is not None:
+            self._ref_order = np.argsort(keys, kind="stable").astype(positions)
+            self._ref_sorted = keys[self._ref_order]
+        else:
+            upper = pd.Series(records.ref_strings(), dtype=object).fillna("").astype(str).str.upper().to_numpy(object)
+            self._ref_order = np.argsort(upper, kind="stable").astype(positions)
+            self._ref_sorted = upper[self._ref_order]
+
+        self._categories = {}
+        for name in ["DISCO_NAME", "BATCH_ID"]:
+            values = records[name].array
+            labels = pd.Index(values.categories).astype(str).str.upper()
+            self._categories[name] = (labels, _postings(values.codes, labels))
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def nbytes(self):
+        """Memory held by the index itself (the record store is shared, not copied)"""
+        total = self._ref_order.nbytes + self._ref_sorted.nbytes
+        for _, postings in self._categories.values():
+            total += sum(part.nbytes for part in postings)
+        return total
+
+    def _ref_prefix(self, prefix):
+        if self._records.ref_keys is not None:
+            width = self._records.ref_width
+            if not (prefix.isascii() and prefix.isdigit()) or len(prefix) > width:
+                return self._ref_order[:0]
+            # Keys sharing a digit prefix form one contiguous numeric range
+            scale = 10 ** (width - len(prefix))
+            bounds = [int(prefix) * scale, (int(prefix) + 1) * scale]
+        else:
+            bounds = [prefix, prefix + _MAX_CHAR]
+        start, stop = np.searchsorted(self._ref_sorted, bounds, side="left")
+        return self._ref_order[start:stop]
+
+    def _category_rows(self, name, matches):
+        labels, (order, starts, ends) = self._categories[name]
+        return [order[starts[code]:ends[code]] for code in np.flatnonzero(matches(labels))]
+
+    def _ref_contains(self, text):
+        if self._records.ref_keys is not None and not (text.isascii() and text.isdigit()):
+            # Keyed REF_DIGITS are all digits, nothing to scan for
+            return []
+        hits = []
+        for start in range(0, len(self._records), SCAN_CHUNK_ROWS):
+            strings = pd.Series(self._records.ref_strings(slice(start, start + SCAN_CHUNK_ROWS)), dtype=object)
+            found = strings.str.contains(text, case=False, regex=False, na=False).to_numpy()
+            hits.append(np.flatnonzero(found) + start)
+        return hits
+
+    def search(self, query, mode=SEARCH_PREFIX):
+        """Rows whose REF_DIGITS, DISCO_NAME or BATCH_ID starts with (or, in contains mode, contains) query"""
+        text = query.strip().upper()
+        if not text:
+            return None
+
+        if mode == SEARCH_CONTAINS:
+            parts = self._ref_contains(text)
+            matches = lambda labels: labels.str.contains(text, regex=False)
+        else:
+            parts = [self._ref_prefix(text)]
+            matches = lambda labels: labels.str.startswith(text)
+
+        for name in self._categories:
+            parts.extend(self._category_rows(name, matches))
+
+        # Rows can match on several columns; unique also restores record order
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def sorted_rows(self, sort_by, rows=None, descending=False):
+        """Row positions (all, or just rows) ordered by one of SORT_COLUMNS"""
+        if sort_by == "REF_DIGITS":
+            order = self._ref_order
+        else:
+            order = self._categories[sort_by][1][0]
+
+        if rows is not None:
+            # Keep the precomputed order, filtered to the matches: O(n), no sort
+            keep = np.zeros(len(self._records), dtype=bool)
+            keep[rows] = True
+            order = order[keep[order]]
+
+        return order[::-1] if descending else order
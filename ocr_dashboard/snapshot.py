@@ -0,0 +1,168 @@
+# =========================
+# SNAPSHOTS - PER-DISCO, PER-MONTH ARROW FILES THAT SURVIVE RESTARTS
+# =========================
+# Each DISCO's records are kept as one Arrow IPC file per bill month, named
+# after the month's data version (row count and checksum, as reported by
+# Oracle). A loader compares those versions with the database and only
+# queries the months that differ, so a restarted container reads closed
+# months from disk instead of Oracle. Files are read through a memory map.
+#
+# Aggregate counts are kept as one file per DISCO; the BILMONTH high-water
+# mark is recomputed from them, so a refresh after a restart is incremental.
+#
+# Everything lives under a directory keyed by the snapshot format and the
+# data source, so pointing the app at another database never reuses files.
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # snapshots are simply skipped
+    pa = feather = None
+
+from .compact import CompactRecords
+from .config import SNAPSHOT_DIR, DB_DSN, DB_USER, DISCO_CODE_SQL
+
+# Bump when the file layout changes; old directories are then ignored
+SNAPSHOT_FORMAT = 2
+
+RECORDS = "records"
+AGGREGATES = "aggregates"
+
+
+def snapshots_enabled():
+    """Whether snapshots can be read and written here (pyarrow present, SNAPSHOT_DIR set)"""
+    return pa is not None and bool(SNAPSHOT_DIR)
+
+
+def snapshot_root():
+    """Directory for the current snapshot format and data source"""
+    source = hashlib.sha1(f"{DB_USER}@{DB_DSN}|{DISCO_CODE_SQL}".encode()).hexdigest()[:12]
+    return os.path.join(SNAPSHOT_DIR, f"v{SNAPSHOT_FORMAT}-{source}")
+
+
+def month_label(bilmonth):
+    """YYYY-MM-DD file label of a bill month"""
+    return pd.Timestamp(bilmonth).strftime("%Y-%m-%d")
+
+
+def _disco_dir(kind, disco_code):
+    return os.path.join(snapshot_root(), kind, disco_code)
+
+
+def _write_atomic(table, path):
+    # Written beside the target and renamed, so readers never see half a file
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def _read_mapped(path):
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+# =========================
+# RECORDS
+# =========================
+def _record_files(disco_code):
+    directory = _disco_dir(RECORDS, disco_code)
+    if not os.path.isdir(directory):
+        return []
+    return [
+        tuple(name[:-len(".arrow")].split(".", 1))
+        for name in os.listdir(directory)
+        if name.endswith(".arrow")
+    ]
+
+
+def record_month_versions(disco_code):
+    """{month label: data version} of the record months on disk for a DISCO"""
+    return dict(_record_files(disco_code))
+
+
+def _record_path(disco_code, label, version):
+    return os.path.join(_disco_dir(RECORDS, disco_code), f"{label}.{version}.arrow")
+
+
+def load_record_month(disco_code, label, version):
+    """One snapshotted bill month of a DISCO as CompactRecords"""
+    table = _read_mapped(_record_path(disco_code, label, version))
+    rows = table.num_rows
+    metadata = table.schema.metadata or {}
+    width = int(metadata.get(b"ref_width", b"0"))
+
+    if "REF_KEY" in table.column_names:
+        keys, strings = table.column("REF_KEY").to_numpy(), None
+    else:
+        keys, strings, width = None, np.asarray(table.column("REF_DIGITS").to_pylist(), dtype=object), 0
+
+    # The month is in the file name, so it is not stored per row
+    bilmonth = pd.Categorical.from_codes(np.zeros(rows, dtype=np.int8), categories=pd.DatetimeIndex([label]))
+    flags = pd.Categorical(table.column("IMAGE_VERIFY_CODE_PITC").to_pandas())
+    return CompactRecords(keys, width, strings, bilmonth, flags)
+
+
+def save_record_months(disco_code, records, versions):
+    """Write each dated month of a DISCO's records whose label is in versions ({label: data version})"""
+    months = records["BILMONTH"]
+    codes = months.cat.codes.to_numpy()
+    flags = records["IMAGE_VERIFY_CODE_PITC"].to_numpy()
+
+    for code, month in enumerate(months.cat.categories):
+        label = month_label(month)
+        if label not in versions:
+            continue
+        rows = np.flatnonzero(codes == code)
+
+        if records.ref_keys is not None:
+            ref_name, ref_values = "REF_KEY", pa.array(records.ref_keys[rows], type=pa.int64())
+        else:
+            ref_name, ref_values = "REF_DIGITS", pa.array(records.ref_strings(rows), type=pa.string())
+        table = pa.table(
+            {ref_name: ref_values, "IMAGE_VERIFY_CODE_PITC": pa.array(flags[rows], type=pa.string(), from_pandas=True)},
+            metadata={"ref_width": str(records.ref_width)}
+        )
+        _write_atomic(table, _record_path(disco_code, label, versions[label]))
+
+
+def prune_record_months(disco_code, versions):
+    """Remove a DISCO's month files for the months in versions whose version is out of date"""
+    for label, version in _record_files(disco_code):
+        if label in versions and versions[label] != version:
+            try:
+                os.remove(_record_path(disco_code, label, version))
+            except OSError:
+                pass
+
+
+# =========================
+# AGGREGATES
+# =========================
+def _aggregate_path(disco_code):
+    return os.path.join(_disco_dir(AGGREGATES, disco_code), "counts.arrow")
+
+
+def load_aggregate_snapshot(disco_code):
+    """A DISCO's last saved aggregate counts (None if there are none)"""
+    path = _aggregate_path(disco_code)
+    if not os.path.exists(path):
+        return None
+    return _read_mapped(path).to_pandas()
+
+
+def save_aggregate_snapshot(disco_code, counts):
+    """Persist a DISCO's aggregate counts"""
+    _write_atomic(pa.Table.from_pandas(counts, preserve_index=False), _aggregate_path(disco_code))
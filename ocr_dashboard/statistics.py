@@ -0,0 +1,139 @@
+# =========================
+# BATCH PROCESSING FUNCTIONS - FLAG COUNTS, BATCH STATS, OCR ACCURACY
+# =========================
+import numpy as np
+import pandas as pd
+
+from .constants import FLAG_CODES, SUCCESS_FLAGS
+
+OTHER_FLAG = "Other"
+PENDING_FLAG = "Pending"
+
+# Every record falls in exactly one slot: a known flag, an unknown flag, or no flag yet
+FLAG_SLOTS = FLAG_CODES + [OTHER_FLAG, PENDING_FLAG]
+FLAG_SLOT_DTYPE = pd.CategoricalDtype(FLAG_SLOTS)
+
+
+def flag_slots(flags):
+    """Map raw IMAGE_VERIFY_CODE_PITC values onto the FLAG_SLOTS categorical"""
+    codes, values = pd.factorize(flags)
+    lookup = np.array(
+        [FLAG_SLOTS.index(flag) if flag in FLAG_CODES else FLAG_SLOTS.index(OTHER_FLAG) for flag in values]
+        # Trailing entry is what code -1 (missing flag) picks up
+        + [FLAG_SLOTS.index(PENDING_FLAG)],
+        dtype=np.int64
+    )
+    return pd.Categorical.from_codes(lookup[codes], dtype=FLAG_SLOT_DTYPE)
+
+
+def aggregate_records(df):
+    """Collapse records into per-(DISCO, batch, sub-division, bill month, flag) counts"""
+    group_cols = ["DISCO_CODE", "DISCO_NAME", "BATCH_NO", "BATCH_ID", "SUB_DIV", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"]
+    return df[group_cols].groupby(group_cols, dropna=False, observed=True).size().reset_index(name="RECORD_COUNT")
+
+
+def get_flag_totals(counts):
+    """Total records per flag from aggregated counts (unprocessed records excluded)"""
+    return counts.groupby("IMAGE_VERIFY_CODE_PITC", observed=True)["RECORD_COUNT"].sum()
+
+
+def _batch_flag_table(batch_ids, disco_names, flags, weights=None):
+    """Batch x flag-slot count table from one grouped pass"""
+    frame = pd.DataFrame({
+        "BATCH_ID": batch_ids,
+        "DISCO": disco_names,
+        "FLAG": flag_slots(flags)
+    })
+    keys = ["BATCH_ID", "DISCO", "FLAG"]
+
+    if weights is None:
+        grouped = frame.groupby(keys, sort=True, dropna=False, observed=True).size()
+    else:
+        frame["WEIGHT"] = np.asarray(weights)
+        grouped = frame.groupby(keys, sort=True, dropna=False, observed=True)["WEIGHT"].sum()
+
+    return grouped.unstack("FLAG", fill_value=0).reindex(columns=FLAG_SLOTS, fill_value=0).astype("int64")
+
+
+def kpi_rates(table):
+    """Record totals and KPI rates (percent) per row of a flag-slot count table"""
+    total_records = table[FLAG_SLOTS].sum(axis=1)
+    processed_records = total_records - table[PENDING_FLAG]
+    successful = table[SUCCESS_FLAGS].sum(axis=1)
+    total_an = table['A'] + table['N']
+
+    return pd.DataFrame({
+        "Total Records": total_records,
+        "Processed": processed_records,
+        "Processing Rate": (processed_records / total_records.where(total_records > 0) * 100).fillna(0),
+        "Success Rate (A,C,D)": (successful / processed_records.where(processed_records > 0) * 100).fillna(0),
+        "OCR Model Accuracy (A vs N)": (table['A'] / total_an.where(total_an > 0) * 100).fillna(0)
+    }, index=table.index)
+
+
+def _batch_statistics_frame(table):
+    """Derive the batch statistics columns from a batch x flag-slot count table"""
+    if table.empty:
+        # Same columns and dtypes with no rows, so callers can index it as usual
+        table = pd.DataFrame(
+            0,
+            index=pd.MultiIndex.from_tuples([], names=["BATCH_ID", "DISCO"]),
+            columns=FLAG_SLOTS,
+            dtype="int64"
+        )
+
+    rates = kpi_rates(table)
+    return pd.DataFrame({
+        "Batch ID": np.asarray(table.index.get_level_values("BATCH_ID"), dtype=object),
+        "DISCO": np.asarray(table.index.get_level_values("DISCO"), dtype=object),
+        "Total Records": rates["Total Records"].values,
+        "Processed": rates["Processed"].values,
+        "Successful (A,C,D)": table[SUCCESS_FLAGS].sum(axis=1).values,
+        "Success Rate (A,C,D)": rates["Success Rate (A,C,D)"].values,
+        "Processing Rate": rates["Processing Rate"].values,
+        "OCR Model Accuracy (A vs N)": rates["OCR Model Accuracy (A vs N)"].values,
+        "Flag A": table['A'].values,
+        "Flag C": table['C'].values,
+        "Flag D": table['D'].values,
+        "Flag E": table['E'].values,
+        "Flag N": table['N'].values,
+        "Total A+N": (table['A'] + table['N']).values
+    })
+
+
+def get_batch_statistics(df):
+    """Get statistics for all batches"""
+    table = _batch_flag_table(df["BATCH_ID"], df["DISCO_NAME"], df["IMAGE_VERIFY_CODE_PITC"])
+    return _batch_statistics_frame(table)
+
+
+def get_batch_statistics_from_counts(counts):
+    """Get statistics for all batches from aggregated counts"""
+    table = _batch_flag_table(
+        counts["BATCH_ID"], counts["DISCO_NAME"], counts["IMAGE_VERIFY_CODE_PITC"], counts["RECORD_COUNT"]
+    )
+    return _batch_statistics_frame(table)
+
+
+def calculate_ocr_model_accuracy(df):
+    """Calculate OCR model accuracy based on A vs N flags only"""
+    return calculate_ocr_model_accuracy_from_counts(df["IMAGE_VERIFY_CODE_PITC"].value_counts())
+
+
+def calculate_ocr_model_accuracy_from_counts(flag_totals):
+    """Calculate OCR model accuracy from per-flag totals"""
+    count_a = flag_totals.get('A', 0)
+    count_n = flag_totals.get('N', 0)
+    total_an = count_a + count_n
+
+    if total_an > 0:
+        accuracy = (count_a / total_an * 100)
+    else:
+        accuracy = 0
+
+    return {
+        "count_a": count_a,
+        "count_n": count_n,
+        "total_an": total_an,
+        "accuracy": accuracy
+    }
@@ -0,0 +1,720 @@
+# =========================
+# DATA STORE - PROCESS-WIDE CACHES SHARED BY EVERY SESSION
+# =========================
+# Holds, per DISCO ("ALL" for all DISCOS) and bill-month range: the read-only
+# record store with its summary and search index; and per DISCO the aggregate
+# counts with their BILMONTH high-water mark. A new range reuses the bill months
+# a cached store already holds (cut out of it, so no per-month copy is kept),
+# and at most RECORD_RANGES_PER_DISCO ranges are kept per DISCO. "ALL" is always
+# built from one query per DISCO code run in parallel, never from a single
+# unfiltered scan. Nothing here touches Streamlit, so a worker, benchmark or
+# API can import and drive it; the page only renders what it returns.
+#
+# Progressive mode reads a KPI estimate from a block sample (see estimate.py)
+# while the exact aggregates load on a background thread; All DISCOS is one
+# sampled query grouped by DISCO.
+#
+# Database results are also written to per-month snapshots on disk (see
+# snapshot.py), so after a restart only months whose data changed are queried.
+# A snapshot that cannot be read or written is counted as a snapshot_errors
+# metric and logged, and the data is loaded from Oracle instead.
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    RECORD_CACHE_SECONDS,
+    RECORD_RANGES_PER_DISCO,
+    RECORD_PAGE_CACHE_ENTRIES,
+    INCREMENTAL_REFRESH_SECONDS,
+    SAMPLE_ROWS,
+    SAMPLE_SEED,
+    ESTIMATE_SAMPLE_PERCENT,
+    ESTIMATE_SAMPLE_BLOCK,
+    ESTIMATE_SAMPLE_GROUPS,
+    ESTIMATE_MAX_SAMPLE_PERCENT
+)
+from .compact import CompactRecords
+from .constants import DISCO_MAP
+from .database import (
+    count_audit_rows,
+    query_disco_records,
+    query_all_disco_records,
+    query_disco_aggregates,
+    query_month_versions,
+    query_sample_aggregates,
+    run_per_disco,
+    stream_disco_counts
+)
+from .estimate import EmptySampleError, estimate_from_sample, sample_block_counts, sample_record_counts
+from .incremental import high_water_mark, merge_counts_since
+from .metrics import cache_lookup, count, stage
+from .rollup import RollupCube
+from .search import RecordSearchIndex
+from .snapshot import (
+    snapshots_enabled,
+    month_label,
+    record_month_versions,
+    load_record_month,
+    save_record_months,
+    prune_record_months,
+    load_aggregate_snapshot,
+    save_aggregate_snapshot
+)
+from .statistics import aggregate_records
+from .summary import summarize_counts, summarize_records
+from .synthetic import generate_records
+from .trend import month_trend
+
+SOURCE_DATABASE = "database"
+SOURCE_SAMPLE = "sample"
+
+logger = logging.getLogger(__name__)
+
+_store = {
+    "lock": threading.Lock(),
+    "disco_locks": {},
+    "records": {},
+    "aggregates": {},
+    "record_versions": {},
+    "row_counts": {},
+    "estimates": {},
+    "aggregate_jobs": {},
+    # Set while a background worker keeps aggregates fresh (see prewarm.py)
+    "background_refresh": False
+}
+
+
+def _key(disco_code):
+    return disco_code or "ALL"
+
+
+def _disco_lock(kind, key):
+    with _store["lock"]:
+        return _store["disco_locks"].setdefault((kind, key), threading.Lock())
+
+
+# =========================
+# RECORDS
+# =========================
+def load_sample_records(disco_code=None, month_range=None):
+    """Seeded synthetic records standing in for one DISCO (or all DISCOS, one sample per DISCO).
+
+    Each DISCO is drawn with its own seed (SAMPLE_SEED plus its code), so
+    DISCOs differ from one another but every process sees the same data.
+    A month_range the sample has no months in (a database range, say) is
+    ignored rather than leaving no records at all.
+    """
+    if not disco_code:
+        records = CompactRecords.concat([load_sample_records(code) for code in DISCO_MAP])
+    else:
+        with stage("compute", step="sample_records", disco=disco_code):
+            records = generate_records(SAMPLE_ROWS, seed=SAMPLE_SEED + int(disco_code), disco_weights={disco_code: 1})
+    if month_range is None:
+        return records
+    inside = _in_month_range(records["BILMONTH"], month_range)
+    return records.take(inside) if inside.any() else records
+
+
+def _in_month_range(months, month_range):
+    """Boolean mask of the BILMONTH values inside month_range (undated = outside)"""
+    if isinstance(months.dtype, pd.CategoricalDtype):
+        # Compared once per category rather than once per row
+        categories = pd.DatetimeIndex(months.cat.categories)
+        inside = np.append((categories >= month_range[0]) & (categories <= month_range[1]), False)
+        return inside[months.cat.codes.to_numpy()]
+    return ((months >= month_range[0]) & (months <= month_range[1])).to_numpy()
+
+
+def _snapshot_failed(action, disco_code, error):
+    # Kept visible, so a broken or full SNAPSHOT_DIR does not look like "no snapshots"
+    count("snapshot_errors", action=action, disco=disco_code)
+    logger.warning("Snapshot %s failed for DISCO %s: %s", action, disco_code, error)
+
+
+def _save_snapshot(save, disco_code, *args):
+    # Snapshots only save work later; failing to write one never fails a load
+    try:
+        save(disco_code, *args)
+    except Exception as e:
+        _snapshot_failed(save.__name__, disco_code, e)
+
+
+def _month_in_store(disco_code, month, version):
+    # A bill month cut out of a cached record store that holds it at this data version
+    with _store["lock"]:
+        entries = list(_store["records"].values())
+    for entry in entries:
+        if entry["months"].get((disco_code, month)) == version:
+            records = entry["records"]
+            rows = _in_month_range(records["BILMONTH"], (month, month))
+            # All DISCOS stores hold every DISCO's rows for the month
+            return records.take(rows & (records["DISCO_CODE"] == disco_code).to_numpy())
+    return None
+
+
+def _cached_month(disco_code, month, version, on_disk):
+    # A bill month held by a cached record store, else in a snapshot, if its data version is unchanged
+    records = _month_in_store(disco_code, month, version)
+    cache_lookup("record_months", records is not None)
+    if records is not None:
+        return records
+    label = month_label(month)
+    if on_disk.get(label) != version:
+        return None
+    try:
+        with stage("snapshot", kind="records", disco=disco_code) as timing:
+            records = load_record_month(disco_code, label, version)
+            timing.rows = len(records)
+    except Exception as e:
+        _snapshot_failed("load_record_month", disco_code, e)
+        return None
+    return records
+
+
+def _snapshot_months(disco_code, records, versions):
+    # Save freshly queried records as per-month snapshots
+    labels = {month_label(month): versions[month] for month in records["BILMONTH"].cat.categories if month in versions}
+    _save_snapshot(prune_record_months, disco_code, labels)
+    _save_snapshot(save_record_months, disco_code, records, labels)
+
+
+def _version_rows(version):
+    # Row count part of a "<rows>-<checksum>" month version
+    return int(version.split("-", 1)[0])
+
+
+def _fetch_progress(on_progress, expected_rows, done):
+    # on_chunk for one more fetch, reporting its rows on top of those already fetched (in done)
+    if on_progress is None:
+        return None
+    before = dict(done)
+
+    def on_chunk(loaded_rows, processed_rows):
+        done.update(loaded=before["loaded"] + loaded_rows, processed=before["processed"] + processed_rows)
+        # Undated rows are not in the month counts, so the total grows to cover them as they arrive
+        on_progress(done["loaded"], max(expected_rows, done["loaded"]), done["processed"])
+    return on_chunk
+
+
+def _query_records(disco_code, on_progress=None, month_range=None):
+    """One DISCO's records for a bill-month range (None = every month plus undated rows).
+
+    Returns (records, versions), versions being the {bill month: data version}
+    the records hold. Months whose version is unchanged are cut from a cached
+    record store or read from their snapshot; only the others are queried, one
+    BETWEEN per run of consecutive months, so widening a range loads just the
+    added months. on_progress (see load_records) counts against the row
+    counts of the queried months, so no extra COUNT(*) is run.
+    """
+    versions = query_month_versions(disco_code, month_range)
+    on_disk = record_month_versions(disco_code) if snapshots_enabled() else {}
+    parts, runs = [], []
+    expected_rows = 0
+
+    previous_cached = True
+    for month in sorted(versions):
+        part = _cached_month(disco_code, month, versions[month], on_disk)
+        if part is not None:
+            parts.append(part)
+        elif previous_cached or not runs:
+            runs.append([month, month])
+        else:
+            runs[-1][1] = month
+        if part is None:
+            expected_rows += _version_rows(versions[month])
+        previous_cached = part is not None
+
+    fetches = [{"month_range": tuple(run)} for run in runs]
+    if month_range is None:
+        # Undated rows have no month to cache under, so they are always queried
+        fetches.append({"bilmonths": [None]})
+
+    done = {"loaded": 0, "processed": 0}
+    for fetch in fetches:
+        fresh = query_disco_records(disco_code, _fetch_progress(on_progress, expected_rows, done), **fetch)
+        if fresh is not None:
+            parts.append(fresh)
+            if snapshots_enabled():
+                _snapshot_months(disco_code, fresh, versions)
+
+    return (CompactRecords.concat(parts) if parts else None), versions
+
+
+def _load_record_entry(disco_code=None, on_progress=None, month_range=None):
+    key = (_key(disco_code), month_range)
+
+    # One load per DISCO and range at a time; other DISCOs are not blocked
+    with _disco_lock("records", key):
+        version = _store["record_versions"].get(_key(disco_code), 0)
+        entry = _store["records"].get(key)
+        fresh = entry and entry["version"] == version and time.time() - entry["loaded_at"] < RECORD_CACHE_SECONDS
+        cache_lookup("records", bool(fresh))
+        if fresh:
+            return entry
+
+        missing, versions = {}, {}
+
+        def query(code, on_code_progress):
+            records, versions[code] = _query_records(code, on_code_progress, month_range)
+            return records
+
+        try:
+            if disco_code:
+                records = query(disco_code, on_progress)
+            else:
+                records, missing = query_all_disco_records(on_progress, query=query)
+            if records is None:
+                raise Exception(next(iter(missing.values()), "No data returned from database"))
+            source, error = SOURCE_DATABASE, None
+            # Bill months later loads can cut out of this store instead of keeping a copy of their own
+            codes = [disco_code] if disco_code else [code for code in DISCO_MAP if code not in missing]
+            months = {
+                (code, month): version
+                for code in codes
+                for month, version in versions.get(code, {}).items()
+            }
+        except Exception as e:
+            records, source, error, missing = load_sample_records(disco_code, month_range), SOURCE_SAMPLE, str(e), {}
+            months = {}
+
+        entry = {
+            "records": records,
+            "source": source,
+            "error": error,
+            "missing": missing,
+            "months": months,
+            "version": version,
+            "loaded_at": time.time(),
+            "lock": threading.Lock()
+        }
+        with _store["lock"]:
+            # Other ranges of this DISCO are dropped once nobody reloaded them for a cache period,
+            # and beyond the RECORD_RANGES_PER_DISCO most recently loaded
+            others = sorted(
+                (other for other in _store["records"] if other[0] == key[0] and other != key),
+                key=lambda other: _store["records"][other]["loaded_at"],
+                reverse=True
+            )
+            for rank, other in enumerate(others, start=1):
+                if rank >= RECORD_RANGES_PER_DISCO or time.time() - _store["records"][other]["loaded_at"] >= RECORD_CACHE_SECONDS:
+                    del _store["records"][other]
+            _store["records"][key] = entry
+        return entry
+
+
+def _entry_memo(entry, name, build):
+    # Built once per record store, whichever session asks first
+    with entry["lock"]:
+        cache_lookup("record_memo", name in entry)
+        if name not in entry:
+            with stage("compute", step=name):
+                entry[name] = build(entry["records"])
+        return entry[name]
+
+
+def load_records(disco_code=None, on_progress=None, month_range=None):
+    """Shared read-only CompactRecords for a DISCO, loaded once per process and refreshed every RECORD_CACHE_SECONDS.
+
+    month_range = (first, last) bill month limits the records to that range;
+    None loads every month, undated rows included. Falls back to synthetic
+    records when Oracle is unreachable. on_progress(loaded_rows,
+    expected_rows, processed_rows) is called after every fetched chunk, and
+    only when this call does the loading.
+    """
+    return _load_record_entry(disco_code, on_progress, month_range)["records"]
+
+
+def load_record_summary(disco_code=None, month_range=None):
+    """Summary of the shared record store, computed once per load"""
+    return _entry_memo(_load_record_entry(disco_code, month_range=month_range), "summary", summarize_records)
+
+
+def load_search_index(disco_code=None, month_range=None):
+    """Record Explorer search index over the shared record store, built once per load"""
+    return _entry_memo(_load_record_entry(disco_code, month_range=month_range), "search_index", RecordSearchIndex)
+
+
+def get_record_status(disco_code=None, month_range=None):
+    """Source ("database" or "sample"), size and load time of a DISCO's record store.
+
+    "missing" maps DISCO codes absent from a partial All DISCOS load to the reason.
+    """
+    entry = _store["records"].get((_key(disco_code), month_range))
+    if entry is None:
+        return None
+    return {
+        "source": entry["source"],
+        "error": entry["error"],
+        "missing": entry["missing"],
+        "rows": len(entry["records"]),
+        "loaded_at": entry["loaded_at"]
+    }
+
+
+def get_record_version(disco_code=None):
+    """Version of a DISCO's record store; bumped by invalidate_disco"""
+    return _store["record_versions"].get(_key(disco_code), 0)
+
+
+def count_records(disco_code=None, ref_prefix=None, month_range=None):
+    """Matching row count for database paging, cached for RECORD_CACHE_SECONDS.
+
+    At most RECORD_PAGE_CACHE_ENTRIES counts are kept, as every search prefix
+    is counted on its own.
+    """
+    key = (_key(disco_code), ref_prefix, month_range)
+    cached = _store["row_counts"].get(key)
+    cache_lookup("row_counts", bool(cached and time.time() - cached[1] < RECORD_CACHE_SECONDS))
+    if cached and time.time() - cached[1] < RECORD_CACHE_SECONDS:
+        return cached[0]
+    matching = count_audit_rows(disco_code, ref_prefix, month_range)
+    with _store["lock"]:
+        counts = _store["row_counts"]
+        for expired in [other for other, (_, counted_at) in counts.items() if time.time() - counted_at >= RECORD_CACHE_SECONDS]:
+            del counts[expired]
+        # Oldest first, as dicts keep insertion order
+        while len(counts) >= RECORD_PAGE_CACHE_ENTRIES:
+            del counts[next(iter(counts))]
+        counts[key] = (matching, time.time())
+    return matching
+
+
+# =========================
+# AGGREGATES
+# =========================
+def _is_fresh(entry):
+    if entry is None or entry["checked_at"] == 0:
+        return False
+    # With a background worker, readers never refresh inline; invalidated entries still do
+    return _store["background_refresh"] or time.time() - entry["checked_at"] < INCREMENTAL_REFRESH_SECONDS
+
+
+def _snapshot_aggregate_entry(disco_code):
+    # Counts saved by an earlier process; due for an incremental check straight away
+    try:
+        with stage("snapshot", kind="aggregates", disco=disco_code):
+            counts = load_aggregate_snapshot(disco_code)
+    except Exception as e:
+        _snapshot_failed("load_aggregate_snapshot", disco_code, e)
+        return None
+    if counts is None or len(counts) == 0:
+        return None
+    entry = {
+        "counts": counts,
+        "summary": summarize_counts(counts),
+        "trend": month_trend(counts),
+        "high_water": high_water_mark(counts),
+        "source": SOURCE_DATABASE,
+        "checked_at": 0
+    }
+    _store["aggregates"][disco_code] = entry
+    return entry
+
+
+def _count_streamed_records(disco_code):
+    try:
+        counts = stream_disco_counts(disco_code)
+        if counts is None:
+            raise Exception("No data returned from database")
+        return counts, SOURCE_DATABASE
+    except Exception:
+        return aggregate_records(load_sample_records(disco_code)), SOURCE_SAMPLE
+
+
+def _load_aggregate_entry(disco_code=None, force=False):
+    key = _key(disco_code)
+
+    # One refresh per DISCO at a time; other DISCOs are not blocked
+    with _disco_lock("aggregates", key):
+        entry = _store["aggregates"].get(key)
+        if entry is None and disco_code and snapshots_enabled():
+            entry = _snapshot_aggregate_entry(disco_code)
+        if not force:
+            cache_lookup("aggregates", _is_fresh(entry))
+            if _is_fresh(entry):
+                return entry
+
+        try:
+            if entry is None or entry["high_water"] is None:
+                counts = query_disco_aggregates(disco_code)
+                if len(counts) == 0:
+                    raise Exception("No data returned from database")
+                trend = month_trend(counts)
+            else:
+                fresh = query_disco_aggregates(disco_code, since=entry["high_water"])
+                counts = merge_counts_since(entry["counts"], fresh, entry["high_water"])
+                # Only the re-counted months are rebuilt; older trend rows are kept as they are
+                trend = merge_counts_since(entry["trend"], month_trend(fresh), entry["high_water"])
+            high_water, source = high_water_mark(counts), SOURCE_DATABASE
+            if disco_code and snapshots_enabled():
+                _save_snapshot(save_aggregate_snapshot, disco_code, counts)
+
+        except Exception:
+            if entry is not None:
+                # Keep serving the last good aggregates until the next check
+                entry["checked_at"] = time.time()
+                return entry
+            # Same shape as the database result, counted from streamed rows that are not kept;
+            # from the sample records there is no high-water mark, so the next check does a full reload
+            counts, source = _count_streamed_records(disco_code)
+            trend = month_trend(counts)
+            high_water = high_water_mark(counts) if source == SOURCE_DATABASE else None
+
+        # Built completely before it is published, so readers see the old entry or the new one
+        with stage("compute", step="summary"):
+            summary = summarize_counts(counts)
+        entry = {
+            "counts": counts,
+            "summary": summary,
+            "trend": trend,
+            "high_water": high_water,
+            "source": source,
+            "checked_at": time.time()
+        }
+        _store["aggregates"][key] = entry
+        return entry
+
+
+def _load_all_aggregate_entry(force=False):
+    # Merged from the per-DISCO entries, so it is exactly as fresh as they are
+    with _disco_lock("aggregates", "ALL"):
+        cached = {code: _store["aggregates"].get(code) for code in DISCO_MAP}
+        stale = [code for code, entry in cached.items() if force or not _is_fresh(entry)]
+        results, missing = run_per_disco(lambda code: _load_aggregate_entry(code, force), stale)
+        cached.update(results)
+        parts = {code: entry for code, entry in cached.items() if code not in missing and entry is not None}
+
+        entry = _store["aggregates"].get("ALL")
+        if entry and entry["missing"] == missing and entry["parts"].keys() == parts.keys() \
+                and all(entry["parts"][code] is part for code, part in parts.items()):
+            return entry
+
+        if parts:
+            counts = pd.concat([part["counts"] for part in parts.values()], ignore_index=True)
+            trend = pd.concat([part["trend"] for part in parts.values()], ignore_index=True)
+            high_waters = [part["high_water"] for part in parts.values() if part["high_water"] is not None]
+            high_water = min(high_waters) if len(high_waters) == len(parts) else None
+            checked_at = min(part["checked_at"] for part in parts.values())
+            sources = {part["source"] for part in parts.values()}
+            source = SOURCE_DATABASE if sources == {SOURCE_DATABASE} else SOURCE_SAMPLE
+        else:
+            counts, high_water, checked_at = aggregate_records(load_sample_records()), None, time.time()
+            trend = month_trend(counts)
+            source = SOURCE_SAMPLE
+
+        with stage("compute", step="summary"):
+            summary = summarize_counts(counts)
+        entry = {
+            "counts": counts,
+            "summary": summary,
+            "trend": trend,
+            "high_water": high_water,
+            "source": source,
+            "checked_at": checked_at,
+            "parts": parts,
+            "missing": missing
+        }
+        _store["aggregates"]["ALL"] = entry
+        return entry
+
+
+def _aggregate_entry(disco_code=None, force=False):
+    if disco_code:
+        return _load_aggregate_entry(disco_code, force)
+    return _load_all_aggregate_entry(force)
+
+
+def refresh_disco_aggregates(disco_code=None):
+    """Refresh one DISCO's aggregates now (incrementally when possible), whatever their age"""
+    return _aggregate_entry(disco_code, force=True)
+
+
+def set_background_refresh(enabled):
+    """Let readers serve aggregates of any age because a worker keeps them fresh"""
+    _store["background_refresh"] = enabled
+
+
+def load_disco_aggregates(disco_code=None):
+    """Cached per-DISCO aggregates, refreshed incrementally past the BILMONTH high-water mark"""
+    return _aggregate_entry(disco_code)["counts"]
+
+
+def _aggregate_memo(entry, name, build):
+    # Per-entry results; a refresh publishes a new entry, which starts empty
+    memo = entry.setdefault("memo", {})
+    cache_lookup("aggregate_memo", name in memo)
+    if name not in memo:
+        with stage("compute", step=name if isinstance(name, str) else name[0]):
+            memo[name] = build(entry["counts"])
+    return memo[name]
+
+
+def load_disco_summary(disco_code=None, month_range=None):
+    """Summary of the cached aggregates (for a bill-month range), rebuilt only when the counts are refreshed"""
+    entry = _aggregate_entry(disco_code)
+    if month_range is None:
+        return entry["summary"]
+
+    return _aggregate_memo(
+        entry,
+        ("summary", month_range),
+        lambda counts: summarize_counts(counts[_in_month_range(counts["BILMONTH"], month_range)])
+    )
+
+
+def load_disco_trend(disco_code=None):
+    """Per-(DISCO, bill month) flag counts for trend lines (see trend.py), kept up to date with the aggregates"""
+    return _aggregate_entry(disco_code)["trend"]
+
+
+def load_rollup_cube(disco_code=None):
+    """DISCO / batch / sub-division rollup of the cached aggregates, built once per refresh"""
+    return _aggregate_memo(_aggregate_entry(disco_code), "rollup", RollupCube)
+
+
+def load_bill_months(disco_code=None, estimated=False):
+    """Bill months present in a DISCO's aggregates (or in its estimate sample), oldest first"""
+    return _aggregate_memo(
+        _estimate_entry(disco_code) if estimated else _aggregate_entry(disco_code),
+        "bill_months",
+        lambda counts: [month.to_pydatetime() for month in sorted(pd.to_datetime(counts["BILMONTH"].dropna().unique()))]
+    )
+
+
+def aggregates_ready(disco_code=None):
+    """Whether exact aggregates are cached for a DISCO (for All DISCOS: for every DISCO)"""
+    codes = [disco_code] if disco_code else list(DISCO_MAP)
+    return all(_store["aggregates"].get(code) is not None for code in codes)
+
+
+def load_aggregates_in_background(disco_code=None):
+    """Load a DISCO's exact aggregates on a daemon thread; a no-op while one is already loading it"""
+    key = _key(disco_code)
+    with _store["lock"]:
+        job = _store["aggregate_jobs"].get(key)
+        if job is not None and job.is_alive():
+            return job
+        job = threading.Thread(target=_aggregate_entry, args=(disco_code,), name=f"ocr-aggregates-{key}", daemon=True)
+        _store["aggregate_jobs"][key] = job
+    job.start()
+    return job
+
+
+def get_aggregate_status(disco_code=None):
+    """Last check time, high-water mark and source ("database" or "sample") of a DISCO's cached aggregates.
+
+    For All DISCOS, "missing" maps the DISCOs left out to the reason.
+    """
+    return _store["aggregates"].get(_key(disco_code))
+
+
+def invalidate_disco(disco_code=None):
+    """Force the next load of one DISCO (or of every DISCO, for All DISCOS) to refresh"""
+    key = _key(disco_code)
+    # All DISCOS aggregates are merged from the per-DISCO ones, so those are the ones to expire
+    for aggregate_key in [disco_code] if disco_code else list(DISCO_MAP):
+        with _disco_lock("aggregates", aggregate_key):
+            entry = _store["aggregates"].get(aggregate_key)
+            if entry is not None:
+                entry["checked_at"] = 0
+    with _store["lock"]:
+        _store["record_versions"][key] = _store["record_versions"].get(key, 0) + 1
+        # Cached record stores stop lending their bill months too, so the reload queries Oracle
+        codes = [disco_code] if disco_code else list(DISCO_MAP)
+        for entry in _store["records"].values():
+            entry["months"] = {month_key: version for month_key, version in entry["months"].items() if month_key[0] not in codes}
+        for estimate_key in {key, "ALL"} & _store["estimates"].keys():
+            del _store["estimates"][estimate_key]
+
+
+# =========================
+# ESTIMATES
+# =========================
+def _sample_percents():
+    # ESTIMATE_SAMPLE_PERCENT, then 4x larger samples up to ESTIMATE_MAX_SAMPLE_PERCENT
+    percent = ESTIMATE_SAMPLE_PERCENT
+    while True:
+        yield percent
+        if percent >= ESTIMATE_MAX_SAMPLE_PERCENT:
+            return
+        percent = min(percent * 4, ESTIMATE_MAX_SAMPLE_PERCENT)
+
+
+def _sample_counts(disco_code, percent):
+    # One sampled scan, for All DISCOS too (grouped by DISCO in Oracle), limited to the known DISCO codes
+    counts, group_counts = query_sample_aggregates(disco_code, percent)
+    if not disco_code:
+        counts = counts[counts["DISCO_CODE"].isin(list(DISCO_MAP))].reset_index(drop=True)
+        group_counts = group_counts[group_counts["DISCO_CODE"].isin(list(DISCO_MAP))].reset_index(drop=True)
+    return counts, group_counts
+
+
+def _sample_record_counts(disco_code, percent):
+    # The same kind of sample, drawn from the sample records
+    records, fraction = load_sample_records(disco_code), percent / 100
+    if ESTIMATE_SAMPLE_BLOCK:
+        return sample_block_counts(records, fraction, ESTIMATE_SAMPLE_GROUPS, seed=SAMPLE_SEED)
+    return sample_record_counts(records, fraction, seed=SAMPLE_SEED), None
+
+
+def _estimate_entry(disco_code=None):
+    key = _key(disco_code)
+    with _disco_lock("estimates", key):
+        entry = _store["estimates"].get(key)
+        cache_lookup("estimates", entry is not None and time.time() - entry["estimated_at"] < RECORD_CACHE_SECONDS)
+        if entry is not None and time.time() - entry["estimated_at"] < RECORD_CACHE_SECONDS:
+            return entry
+
+        # An empty sample is redrawn larger from the same source; Oracle is not retried once unreachable
+        source = SOURCE_DATABASE
+        for percent in _sample_percents():
+            if source == SOURCE_DATABASE:
+                try:
+                    counts, group_counts = _sample_counts(disco_code, percent)
+                except Exception:
+                    source = SOURCE_SAMPLE
+            if source == SOURCE_SAMPLE:
+                counts, group_counts = _sample_record_counts(disco_code, percent)
+            if len(counts):
+                break
+            count("empty_samples", disco=key, percent=f"{percent:g}")
+        else:
+            raise EmptySampleError(f"No rows in a {percent:g}% sample of DISCO {key}")
+
+        entry = {
+            "counts": counts,
+            "group_counts": group_counts,
+            "fraction": percent / 100,
+            "source": source,
+            "estimated_at": time.time()
+        }
+        _store["estimates"][key] = entry
+        return entry
+
+
+def load_estimate(disco_code=None, month_range=None):
+    """KPI estimate with 95% intervals from an ESTIMATE_SAMPLE_PERCENT block (or row) sample (see estimate.py).
+
+    The sample is drawn once per DISCO, or once for All DISCOS, every
+    RECORD_CACHE_SECONDS; a month range is cut from it. "source" tells whether
+    Oracle or the sample records were sampled, "fraction" how much was. A
+    sample that stays empty up to ESTIMATE_MAX_SAMPLE_PERCENT raises
+    EmptySampleError.
+    """
+    entry = _estimate_entry(disco_code)
+
+    def build(counts):
+        group_counts = entry["group_counts"]
+        if month_range is not None:
+            counts = counts[_in_month_range(counts["BILMONTH"], month_range)]
+            if group_counts is not None:
+                group_counts = group_counts[_in_month_range(group_counts["BILMONTH"], month_range)]
+        estimate = estimate_from_sample(counts, entry["fraction"], group_counts, ESTIMATE_SAMPLE_GROUPS)
+        estimate["source"] = entry["source"]
+        return estimate
+
+    return _aggregate_memo(entry, ("estimate", month_range), build)
@@ -0,0 +1,99 @@
+# =========================
+# SYNTHETIC DATA - SEEDED, VECTORIZED AUDIT RECORDS
+# =========================
+# Offline fallback for the dashboard and load-test fixture. Rows follow the
+# production REF_DIGITS layout (batch no, DISCO code, sub-division digit,
+# 9-digit serial) and are generated straight into CompactRecords, so 100M
+# rows cost about 10 bytes each and never exist as Python strings.
+import numpy as np
+import pandas as pd
+
+from .constants import DISCO_MAP
+from .compact import CompactRecords
+
+# Same mix the original sample generator used (None = not processed yet)
+DEFAULT_FLAG_PROBABILITIES = {'A': 0.35, 'C': 0.2, 'D': 0.15, 'E': 0.1, 'N': 0.05, None: 0.15}
+
+# Rows drawn per step; bounds the int64 temporaries while generating
+GENERATE_CHUNK_ROWS = 5_000_000
+
+REF_WIDTH = 14
+SERIAL_DIGITS = 9
+RAW_COLUMNS = ["REF_DIGITS", "DISCO_CODE", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"]
+
+
+def _normalized(weights):
+    values = np.asarray(list(weights.values()), dtype=np.float64)
+    if (values < 0).any() or values.sum() <= 0:
+        raise ValueError("weights must be non-negative and not all zero")
+    return list(weights), values / values.sum()
+
+
+def generate_records(
+    rows,
+    seed=0,
+    disco_weights=None,
+    flag_probabilities=None,
+    start_month="2024-01-01",
+    months=6,
+    batches=19,
+    sub_divisions=4
+):
+    """Seeded synthetic audit records as CompactRecords.
+
+    disco_weights maps DISCO codes to relative weights (default: every DISCO,
+    equally), flag_probabilities maps flags (None = pending) to relative
+    weights, BILMONTH spans `months` month starts from start_month, and batch
+    numbers run 01..batches with sub-division digits 1..sub_divisions.
+    """
+    if not 1 <= batches <= 99 or not 1 <= sub_divisions <= 9:
+        raise ValueError("batches must be 1-99 and sub_divisions 1-9")
+
+    discos, disco_p = _normalized(disco_weights or {code: 1 for code in DISCO_MAP})
+    flags, flag_p = _normalized(flag_probabilities or DEFAULT_FLAG_PROBABILITIES)
+    month_starts = pd.date_range(start_month, periods=months, freq='MS')
+
+    # Digits of each REF_DIGITS part, pre-scaled to their position in the key
+    disco_parts = np.array([int(code) for code in discos], dtype=np.int64) * 10 ** (SERIAL_DIGITS + 1)
+    flag_categories = [flag for flag in flags if flag is not None]
+    flag_codes_lookup = np.array(
+        [flag_categories.index(flag) if flag is not None else -1 for flag in flags], dtype=np.int8
+    )
+
+    rng = np.random.default_rng(seed)
+    keys = np.empty(rows, dtype=np.int64)
+    month_codes = np.empty(rows, dtype=np.int8 if months <= 127 else np.int16)
+    flag_codes = np.empty(rows, dtype=np.int8)
+
+    for start in range(0, rows, GENERATE_CHUNK_ROWS):
+        stop = min(start + GENERATE_CHUNK_ROWS, rows)
+        size = stop - start
+
+        block = keys[start:stop]
+        block[:] = rng.integers(1, batches + 1, size) * 10 ** (SERIAL_DIGITS + 3)
+        block += disco_parts[rng.choice(len(discos), size, p=disco_p)]
+        block += rng.integers(1, sub_divisions + 1, size) * 10 ** SERIAL_DIGITS
+        block += rng.integers(10 ** (SERIAL_DIGITS - 1), 10 ** SERIAL_DIGITS, size)
+
+        month_codes[start:stop] = rng.integers(0, months, size)
+        flag_codes[start:stop] = flag_codes_lookup[rng.choice(len(flags), size, p=flag_p)]
+
+    return CompactRecords(
+        keys,
+        REF_WIDTH,
+        None,
+        pd.Categorical.from_codes(month_codes, categories=month_starts),
+        pd.Categorical.from_codes(flag_codes, categories=flag_categories)
+    )
+
+
+def generate_raw_records(rows, seed=0, **options):
+    """Synthetic rows shaped like the database result (plain object/datetime columns)"""
+    records = generate_records(rows, seed=seed, **options)
+    raw = records.frame(RAW_COLUMNS)
+    return raw.astype({
+        "REF_DIGITS": object,
+        "DISCO_CODE": object,
+        "BILMONTH": "datetime64[ns]",
+        "IMAGE_VERIFY_CODE_PITC": object
+    })
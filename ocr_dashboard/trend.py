@@ -0,0 +1,49 @@
+# =========================
+# TRENDS - PER-MONTH KPI COUNTS BY DISCO, MAINTAINED INCREMENTALLY
+# =========================
+# A trend table has one row per (DISCO, BILMONTH) holding that month's
+# flag-slot counts; the rates are only computed when a view asks for them.
+# It is built from aggregate counts, and a refresh splices in just the months
+# it re-counted (merge_counts_since), so a new bill month adds rows instead of
+# recomputing the history.
+import numpy as np
+import pandas as pd
+
+from .statistics import FLAG_SLOTS, flag_slots, kpi_rates
+
+TREND_KEYS = ["DISCO_CODE", "DISCO_NAME", "BILMONTH"]
+
+
+def month_trend(counts):
+    """Per-(DISCO, bill month) flag-slot counts from aggregated counts; undated rows are left out"""
+    dated = counts[counts["BILMONTH"].notna()]
+    frame = pd.DataFrame({
+        "DISCO_CODE": np.asarray(dated["DISCO_CODE"], dtype=object),
+        "DISCO_NAME": np.asarray(dated["DISCO_NAME"], dtype=object),
+        "BILMONTH": pd.to_datetime(np.asarray(dated["BILMONTH"])),
+        "FLAG": flag_slots(dated["IMAGE_VERIFY_CODE_PITC"]),
+        "RECORD_COUNT": np.asarray(dated["RECORD_COUNT"], dtype=np.int64)
+    })
+
+    table = (
+        frame.groupby(TREND_KEYS + ["FLAG"], sort=True, observed=True)["RECORD_COUNT"].sum()
+        .unstack("FLAG", fill_value=0)
+        .reindex(columns=FLAG_SLOTS, fill_value=0)
+        .astype("int64")
+    )
+    table.columns = list(table.columns)
+    return table.reset_index()
+
+
+def trend_rates(trend, by="DISCO_NAME"):
+    """Month-over-month KPI lines: one row per (by, BILMONTH), rates in percent.
+
+    by=None collapses every DISCO into one line. "OCR Accuracy Change" is the
+    difference to the previous month of the same line.
+    """
+    keys = ([by] if by else []) + ["BILMONTH"]
+    rates = kpi_rates(trend.groupby(keys, sort=True)[FLAG_SLOTS].sum()).reset_index()
+
+    accuracy = rates["OCR Model Accuracy (A vs N)"]
+    rates["OCR Accuracy Change"] = accuracy.groupby(rates[by]).diff() if by else accuracy.diff()
+    return rates
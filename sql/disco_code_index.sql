@@ -0,0 +1,71 @@
+-- =========================
+-- DISCO FILTER INDEXING FOR TBL_GENERAL_BILL_PRINT_AUDIT
+-- =========================
+-- The dashboard filters every query on the DISCO code, i.e. characters 3-4 of
+-- REF_DIGITS, bound as :disco_code. A plain index on REF_DIGITS cannot serve
+-- SUBSTR(REF_DIGITS, 3, 2) = :disco_code, so each DISCO load is a full scan.
+-- Run ONE of the options below (as the table owner), then gather stats.
+
+
+-- -------------------------
+-- OPTION A: function-based index (no app change needed)
+-- -------------------------
+-- The app's default predicate is exactly SUBSTR(REF_DIGITS, 3, 2) = :disco_code,
+-- which the optimizer matches against this index expression.
+
+CREATE INDEX IX_BPA_DISCO_CODE
+    ON TBL_GENERAL_BILL_PRINT_AUDIT (SUBSTR(REF_DIGITS, 3, 2), BILMONTH)
+    ONLINE;
+
+-- Record Explorer pages (ORDER BY REF_DIGITS, ROWID after a keyset) and REF_DIGITS
+-- prefix searches within a DISCO; equal keys are stored in ROWID order, so a page
+-- is a range scan that stops after one page instead of a sort of the whole DISCO.
+CREATE INDEX IX_BPA_DISCO_REF
+    ON TBL_GENERAL_BILL_PRINT_AUDIT (SUBSTR(REF_DIGITS, 3, 2), REF_DIGITS)
+    ONLINE;
+
+
+-- -------------------------
+-- OPTION B: virtual DISCO_CODE column + index
+-- -------------------------
+-- Gives the expression a name other tools can use too. After creating it,
+-- start the app with DISCO_CODE_COLUMN=DISCO_CODE so queries filter, select
+-- and group on the column directly.
+
+-- ALTER TABLE TBL_GENERAL_BILL_PRINT_AUDIT
+--     ADD (DISCO_CODE VARCHAR2(2) GENERATED ALWAYS AS (SUBSTR(REF_DIGITS, 3, 2)) VIRTUAL);
+--
+-- CREATE INDEX IX_BPA_DISCO_CODE
+--     ON TBL_GENERAL_BILL_PRINT_AUDIT (DISCO_CODE, BILMONTH)
+--     ONLINE;
+--
+-- CREATE INDEX IX_BPA_DISCO_REF
+--     ON TBL_GENERAL_BILL_PRINT_AUDIT (DISCO_CODE, REF_DIGITS)
+--     ONLINE;
+
+
+-- -------------------------
+-- STATISTICS (either option)
+-- -------------------------
+-- Hidden/virtual column stats let the optimizer see the per-DISCO skew
+-- (LESCO/MEPCO vs QESCO/TESCO), so bind peeking and adaptive cursor sharing
+-- can pick a range scan for small DISCOs and a full scan where that is cheaper.
+
+BEGIN
+    DBMS_STATS.GATHER_TABLE_STATS(
+        ownname    => USER,
+        tabname    => 'TBL_GENERAL_BILL_PRINT_AUDIT',
+        method_opt => 'FOR ALL HIDDEN COLUMNS SIZE AUTO FOR ALL INDEXED COLUMNS SIZE AUTO',
+        cascade    => TRUE
+    );
+END;
+/
+
+
+-- -------------------------
+-- CHECK
+-- -------------------------
+-- EXPLAIN PLAN FOR
+--     SELECT COUNT(*) FROM TBL_GENERAL_BILL_PRINT_AUDIT WHERE SUBSTR(REF_DIGITS, 3, 2) = :disco_code;
+-- SELECT * FROM TABLE(DBMS_XPLAN.DISPLAY);
+-- Expect INDEX RANGE SCAN on IX_BPA_DISCO_CODE instead of TABLE ACCESS FULL.
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from ocr_dashboard import CompactRecords, decode_ref_digits, encode_ref_digits, enrich_records, generate_raw_records
+
+
+def test_ref_digits_round_trip_keeps_leading_zeros():
+    values = ["00012345", "01110000", "99999999"]
+    keys, width = encode_ref_digits(values)
+
+    assert width == 8
+    assert keys.tolist() == [12345, 1110000, 99999999]
+    assert decode_ref_digits(keys, width).tolist() == values
+
+
+@pytest.mark.parametrize("values", [
+    ["0111", None],
+    ["0111", "011"],
+    ["01A1", "0111"],
+    ["1" * 19]
+])
+def test_unencodable_ref_digits(values):
+    assert encode_ref_digits(values) is None
+
+
+def test_from_frame_matches_enriched_frame():
+    raw = generate_raw_records(3000, seed=7)
+    records = CompactRecords.from_frame(raw)
+    expected = enrich_records(raw.copy())
+
+    actual = records.frame(list(expected.columns)).astype(object)
+    expected = expected.astype(object)
+    pd.testing.assert_frame_equal(actual.where(actual.notna(), None), expected.where(expected.notna(), None))
+
+
+def test_string_fallback_and_concat():
+    keyed = CompactRecords.from_frame(pd.DataFrame({
+        "REF_DIGITS": ["01110000001"],
+        "BILMONTH": [pd.Timestamp("2024-01-01")],
+        "IMAGE_VERIFY_CODE_PITC": ["A"]
+    }))
+    strings = CompactRecords.from_frame(pd.DataFrame({
+        "REF_DIGITS": ["0112X"],
+        "BILMONTH": [pd.Timestamp("2024-02-01")],
+        "IMAGE_VERIFY_CODE_PITC": [None]
+    }))
+
+    assert keyed.ref_keys is not None and strings.ref_keys is None
+    joined = CompactRecords.concat([keyed, strings])
+    assert joined.ref_strings().tolist() == ["01110000001", "0112X"]
+    assert joined["IMAGE_VERIFY_CODE_PITC"].isna().tolist() == [False, True]
+
+
+def test_buffers_are_read_only():
+    records = CompactRecords.from_frame(generate_raw_records(10, seed=1))
+
+    with pytest.raises(ValueError):
+        records.ref_keys[0] = 0
+    # frame() hands out copies the caller may change
+    frame = records.frame(["REF_DIGITS"])
+    frame.loc[0, "REF_DIGITS"] = "x"
@@ -0,0 +1,55 @@
+import contextlib
+
+import pandas as pd
+
+from ocr_dashboard import database
+from ocr_dashboard.database import build_audit_filter
+
+
+def test_disco_and_month_range_are_bound():
+    where_clause, params = build_audit_filter("11", month_range=("2024-01-01", "2024-03-01"))
+
+    assert ":disco_code" in where_clause and "BILMONTH BETWEEN :month_from AND :month_to" in where_clause
+    assert params == {"disco_code": "11", "month_from": "2024-01-01", "month_to": "2024-03-01"}
+
+
+def test_keyset_is_unique_per_row():
+    where_clause, params = build_audit_filter(after_key=("01110000001", "AAAR3sAAEAAAACXAAA"))
+
+    # A REF_DIGITS repeated in later bill months is still reached through its ROWID
+    assert "REF_DIGITS = :after_ref AND ROWID > CHARTOROWID(:after_rowid)" in where_clause
+    assert "REF_DIGITS IS NULL" in where_clause
+    assert params == {"after_ref": "01110000001", "after_rowid": "AAAR3sAAEAAAACXAAA"}
+
+    where_clause, params = build_audit_filter(after_key=(None, "AAAR3sAAEAAAACXAAB"))
+    assert "REF_DIGITS IS NULL AND ROWID > CHARTOROWID(:after_rowid)" in where_clause
+    assert params == {"after_rowid": "AAAR3sAAEAAAACXAAB"}
+
+
+def test_record_page_returns_last_key(monkeypatch):
+    page = pd.DataFrame({
+        "REF_DIGITS": ["01110000001", "01110000001"],
+        "DISCO_CODE": ["11", "11"],
+        "BILMONTH": [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-01")],
+        "IMAGE_VERIFY_CODE_PITC": ["A", "N"],
+        "ROW_ID": ["AAAR3sAAEAAAACXAAA", "AAAR3sAAEAAAACXAAB"]
+    })
+    queries = []
+
+    class Pool:
+        def acquire(self):
+            return contextlib.nullcontext()
+
+    def chunks(connection, query, params, *args):
+        queries.append(query)
+        yield page
+
+    monkeypatch.setattr(database, "get_connection_pool", Pool)
+    monkeypatch.setattr(database, "iter_query_chunks", chunks)
+
+    records, last_key = database.fetch_record_page("11", page_size=2)
+    assert len(records) == 2 and last_key == ("01110000001", "AAAR3sAAEAAAACXAAB")
+    assert "ORDER BY REF_DIGITS, ROWID" in queries[0]
+
+    _, last_key = database.fetch_record_page("11", page_size=3)
+    assert last_key is None
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from ocr_dashboard import CompactRecords, DISCO_MAP, enrich_records, generate_raw_records
+
+DERIVED_COLUMNS = ["DISCO_NAME", "BATCH_NO", "SUB_DIV", "BATCH_ID", "PROCESSING_STATUS", "ACCURACY_CATEGORY"]
+
+
+def enrich_records_rowwise(df):
+    """The original per-row enrichment; DISCO_CODE comes from SUBSTR(REF_DIGITS, 3, 2) in Oracle"""
+    df["DISCO_CODE"] = df["REF_DIGITS"].str[2:4]
+    df["DISCO_NAME"] = df["DISCO_CODE"].map(DISCO_MAP).fillna("UNKNOWN")
+    df["BATCH_NO"] = df["REF_DIGITS"].str[:2]
+    df["SUB_DIV"] = df["REF_DIGITS"].str[:5]
+    df["BATCH_ID"] = df["BATCH_NO"] + "-" + df["DISCO_CODE"]
+    df["PROCESSING_STATUS"] = df["IMAGE_VERIFY_CODE_PITC"].apply(
+        lambda x: "Processed" if pd.notna(x) else "Pending"
+    )
+    df["ACCURACY_CATEGORY"] = df["IMAGE_VERIFY_CODE_PITC"].apply(
+        lambda x: "Success (A,C,D)" if x in ['A', 'C', 'D'] else
+                 "Images Not Available (E)" if x == 'E' else
+                 "Reading Not Matched (N)" if x == 'N' else
+                 "Not Processed" if pd.isna(x) else "Other"
+    )
+    return df
+
+
+def assert_matches_rowwise(raw):
+    # Missing values compared as None, whichever null each side uses
+    expected = enrich_records_rowwise(raw.copy())[DERIVED_COLUMNS].astype(object)
+    actual = enrich_records(raw.copy())[DERIVED_COLUMNS].astype(object)
+    pd.testing.assert_frame_equal(actual.where(actual.notna(), None), expected.where(expected.notna(), None))
+
+
+def test_generated_records_match_rowwise():
+    assert_matches_rowwise(generate_raw_records(2000, seed=5)[["REF_DIGITS", "IMAGE_VERIFY_CODE_PITC"]])
+
+
+def test_missing_ref_digits_get_unknown_disco():
+    raw = pd.DataFrame({
+        "REF_DIGITS": ["01110000001", None, "02990000003"],
+        "IMAGE_VERIFY_CODE_PITC": ["A", "X", None]
+    })
+    assert_matches_rowwise(raw)
+
+    names = enrich_records(raw.copy())["DISCO_NAME"]
+    assert names.tolist() == ["LESCO", "UNKNOWN", "UNKNOWN"]
+
+
+def test_compact_records_missing_ref_digits_get_unknown_disco():
+    records = CompactRecords.from_frame(pd.DataFrame({
+        "REF_DIGITS": [None, "01110000002"],
+        "BILMONTH": [pd.Timestamp("2024-01-01")] * 2,
+        "IMAGE_VERIFY_CODE_PITC": ["A", "N"]
+    }))
+
+    assert records["DISCO_NAME"].tolist() == ["UNKNOWN", "LESCO"]
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from ocr_dashboard import database, estimate_from_sample, generate_records, sample_record_counts, wilson_interval
+from ocr_dashboard.estimate import ratio_design_effect, sample_block_counts
+
+FRACTION = 0.05
+GROUPS = 32
+
+
+def test_row_sample_intervals_are_binomial():
+    counts = sample_record_counts(generate_records(50_000, seed=1), FRACTION, seed=2)
+    estimate = estimate_from_sample(counts, FRACTION)
+
+    flags = counts.groupby("IMAGE_VERIFY_CODE_PITC", observed=True)["RECORD_COUNT"].sum()
+    assert estimate["intervals"]["ocr_accuracy"] == wilson_interval(flags["A"], flags["A"] + flags["N"])
+    assert set(estimate["design_effects"].values()) == {1.0}
+    assert estimate["sampled_rows"] == counts["RECORD_COUNT"].sum()
+
+
+def test_design_effect():
+    # Groups with the population rate show no clustering; groups at 0% and 100% a lot
+    assert ratio_design_effect([50, 50, 50, 50], [100, 100, 100, 100]) == 1.0
+    assert ratio_design_effect([100, 0, 100, 0], [100, 100, 100, 100]) > 50
+
+
+def coverage(records, with_groups, runs=40):
+    flags = records["IMAGE_VERIFY_CODE_PITC"]
+    truth = (flags == "A").sum() / flags.isin(["A", "N"]).sum() * 100
+    covered = 0
+    for seed in range(runs):
+        counts, group_counts = sample_block_counts(records, FRACTION, GROUPS, seed=seed)
+        low, high = estimate_from_sample(counts, FRACTION, group_counts if with_groups else None, GROUPS)["intervals"]["ocr_accuracy"]
+        covered += low <= truth <= high
+    return covered / runs
+
+
+def test_block_sample_intervals_cover_clustered_data():
+    records = generate_records(100_000, seed=1)
+    # Rows loaded flag by flag, so every block holds a single flag
+    clustered = records.take(np.argsort(records["IMAGE_VERIFY_CODE_PITC"].cat.codes.to_numpy(), kind="stable"))
+
+    assert coverage(clustered, with_groups=False) < 0.5
+    assert coverage(clustered, with_groups=True) >= 0.8
+    # Unclustered rows keep their binomial intervals
+    assert coverage(records, with_groups=True) >= 0.85
+
+
+def test_sample_query_splits_grouping_sets(monkeypatch):
+    rows = pd.DataFrame({
+        "DISCO_CODE": ["11", "11", "11"],
+        "BATCH_NO": ["01", None, None],
+        "SUB_DIV": ["01111", None, None],
+        "BILMONTH": [pd.Timestamp("2024-01-01")] * 3,
+        "IMAGE_VERIFY_CODE_PITC": ["A", "A", "A"],
+        "SAMPLE_GROUP": [None, 3, 7],
+        "RECORD_COUNT": [5, 2, 3]
+    })
+    monkeypatch.setattr(database, "_fetch_counts", lambda *args: rows)
+
+    counts, group_counts = database.query_sample_aggregates("11")
+    assert counts[["BATCH_ID", "DISCO_NAME", "RECORD_COUNT"]].values.tolist() == [["01-11", "LESCO", 5]]
+    assert group_counts["SAMPLE_GROUP"].tolist() == [3, 7]
+    assert group_counts["RECORD_COUNT"].sum() == counts["RECORD_COUNT"].sum()
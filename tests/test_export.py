@@ -0,0 +1,52 @@
+import contextlib
+
+import pandas as pd
+import pytest
+
+from ocr_dashboard import CompactRecords, RECORD_COLUMNS, database, iter_record_chunks, write_export
+from ocr_dashboard.store import load_sample_records
+
+
+@pytest.mark.parametrize("fmt", ["csv", "csv.gz"])
+def test_chunked_csv_round_trip(tmp_path, fmt):
+    records = load_sample_records("11").take(slice(0, 250))
+    path = tmp_path / f"records.{fmt}"
+
+    rows = write_export(iter_record_chunks(records, chunk_rows=100), path, fmt)
+
+    exported = pd.read_csv(path, dtype={"REF_DIGITS": str, "DISCO_CODE": str})
+    assert rows == len(exported) == 250
+    assert list(exported.columns) == RECORD_COLUMNS
+    assert exported["REF_DIGITS"].tolist() == records.ref_strings().tolist()
+
+
+def test_empty_export_keeps_its_header(tmp_path):
+    path = tmp_path / "records.csv"
+
+    assert write_export(iter_record_chunks(load_sample_records("11").take(slice(0, 0))), path, "csv") == 0
+    assert path.read_text().strip() == ",".join(RECORD_COLUMNS)
+
+
+def test_database_export_streams_unsorted_chunks(tmp_path, monkeypatch):
+    raw = load_sample_records("12").frame(["REF_DIGITS", "DISCO_CODE", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"])
+    queries = []
+
+    class Pool:
+        def acquire(self):
+            return contextlib.nullcontext()
+
+    def chunks(connection, query, params, **kwargs):
+        queries.append(query)
+        yield raw.iloc[:300]
+        yield raw.iloc[300:450]
+
+    monkeypatch.setattr(database, "get_connection_pool", Pool)
+    monkeypatch.setattr(database, "iter_query_chunks", chunks)
+    path = tmp_path / "disco.csv"
+
+    rows = write_export(database.iter_database_export("12"), path, "csv")
+
+    exported = pd.read_csv(path, dtype={"REF_DIGITS": str})
+    assert rows == len(exported) == 450
+    assert list(exported.columns) == list(CompactRecords.from_frame(raw.iloc[:1]).frame().columns)
+    assert "ORDER BY" not in queries[0]
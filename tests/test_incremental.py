@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pandas as pd
+
+from ocr_dashboard import high_water_mark, merge_counts_since
+
+
+def counts(rows):
+    return pd.DataFrame(rows, columns=["BILMONTH", "IMAGE_VERIFY_CODE_PITC", "RECORD_COUNT"])
+
+
+def test_high_water_mark():
+    cached = counts([[pd.Timestamp("2024-01-01"), "A", 3], [pd.Timestamp("2024-03-01"), "N", 1], [pd.NaT, "A", 2]])
+
+    mark = high_water_mark(cached)
+    assert mark == datetime(2024, 3, 1) and not isinstance(mark, pd.Timestamp)
+    assert high_water_mark(counts([[pd.NaT, "A", 1]])) is None
+
+
+def test_merge_replaces_open_months_and_undated_rows():
+    since = datetime(2024, 2, 1)
+    cached = counts([
+        [pd.Timestamp("2024-01-01"), "A", 5],
+        [pd.Timestamp("2024-02-01"), "A", 1],
+        [pd.NaT, None, 7]
+    ])
+    fresh = counts([
+        [pd.Timestamp("2024-02-01"), "A", 4],
+        [pd.Timestamp("2024-03-01"), "C", 2],
+        [pd.NaT, None, 8]
+    ])
+
+    merged = merge_counts_since(cached, fresh, since)
+    assert merged["RECORD_COUNT"].tolist() == [5, 4, 2, 8]
+    # Merged counts equal a full recount of the same data
+    assert merged["RECORD_COUNT"].sum() == 5 + 4 + 2 + 8
+
+
+def test_merge_without_mark_takes_fresh():
+    fresh = counts([[pd.Timestamp("2024-01-01"), "A", 1]])
+    assert merge_counts_since(counts([[pd.Timestamp("2024-01-01"), "A", 9]]), fresh, None) is fresh
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from ocr_dashboard import aggregate_records, enrich_records, fold_record_counts, generate_raw_records
+from ocr_dashboard.loading import COUNT_KEYS
+
+
+def sorted_counts(counts):
+    counts = counts.astype({key: object for key in COUNT_KEYS if key != "BILMONTH"})
+    return counts.sort_values(COUNT_KEYS, na_position="first").reset_index(drop=True)[COUNT_KEYS + ["RECORD_COUNT"]]
+
+
+def test_folded_chunks_match_aggregate_records():
+    raw = generate_raw_records(3000, seed=9)[["REF_DIGITS", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"]]
+    raw.loc[::7, "IMAGE_VERIFY_CODE_PITC"] = None
+    raw.loc[::11, "BILMONTH"] = pd.NaT
+    chunks = [raw.iloc[start:start + 700] for start in range(0, len(raw), 700)]
+    progress = []
+
+    folded = fold_record_counts(chunks, on_chunk=lambda loaded, processed: progress.append((loaded, processed)))
+
+    expected = aggregate_records(enrich_records(raw.copy()))
+    pd.testing.assert_frame_equal(sorted_counts(folded), sorted_counts(expected), check_dtype=False)
+    assert progress[-1] == (len(raw), int(raw["IMAGE_VERIFY_CODE_PITC"].notna().sum()))
+
+
+def test_no_chunks():
+    assert fold_record_counts([]) is None
@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from ocr_dashboard import metrics
+from ocr_dashboard.metrics import begin_run, cache_lookup, count, finish_run, prometheus_text, stage
+
+SAMPLE_LINE = re.compile(r'^ocr_[a-z_]+(\{([a-z_]+="([^"\\]|\\.)*",?)+\})? -?[0-9.]+(e[+-]?[0-9]+)?$')
+
+
+def sample_value(text, line_start):
+    values = [line.rsplit(" ", 1)[1] for line in text.splitlines() if line.startswith(line_start + " ")]
+    assert len(values) == 1, line_start
+    return float(values[0])
+
+
+def test_prometheus_text_format():
+    count("format_checks", test="format", note='say "hi"\nback\\slash')
+    with stage("unit", test="format") as timing:
+        timing.rows = 3
+    text = prometheus_text()
+
+    assert text.endswith("\n")
+    families = set()
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, family, kind = line.split(" ")
+            assert kind in {"counter", "gauge", "summary"}
+            families.add(family)
+        elif not line.startswith("# HELP "):
+            assert SAMPLE_LINE.match(line), line
+            # Every sample belongs to a family declared above it
+            name = line.split("{")[0].split(" ")[0]
+            assert name in families or name.rsplit("_", 1)[0] in families, line
+    assert 'note="say \\"hi\\"\\nback\\\\slash"' in text
+
+
+def test_counters_increment():
+    line = 'ocr_increments_total{test="counters"}'
+    count("increments", test="counters")
+    before = sample_value(prometheus_text(), line)
+
+    count("increments", test="counters")
+    count("increments", 5, test="counters")
+    assert sample_value(prometheus_text(), line) == before + 6
+
+
+def test_stage_timings_increment():
+    labels = '{stage="unit",test="timings"}'
+    for rows in [10, 20]:
+        with stage("unit", test="timings") as timing:
+            timing.rows = rows
+    with pytest.raises(KeyError):
+        with stage("unit", test="timings"):
+            raise KeyError("boom")
+    text = prometheus_text()
+
+    assert sample_value(text, f"ocr_stage_seconds_count{labels}") == 3
+    total = sample_value(text, f"ocr_stage_seconds_sum{labels}")
+    assert 0 <= sample_value(text, f"ocr_stage_seconds_max{labels}") <= total
+    assert sample_value(text, f"ocr_stage_rows_total{labels}") == 30
+    assert sample_value(text, 'ocr_stage_errors_total{error="KeyError",stage="unit",test="timings"}') == 1
+
+
+def test_page_run_records_its_stages_and_cache_lookups():
+    run = begin_run()
+    with stage("unit", test="page_run"):
+        cache_lookup("unit_cache", True)
+        cache_lookup("unit_cache", False)
+        cache_lookup("unit_cache", False)
+    finish_run(run, disco="11")
+    # Later tests record outside any page run again
+    metrics._current_run.set(None)
+
+    assert run.stage_table()[["stage", "labels"]].values.tolist() == [["unit", "test=page_run"]]
+    assert run.to_dict()["cache"] == {"unit_cache:hit": 1, "unit_cache:miss": 2}
+    assert sample_value(prometheus_text(), 'ocr_cache_requests_total{cache="unit_cache",result="miss"}') >= 2
@@ -0,0 +1,35 @@
+import pytest
+
+from ocr_dashboard.profiling import oracle_sql_id, redact_binds
+
+SQL_ID_ALPHABET = "0123456789abcdfghjkmnpqrstuvwxyz"
+
+
+@pytest.mark.parametrize("sql_text, sql_id, hash_value", [
+    # As reported by V$SQL for these exact statement texts
+    ("select * from dual", "a5ks9fhw2v9s1", 942515969),
+    ("select sysdate from dual", "7h35uxf5uhmm1", 2343063137)
+])
+def test_known_sql_ids(sql_text, sql_id, hash_value):
+    assert oracle_sql_id(sql_text) == (sql_id, hash_value)
+
+
+def test_hash_value_is_the_low_half_of_the_sql_id():
+    sql_id, hash_value = oracle_sql_id("SELECT COUNT(*) FROM TBL_GENERAL_BILL_PRINT_AUDIT")
+    number = 0
+    for char in sql_id:
+        number = number * 32 + SQL_ID_ALPHABET.index(char)
+
+    assert len(sql_id) == 13
+    assert number & 0xFFFFFFFF == hash_value
+
+
+def test_text_is_hashed_exactly():
+    # Case and whitespace give Oracle a different cursor, and so a different SQL_ID
+    assert len({oracle_sql_id(text)[0] for text in ["select * from dual", "SELECT * FROM DUAL", "select *  from dual"]}) == 3
+
+
+def test_binds_are_redacted():
+    assert redact_binds({"disco_code": "11", "month_from": None, "page_size": 50}) == {
+        "disco_code": "str(2)", "month_from": "null", "page_size": "int"
+    }
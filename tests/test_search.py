@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from ocr_dashboard import CompactRecords, RecordSearchIndex, SEARCH_CONTAINS, generate_records
+
+
+def scan(records, text, contains=False):
+    """Row positions found by checking every row, the way the explorer used to"""
+    frame = records.frame(["REF_DIGITS", "DISCO_NAME", "BATCH_ID"]).astype(object).fillna("")
+    match = (lambda column: column.str.upper().str.contains(text, regex=False)) if contains \
+        else (lambda column: column.str.upper().str.startswith(text))
+    return np.flatnonzero(match(frame["REF_DIGITS"]) | match(frame["DISCO_NAME"]) | match(frame["BATCH_ID"]))
+
+
+def test_prefix_ranges_match_scan():
+    records = generate_records(5000, seed=2)
+    index = RecordSearchIndex(records)
+
+    for query in ["0", "01", "0111", "01111", records.ref_strings()[17], "les", "03-1", "999"]:
+        np.testing.assert_array_equal(index.search(query), scan(records, query.upper()), err_msg=query)
+
+
+def test_prefix_longer_than_keys_or_not_digits():
+    index = RecordSearchIndex(generate_records(100, seed=2))
+
+    assert len(index.search("0" * 20)) == 0
+    assert len(index.search("01x")) == 0
+
+
+def test_string_keys_and_contains():
+    records = CompactRecords.from_frame(pd.DataFrame({
+        "REF_DIGITS": ["0111a", "0111B", "0212C", None],
+        "BILMONTH": [pd.Timestamp("2024-01-01")] * 4,
+        "IMAGE_VERIFY_CODE_PITC": ["A"] * 4
+    }))
+    index = RecordSearchIndex(records)
+
+    assert index.search("0111").tolist() == [0, 1]
+    assert index.search("0111A").tolist() == [0]
+    assert index.search("12c", SEARCH_CONTAINS).tolist() == [2]
+    assert index.search("   ") is None
+
+
+def test_sorted_rows_keep_matches_only():
+    records = generate_records(500, seed=4)
+    index = RecordSearchIndex(records)
+    rows = index.search("02")
+
+    ordered = index.sorted_rows("REF_DIGITS", rows)
+    assert sorted(ordered.tolist()) == rows.tolist()
+    assert list(records.ref_strings(ordered)) == sorted(records.ref_strings(rows))
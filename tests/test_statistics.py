@@ -0,0 +1,110 @@
+import pandas as pd
+import pytest
+
+from ocr_dashboard import (
+    aggregate_records,
+    enrich_records,
+    generate_raw_records,
+    get_batch_statistics,
+    get_batch_statistics_from_counts
+)
+
+
+def reference_batch_statistics(df):
+    """The original one-mask-per-batch implementation"""
+    batch_stats = []
+
+    for batch_id in sorted(df["BATCH_ID"].unique()):
+        batch_df = df[df["BATCH_ID"] == batch_id]
+
+        total_records = len(batch_df)
+        processed_records = batch_df["IMAGE_VERIFY_CODE_PITC"].notna().sum()
+
+        flag_counts = {}
+        for flag in ['A', 'C', 'D', 'E', 'N']:
+            flag_counts[flag] = (batch_df["IMAGE_VERIFY_CODE_PITC"] == flag).sum()
+
+        successful = flag_counts['A'] + flag_counts['C'] + flag_counts['D']
+        total_an = flag_counts['A'] + flag_counts['N']
+        ocr_accuracy = (flag_counts['A'] / total_an * 100) if total_an > 0 else 0
+
+        processing_rate = (processed_records / total_records * 100) if total_records > 0 else 0
+        success_rate = (successful / processed_records * 100) if processed_records > 0 else 0
+
+        batch_stats.append({
+            "Batch ID": batch_id,
+            "DISCO": batch_df["DISCO_NAME"].iloc[0],
+            "Total Records": total_records,
+            "Processed": processed_records,
+            "Successful (A,C,D)": successful,
+            "Success Rate (A,C,D)": success_rate,
+            "Processing Rate": processing_rate,
+            "OCR Model Accuracy (A vs N)": ocr_accuracy,
+            "Flag A": flag_counts['A'],
+            "Flag C": flag_counts['C'],
+            "Flag D": flag_counts['D'],
+            "Flag E": flag_counts['E'],
+            "Flag N": flag_counts['N'],
+            "Total A+N": total_an
+        })
+
+    return pd.DataFrame(batch_stats)
+
+
+def raw_records(rows):
+    return pd.DataFrame(rows, columns=["REF_DIGITS", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"])
+
+
+EDGE_CASES = {
+    "generated": generate_raw_records(5000, seed=3)[["REF_DIGITS", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"]],
+    "unknown flag": raw_records([
+        ["01110000001", pd.Timestamp("2024-01-01"), "A"],
+        ["01110000002", pd.Timestamp("2024-01-01"), "X"],
+        ["01110000003", pd.Timestamp("2024-02-01"), "N"]
+    ]),
+    "null flag": raw_records([
+        ["02120000001", pd.Timestamp("2024-01-01"), None],
+        ["02120000002", pd.Timestamp("2024-01-01"), "C"],
+        ["03120000003", pd.NaT, None]
+    ]),
+    "unknown disco": raw_records([
+        ["01990000001", pd.Timestamp("2024-01-01"), "A"],
+        ["01990000002", pd.Timestamp("2024-01-01"), "E"],
+        ["01110000003", pd.Timestamp("2024-01-01"), "D"]
+    ])
+}
+
+
+@pytest.mark.parametrize("name", list(EDGE_CASES))
+def test_batch_statistics_match_reference(name):
+    df = enrich_records(EDGE_CASES[name].copy())
+    expected = reference_batch_statistics(df)
+
+    pd.testing.assert_frame_equal(get_batch_statistics(df), expected, check_dtype=False)
+    pd.testing.assert_frame_equal(get_batch_statistics_from_counts(aggregate_records(df)), expected, check_dtype=False)
+
+
+def test_unknown_disco_is_labelled():
+    df = enrich_records(EDGE_CASES["unknown disco"].copy())
+    stats = get_batch_statistics(df).set_index("Batch ID")
+
+    assert stats.loc["01-99", "DISCO"] == "UNKNOWN"
+    assert stats.loc["01-99", "Total Records"] == 2
+
+
+def test_unknown_flag_counts_as_processed_but_not_successful():
+    df = enrich_records(EDGE_CASES["unknown flag"].copy())
+    stats = get_batch_statistics(df).iloc[0]
+
+    assert (stats["Total Records"], stats["Processed"], stats["Successful (A,C,D)"]) == (3, 3, 1)
+
+
+def test_empty_frame():
+    df = enrich_records(raw_records([]).astype(object))
+
+    columns = list(reference_batch_statistics(enrich_records(EDGE_CASES["unknown flag"].copy())).columns)
+
+    for stats in [get_batch_statistics(df), get_batch_statistics_from_counts(aggregate_records(df))]:
+        assert stats.empty
+        assert list(stats.columns) == columns
+        assert stats.nlargest(5, "Success Rate (A,C,D)").empty
@@ -0,0 +1,118 @@
+import pandas as pd
+import pytest
+
+from ocr_dashboard import DISCO_MAP, EmptySampleError, summarize_records
+from ocr_dashboard import store
+from ocr_dashboard.estimate import sample_block_counts
+from ocr_dashboard.metrics import _registry
+from ocr_dashboard.store import load_sample_records
+
+
+def test_sample_discos_differ():
+    summaries = [summarize_records(load_sample_records(code)) for code in list(DISCO_MAP)[:3]]
+
+    assert len({summary["ocr_accuracy"]["accuracy"] for summary in summaries}) == 3
+    assert len({tuple(summary["flag_totals"].sort_index()) for summary in summaries}) == 3
+
+
+def test_all_discos_sample_is_one_sample_per_disco():
+    records = load_sample_records()
+
+    assert set(records["DISCO_CODE"].cat.categories) == set(DISCO_MAP)
+    assert records.ref_strings(slice(0, 5)).tolist() == load_sample_records("11").ref_strings(slice(0, 5)).tolist()
+
+
+def test_snapshot_failures_are_counted(monkeypatch):
+    def broken(*args):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(store, "load_aggregate_snapshot", broken)
+    key = ("snapshot_errors", (("action", "load_aggregate_snapshot"), ("disco", "11")))
+    before = _registry["counters"].get(key, 0)
+
+    assert store._snapshot_aggregate_entry("11") is None
+    store._save_snapshot(broken, "11")
+    assert _registry["counters"][key] == before + 1
+    assert _registry["counters"][("snapshot_errors", (("action", "broken"), ("disco", "11")))] >= 1
+
+
+def test_record_ranges_reuse_cached_months(monkeypatch):
+    source = load_sample_records("12")
+    months = sorted(source["BILMONTH"].cat.categories)
+    month_rows = source["BILMONTH"].value_counts()
+    queried, progress = [], []
+
+    def query_disco_records(disco_code, on_chunk=None, bilmonths=None, month_range=None):
+        queried.append(month_range)
+        records = source.take(store._in_month_range(source["BILMONTH"], month_range))
+        on_chunk(len(records), int(records["IMAGE_VERIFY_CODE_PITC"].notna().sum()))
+        return records
+
+    monkeypatch.setattr(store, "snapshots_enabled", lambda: False)
+    monkeypatch.setattr(store, "query_month_versions", lambda code, month_range: {
+        month: f"{month_rows[month]}-7" for month in months if month_range[0] <= month <= month_range[1]
+    })
+    monkeypatch.setattr(store, "query_disco_records", query_disco_records)
+    monkeypatch.setattr(store, "RECORD_RANGES_PER_DISCO", 2)
+    store.invalidate_disco("12")
+
+    ranges = [(months[0], months[2]), (months[1], months[3]), (months[2], months[3])]
+    for month_range in ranges:
+        records = store.load_records("12", on_progress=lambda *args: progress.append(args), month_range=month_range)
+        assert len(records) == store._in_month_range(source["BILMONTH"], month_range).sum()
+
+    # Only the month no cached store held was queried after the first load
+    assert queried == [ranges[0], (months[3], months[3])]
+    assert [key[1] for key in store._store["records"] if key[0] == "12"] == ranges[1:]
+    # Progress is measured against the month row counts, with no COUNT(*) of its own
+    assert [args[:2] for args in progress] == [(month_rows[months[:3]].sum(),) * 2, (month_rows[months[3]],) * 2]
+
+
+def test_sample_fallback_ignores_a_range_it_has_no_months_in():
+    month_range = (pd.Timestamp("2030-01-01"), pd.Timestamp("2030-06-01"))
+    records = load_sample_records("11", month_range)
+
+    assert len(records) == len(load_sample_records("11"))
+    assert not summarize_records(records)["batch_stats"].empty
+
+
+def test_row_counts_are_bounded(monkeypatch):
+    monkeypatch.setattr(store, "count_audit_rows", lambda disco_code, ref_prefix, month_range: len(ref_prefix))
+    monkeypatch.setattr(store, "RECORD_PAGE_CACHE_ENTRIES", 3)
+    monkeypatch.setitem(store._store, "row_counts", {})
+
+    for prefix in ["1", "12", "123", "1234"]:
+        assert store.count_records("11", prefix) == len(prefix)
+
+    assert [key[1] for key in store._store["row_counts"]] == ["12", "123", "1234"]
+
+
+def test_empty_sample_is_redrawn_larger(monkeypatch):
+    counts, group_counts = sample_block_counts(load_sample_records("11"), 0.5, 8)
+    percents = []
+
+    def query_sample_aggregates(disco_code, percent):
+        percents.append(percent)
+        if percent < 4:
+            return counts.iloc[:0], group_counts.iloc[:0]
+        return counts, group_counts
+
+    monkeypatch.setattr(store, "query_sample_aggregates", query_sample_aggregates)
+    monkeypatch.setattr(store, "ESTIMATE_SAMPLE_PERCENT", 1.0)
+    monkeypatch.setattr(store, "ESTIMATE_MAX_SAMPLE_PERCENT", 16.0)
+    store.invalidate_disco("11")
+
+    estimate = store.load_estimate("11")
+    assert percents == [1.0, 4.0]
+    assert (estimate["source"], estimate["fraction"]) == (store.SOURCE_DATABASE, 0.04)
+
+
+def test_sample_empty_at_every_percent_raises(monkeypatch):
+    empty = sample_block_counts(load_sample_records("11").take(slice(0, 0)), 0.5, 8)
+    monkeypatch.setattr(store, "query_sample_aggregates", lambda disco_code, percent: empty)
+    monkeypatch.setattr(store, "ESTIMATE_SAMPLE_PERCENT", 1.0)
+    monkeypatch.setattr(store, "ESTIMATE_MAX_SAMPLE_PERCENT", 16.0)
+    store.invalidate_disco("11")
+
+    with pytest.raises(EmptySampleError):
+        store.load_estimate("11")
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from ocr_dashboard import DISCO_MAP, generate_raw_records, generate_records
+
+
+def test_same_seed_same_records():
+    first, again, other = (generate_records(2000, seed=seed) for seed in [4, 4, 5])
+
+    for column in ["REF_DIGITS", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"]:
+        assert first[column].equals(again[column])
+    assert not first["REF_DIGITS"].equals(other["REF_DIGITS"])
+
+
+def test_month_span():
+    records = generate_records(3000, seed=1, start_month="2023-11-01", months=4)
+
+    assert list(records["BILMONTH"].cat.categories) == list(pd.date_range("2023-11-01", periods=4, freq="MS"))
+    assert records["BILMONTH"].notna().all()
+    assert records["BILMONTH"].nunique() == 4
+
+
+def test_ref_digits_layout():
+    records = generate_records(2000, seed=2, disco_weights={"14": 1, "26": 3}, batches=7, sub_divisions=2)
+    refs = records["REF_DIGITS"]
+
+    assert refs.str.len().eq(14).all()
+    assert set(refs.str[2:4]) == {"14", "26"}
+    assert set(refs.str[:2].astype(int)) <= set(range(1, 8))
+    assert set(refs.str[4].astype(int)) <= {1, 2}
+    assert set(records["DISCO_NAME"]) == {DISCO_MAP["14"], DISCO_MAP["26"]}
+
+
+def test_column_dtypes():
+    records = generate_records(500, seed=3)
+    raw = generate_raw_records(500, seed=3)
+
+    assert isinstance(records["BILMONTH"].dtype, pd.CategoricalDtype)
+    assert isinstance(records["IMAGE_VERIFY_CODE_PITC"].dtype, pd.CategoricalDtype)
+    assert set(records["IMAGE_VERIFY_CODE_PITC"].cat.categories) == {"A", "C", "D", "E", "N"}
+    assert raw.dtypes.to_dict() == {
+        "REF_DIGITS": np.dtype(object),
+        "DISCO_CODE": np.dtype(object),
+        "BILMONTH": np.dtype("datetime64[ns]"),
+        "IMAGE_VERIFY_CODE_PITC": np.dtype(object)
+    }
+    assert raw["REF_DIGITS"].tolist() == records["REF_DIGITS"].tolist()
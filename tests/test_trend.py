@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from ocr_dashboard import aggregate_records, enrich_records, month_trend, trend_rates
+
+JAN, FEB, MAR = (pd.Timestamp(f"2024-0{month}-01") for month in [1, 2, 3])
+
+
+def raw_records(rows):
+    return pd.DataFrame(
+        [[f"0111{serial:07d}" if disco == "LESCO" else f"0115{serial:07d}", month, flag]
+         for serial, (disco, month, flag) in enumerate(rows)],
+        columns=["REF_DIGITS", "BILMONTH", "IMAGE_VERIFY_CODE_PITC"]
+    )
+
+
+def test_trend_rates_per_disco():
+    trend = month_trend(aggregate_records(enrich_records(raw_records([
+        ("LESCO", JAN, "A"), ("LESCO", JAN, "A"), ("LESCO", JAN, "N"), ("LESCO", JAN, None),
+        # Nothing processed this month: every rate is 0, not NaN
+        ("LESCO", FEB, None), ("LESCO", FEB, None),
+        ("LESCO", MAR, "A"), ("LESCO", MAR, "C"),
+        # MEPCO has no records in February, so it has no February row
+        ("MEPCO", JAN, "N"),
+        ("MEPCO", MAR, "A"), ("MEPCO", MAR, "N"),
+        ("LESCO", pd.NaT, "A")
+    ]))))
+
+    rates = trend_rates(trend).set_index(["DISCO_NAME", "BILMONTH"])
+
+    assert list(rates.index) == [("LESCO", JAN), ("LESCO", FEB), ("LESCO", MAR), ("MEPCO", JAN), ("MEPCO", MAR)]
+    np.testing.assert_allclose(rates["Total Records"], [4, 2, 2, 1, 2])
+    np.testing.assert_allclose(rates["Processing Rate"], [75, 0, 100, 100, 100])
+    np.testing.assert_allclose(rates["Success Rate (A,C,D)"], [200 / 3, 0, 100, 0, 50])
+    np.testing.assert_allclose(rates["OCR Model Accuracy (A vs N)"], [200 / 3, 0, 100, 0, 50])
+    # Each DISCO's change starts over, and skips to its previous month with records
+    np.testing.assert_allclose(rates["OCR Accuracy Change"], [np.nan, -200 / 3, 100, np.nan, 50])
+
+
+def test_trend_rates_all_discos():
+    trend = month_trend(aggregate_records(enrich_records(raw_records([
+        ("LESCO", JAN, "A"), ("MEPCO", JAN, "N"),
+        ("LESCO", FEB, None)
+    ]))))
+
+    rates = trend_rates(trend, by=None)
+
+    assert rates["BILMONTH"].tolist() == [JAN, FEB]
+    np.testing.assert_allclose(rates["OCR Model Accuracy (A vs N)"], [50, 0])
+    np.testing.assert_allclose(rates["OCR Accuracy Change"], [np.nan, -50])